@@ -0,0 +1,202 @@
+"""
+Rule-based alarm engine for process samples
+Vectorized threshold evaluation with deadband, on/off delays and an active-alarm table
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HIGH = 'high'
+LOW = 'low'
+
+RAISED = 'raised'
+CLEARED = 'cleared'
+
+
+@dataclass(frozen=True)
+class AlarmRule:
+    """Limit on one signal"""
+
+    name: str
+    signal: str
+    limit: float
+    direction: str = HIGH  # 'high': alarm above the limit, 'low': below it
+    severity: str = 'MEDIUM'
+    message: str = ''  # formatted with {value}
+    deadband: float = 0.0  # distance back inside the limit required to clear
+    on_delay: float = 0.0  # seconds beyond the limit before raising
+    off_delay: float = 0.0  # seconds back inside the deadband before clearing
+
+    def __post_init__(self):
+        if self.direction not in (HIGH, LOW):
+            raise ValueError(f"Rule {self.name}: direction must be '{HIGH}' or '{LOW}'")
+        if self.deadband < 0 or self.on_delay < 0 or self.off_delay < 0:
+            raise ValueError(f"Rule {self.name}: deadband and delays must be non-negative")
+
+    def describe(self, value: float) -> str:
+        if self.message:
+            return self.message.format(value=value)
+        return f"{self.signal} {self.direction}: {value:g}"
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def load_rules(path: str) -> List[AlarmRule]:
+    """Read rules from a JSON list of AlarmRule fields"""
+    with open(path) as f:
+        return [AlarmRule(**entry) for entry in json.load(f)]
+
+
+class AlarmEngine:
+    """
+    Evaluates every rule for one or more sample streams per tick
+
+    Rule parameters are held as arrays and rule state as (streams, rules)
+    arrays, so a tick is a handful of vectorized comparisons however many
+    rules and streams there are. An alarm is raised once the value has
+    been beyond its limit for ``on_delay`` seconds and cleared once it has
+    been back inside ``limit -/+ deadband`` for ``off_delay`` seconds; in
+    between, nothing is emitted, so a sustained excursion yields exactly one
+    'raised' and one 'cleared' event. A NaN reading leaves the rule's state
+    and delay timers as they were.
+
+    Active alarms are kept in a table per stream indexed by rule name.
+    Transitions are appended to a bounded event log per stream, numbered
+    so clients can poll with a cursor.
+    """
+
+    def __init__(self, rules: Sequence[AlarmRule], signals: Sequence[str],
+                 streams: int = 1, log_size: int = 50):
+        names = [rule.name for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Alarm rule names must be unique")
+        unknown = [rule.signal for rule in rules if rule.signal not in signals]
+        if unknown:
+            raise ValueError(f"Alarm rules reference unknown signals: {', '.join(unknown)}")
+
+        self.rules: Tuple[AlarmRule, ...] = tuple(rules)
+        self.signals = tuple(signals)
+        self.streams = streams
+
+        self._signal = np.array([self.signals.index(rule.signal) for rule in rules], dtype=int)
+        self._sign = np.array([1.0 if rule.direction == HIGH else -1.0 for rule in rules])
+        self._limit = np.array([rule.limit for rule in rules], dtype=float)
+        self._deadband = np.array([rule.deadband for rule in rules], dtype=float)
+        self._on_delay = np.array([rule.on_delay for rule in rules], dtype=float)
+        self._off_delay = np.array([rule.off_delay for rule in rules], dtype=float)
+
+        shape = (streams, len(self.rules))
+        self._active = np.zeros(shape, dtype=bool)
+        # When the current excursion / return started, NaN when none is under way
+        self._pending = np.full(shape, np.nan)
+        self._clearing = np.full(shape, np.nan)
+
+        self._table: List[Dict[str, Dict]] = [{} for _ in range(streams)]
+        self._log = [deque(maxlen=log_size) for _ in range(streams)]
+        self._count = [0] * streams
+        self._lock = threading.Lock()
+
+        self.evaluations = 0
+        self.transitions = 0
+
+    def evaluate(self, timestamp: float, values: np.ndarray) -> List[List[Dict]]:
+        """
+        Apply every rule to one tick of samples
+
+        ``values`` holds the signals of each stream, shape (streams,
+        signals) or (signals,) for a single stream. Returns the raise and
+        clear events of each stream.
+        """
+        values = np.asarray(values, dtype=float).reshape(self.streams, len(self.signals))
+        # Positive when beyond the limit, whatever the rule's direction
+        excess = self._sign * (values[:, self._signal] - self._limit)
+        beyond = excess > 0
+        inside = excess < -self._deadband
+        # A missing (NaN) reading says nothing either way, so it leaves the
+        # on/off delay timers where they were instead of restarting them
+        missing = np.isnan(excess)
+
+        with self._lock:
+            self.evaluations += 1
+            active = self._active
+            pending = np.where(~active & beyond, np.fmin(self._pending, timestamp), np.nan)
+            clearing = np.where(active & inside, np.fmin(self._clearing, timestamp), np.nan)
+            self._pending = np.where(missing, self._pending, pending)
+            self._clearing = np.where(missing, self._clearing, clearing)
+            raised = ~active & beyond & (timestamp - self._pending >= self._on_delay)
+            cleared = active & inside & (timestamp - self._clearing >= self._off_delay)
+
+            events: List[List[Dict]] = [[] for _ in range(self.streams)]
+            if not (raised.any() or cleared.any()):
+                return events
+
+            active |= raised
+            active &= ~cleared
+            self._pending[raised] = np.nan
+            self._clearing[cleared] = np.nan
+
+            when = datetime.fromtimestamp(timestamp).isoformat()
+            for stream, index in zip(*np.nonzero(raised | cleared)):
+                rule = self.rules[index]
+                value = float(values[stream, self._signal[index]])
+                is_raised = bool(raised[stream, index])
+                event = {
+                    'rule': rule.name,
+                    'state': RAISED if is_raised else CLEARED,
+                    'severity': rule.severity,
+                    'message': rule.describe(value) + ('' if is_raised else ' (cleared)'),
+                    'value': value,
+                    'timestamp': when
+                }
+                if is_raised:
+                    self._table[stream][rule.name] = event
+                else:
+                    self._table[stream].pop(rule.name, None)
+                self._log[stream].append(event)
+                self._count[stream] += 1
+                events[stream].append(event)
+            self.transitions += sum(len(stream_events) for stream_events in events)
+        return events
+
+    def active(self, stream: int = 0) -> List[Dict]:
+        """Alarms currently raised on a stream, oldest first"""
+        with self._lock:
+            return list(self._table[stream].values())
+
+    def events_since(self, cursor: Optional[int] = None,
+                     stream: int = 0) -> Tuple[List[Dict], int, bool]:
+        """
+        Logged events with sequence >= ``cursor`` (all retained when None)
+
+        Returns (events, next_cursor, gap); ``gap`` is True when events the
+        client has not seen were already evicted.
+        """
+        with self._lock:
+            log = self._log[stream]
+            end = self._count[stream]
+            first = end - len(log)
+            start = first if cursor is None else min(max(cursor, first), end)
+            events = list(islice(log, start - first, None))
+        return events, end, cursor is not None and start > cursor
+
+    def stats(self) -> Dict:
+        with self._lock:
+            active = int(self._active.sum())
+        return {
+            'rules': len(self.rules),
+            'streams': self.streams,
+            'active': active,
+            'evaluations': self.evaluations,
+            'transitions': self.transitions
+        }
@@ -0,0 +1,4 @@
+"""
+Steeping optimization backend: process models, the optimization engine
+and the MPC controller
+"""
@@ -7,15 +7,23 @@ import numpy as np
 from scipy.optimize import minimize, differential_evolution
 from typing import Dict, List, Tuple, Optional
 from dataclasses import asdict
+from contextlib import nullcontext
 import logging
 from datetime import datetime, timedelta
 
-from models import (
+# Worker pools and profiling are shared with the main optimizer at the
+# application root; the backend itself is imported as the ``backend`` package
+from parallel import get_map
+from profiling import OptimizationProfiler
+from .models import (
     ProcessParameters, ProcessConstraints, ProcessState,
     OptimizationObjectives, ProcessModel, CostModel,
     DEFAULT_CONSTRAINTS, DEFAULT_OBJECTIVES, DEFAULT_PROCESS_MODEL
 )
 
+# Shared no-op phase for unprofiled runs; nullcontext is reusable
+_NO_PHASE = nullcontext()
+
 
 class OptimizationEngine:
     """Main optimization engine for corn wet milling steeping process"""
@@ -23,13 +31,21 @@ class OptimizationEngine:
     def __init__(self, 
                  process_model: ProcessModel = DEFAULT_PROCESS_MODEL,
                  constraints: ProcessConstraints = DEFAULT_CONSTRAINTS,
-                 objectives: OptimizationObjectives = DEFAULT_OBJECTIVES):
+                 objectives: OptimizationObjectives = DEFAULT_OBJECTIVES,
+                 workers: int = 1,
+                 profiler: Optional[OptimizationProfiler] = None):
         
         self.process_model = process_model
         self.constraints = constraints
         self.objectives = objectives
         self.cost_model = CostModel()
         
+        # Population evaluation processes (1 = serial, -1 = all cores)
+        self.workers = workers
+        
+        # Optional instrumentation; every hook is skipped when this is None
+        self.profiler = profiler
+        
         # Optimization history
         self.optimization_history: List[Dict] = []
         
@@ -37,6 +53,56 @@ class OptimizationEngine:
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(level=logging.INFO)
     
+    def __getstate__(self):
+        """Ship only the problem definition to pool workers, not history, logger or profiler"""
+        state = self.__dict__.copy()
+        del state['optimization_history']
+        del state['logger']
+        del state['profiler']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.optimization_history = []
+        self.logger = logging.getLogger(__name__)
+        self.profiler = None
+    
+    def enable_profiling(self, history: int = 20) -> OptimizationProfiler:
+        """Attach a profiler; optimization results then carry a 'profile' entry"""
+        if self.profiler is None:
+            self.profiler = OptimizationProfiler(history)
+        return self.profiler
+    
+    def disable_profiling(self):
+        """Detach the profiler so instrumentation costs nothing"""
+        self.profiler = None
+    
+    def _counting_map(self, worker_map):
+        """
+        Wrap a worker map so the parent counts the evaluations it hands out
+
+        objective_function runs unprofiled in pool workers; a map that
+        evaluates in-process has already counted its candidates and is
+        left alone.
+        """
+        profiler = self.profiler
+
+        def counted(func, iterable):
+            candidates = list(iterable)
+            before = profiler.evaluations()
+            results = list(worker_map(func, candidates))
+            if profiler.evaluations() == before:
+                profiler.count_evaluations(len(candidates))
+            return results
+
+        return counted
+    
+    def _phase(self, name: str):
+        """Profiler phase context, or a no-op when profiling is disabled"""
+        if self.profiler is None:
+            return _NO_PHASE
+        return self.profiler.phase(name)
+    
     def objective_function(self, decision_vars: np.ndarray, 
                           current_state: ProcessState,
                           batch_size: float = 10000.0) -> float:
@@ -63,26 +129,33 @@ class OptimizationEngine:
             steeping_time=steeping_time
         )
         
+        if self.profiler is not None:
+            self.profiler.count_evaluations(1)
+        
         # Predict performance
-        prediction = self.process_model.predict_yield(params, steeping_time)
-        starch_yield = prediction['predicted_starch_yield']
+        with self._phase('predict_yield'):
+            prediction = self.process_model.predict_yield(params, steeping_time)
         
         # Calculate costs
-        costs = self.cost_model.calculate_batch_cost(params, self.objectives, batch_size)
-        total_cost = costs['total_cost']
+        with self._phase('batch_cost'):
+            costs = self.cost_model.calculate_batch_cost(params, self.objectives, batch_size)
         
         # Calculate revenue
-        revenue_data = self.cost_model.calculate_revenue(
-            starch_yield, batch_size, self.objectives.starch_price
-        )
+        with self._phase('revenue'):
+            revenue_data = self.cost_model.calculate_revenue(
+                prediction['predicted_starch_yield'], batch_size, self.objectives.starch_price
+            )
+        
+        # Add constraint penalties
+        with self._phase('constraint_penalties'):
+            penalty = self._calculate_constraint_penalties(decision_vars)
+        
+        total_cost = costs['total_cost']
         revenue = revenue_data['revenue']
         
         # Calculate profit
         profit = revenue - total_cost
         
-        # Add constraint penalties
-        penalty = self._calculate_constraint_penalties(decision_vars)
-        
         # Multi-objective combination (minimize negative profit + penalties)
         objective_value = (
             -profit * self.objectives.yield_weight +
@@ -135,9 +208,24 @@ class OptimizationEngine:
         """
         Optimize acid set point for current batch
         
-        Returns optimized parameters and performance predictions
+        Returns optimized parameters and performance predictions. With a
+        profiler attached the result also carries a 'profile' entry.
         """
         
+        if self.profiler is None:
+            return self._optimize_batch(current_state, batch_size)
+        
+        self.profiler.start_run('optimize_batch')
+        optimization_result = {}
+        try:
+            optimization_result = self._optimize_batch(current_state, batch_size)
+        finally:
+            profile = self.profiler.end_run(batch_id=current_state.batch_id)
+        optimization_result['profile'] = profile
+        return optimization_result
+    
+    def _optimize_batch(self, current_state: ProcessState, 
+                       batch_size: float) -> Dict:
         self.logger.info(f"Starting optimization for batch {current_state.batch_id}")
         
         # Define bounds for decision variables
@@ -158,17 +246,30 @@ class OptimizationEngine:
             36.0  # Default steeping time
         ])
         
-        # Global optimization using Differential Evolution
+        # Global optimization using Differential Evolution, scoring each
+        # generation across the shared pool when workers > 1
+        callback = None
+        if self.profiler is not None:
+            self.profiler.mark_generation_start()
+            callback = self.profiler.generation_callback
+        
         try:
-            result_global = differential_evolution(
-                self.objective_function,
-                bounds,
-                args=(current_state, batch_size),
-                seed=42,
-                maxiter=100,
-                popsize=15,
-                tol=1e-6
-            )
+            worker_map = get_map(self.workers)
+            if worker_map is not None and self.profiler is not None:
+                worker_map = self._counting_map(worker_map)
+            with self._phase('differential_evolution'):
+                result_global = differential_evolution(
+                    self.objective_function,
+                    bounds,
+                    args=(current_state, batch_size),
+                    seed=42,
+                    maxiter=100,
+                    popsize=15,
+                    tol=1e-6,
+                    workers=worker_map if worker_map is not None else 1,
+                    updating='deferred' if worker_map is not None else 'immediate',
+                    callback=callback
+                )
             
             optimal_vars = result_global.x
             optimal_objective = result_global.fun
@@ -177,13 +278,14 @@ class OptimizationEngine:
         except Exception as e:
             self.logger.error(f"Global optimization failed: {e}")
             # Fallback to local optimization
-            result_local = minimize(
-                self.objective_function,
-                x0,
-                args=(current_state, batch_size),
-                method='L-BFGS-B',
-                bounds=bounds
-            )
+            with self._phase('local_fallback'):
+                result_local = minimize(
+                    self.objective_function,
+                    x0,
+                    args=(current_state, batch_size),
+                    method='L-BFGS-B',
+                    bounds=bounds
+                )
             
             optimal_vars = result_local.x
             optimal_objective = result_local.fun
@@ -199,11 +301,12 @@ class OptimizationEngine:
         )
         
         # Calculate performance predictions
-        prediction = self.process_model.predict_yield(optimal_params, optimal_vars[4])
-        costs = self.cost_model.calculate_batch_cost(optimal_params, self.objectives, batch_size)
-        revenue_data = self.cost_model.calculate_revenue(
-            prediction['predicted_starch_yield'], batch_size, self.objectives.starch_price
-        )
+        with self._phase('report'):
+            prediction = self.process_model.predict_yield(optimal_params, optimal_vars[4])
+            costs = self.cost_model.calculate_batch_cost(optimal_params, self.objectives, batch_size)
+            revenue_data = self.cost_model.calculate_revenue(
+                prediction['predicted_starch_yield'], batch_size, self.objectives.starch_price
+            )
         
         # Compile results
         optimization_result = {
@@ -398,7 +501,9 @@ class ModelPredictiveController:
 
 # Factory functions for easy instantiation
 def create_optimizer(custom_constraints: Optional[ProcessConstraints] = None,
-                    custom_objectives: Optional[OptimizationObjectives] = None) -> OptimizationEngine:
+                    custom_objectives: Optional[OptimizationObjectives] = None,
+                    workers: int = 1,
+                    profiler: Optional[OptimizationProfiler] = None) -> OptimizationEngine:
     """Factory function to create optimizer with custom parameters"""
     
     constraints = custom_constraints if custom_constraints else DEFAULT_CONSTRAINTS
@@ -407,7 +512,9 @@ def create_optimizer(custom_constraints: Optional[ProcessConstraints] = None,
     return OptimizationEngine(
         process_model=DEFAULT_PROCESS_MODEL,
         constraints=constraints,
-        objectives=objectives
+        objectives=objectives,
+        workers=workers,
+        profiler=profiler
     )
 
 
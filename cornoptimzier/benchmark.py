@@ -0,0 +1,332 @@
+"""
+Benchmark suite for the Corn Processing optimizer and simulator hot paths
+Writes machine-readable JSON results and flags regressions against a saved baseline
+
+Usage:
+    python benchmark.py --output results.json
+    python benchmark.py --output new.json --compare baseline.json --threshold 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+from main import CornProcessOptimizer
+
+
+def best_of(func: Callable, repeat: int = 3) -> float:
+    """Fastest wall time of ``repeat`` calls, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def peak_memory(func: Callable) -> float:
+    """Peak traced Python/NumPy allocation of one call, in MiB"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def metric(value: float, unit: str, higher_is_better: bool) -> Dict:
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def fresh_interpreter(code: str) -> float:
+    """Wall time of a new interpreter running ``code`` from the package directory"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=PACKAGE_DIR, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def _candidates(optimizer: CornProcessOptimizer, n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    lower, upper = np.array(optimizer._bounds(), dtype=float).T
+    return lower + rng.random((n, 4)) * (upper - lower)
+
+
+def bench_objective(results: Dict, quick: bool):
+    optimizer = CornProcessOptimizer()
+
+    scalar = _candidates(optimizer, 2_000 if quick else 20_000).tolist()
+    elapsed = best_of(lambda: [optimizer.objective_function(x) for x in scalar])
+    results['objective_scalar_evals_per_s'] = metric(len(scalar) / elapsed, 'evals/s', True)
+
+    batch = _candidates(optimizer, 100_000 if quick else 1_000_000)
+    elapsed = best_of(lambda: optimizer.objective_function_batch(batch))
+    results['objective_batch_evals_per_s'] = metric(len(batch) / elapsed, 'evals/s', True)
+
+
+def bench_optimize_setpoints(results: Dict, quick: bool):
+    def solve():
+        CornProcessOptimizer().optimize_setpoints(warm_start=False)
+
+    results['optimize_setpoints_s'] = metric(best_of(solve, 2 if quick else 5), 's', False)
+    results['optimize_setpoints_peak_mib'] = metric(peak_memory(solve), 'MiB', False)
+
+    def solve_hybrid():
+        optimizer = CornProcessOptimizer()
+        # The shipped pH floor admits no feasible point; hybrid mode needs one
+        optimizer.safety_limits['pH_min'] = 0.5
+        optimizer.optimize_setpoints(warm_start=False, method='hybrid')
+
+    results['optimize_setpoints_hybrid_s'] = metric(best_of(solve_hybrid, 2 if quick else 5),
+                                                    's', False)
+
+
+def bench_simulate(results: Dict, quick: bool):
+    optimizer = CornProcessOptimizer()
+    optimizer.optimize_setpoints()
+
+    horizons = {'1h': 1, '1d': 24, '1w': 24 * 7}
+    for label, hours in horizons.items():
+        elapsed = best_of(lambda: optimizer.simulate_process(hours, {'enable': True}, seed=0),
+                          2 if quick else 5)
+        results[f'simulate_{label}_samples_per_s'] = metric(int(hours * 60) / elapsed,
+                                                            'samples/s', True)
+
+    results['simulate_1w_peak_mib'] = metric(
+        peak_memory(lambda: optimizer.simulate_process(24 * 7, {'enable': True}, seed=0)),
+        'MiB', False
+    )
+
+
+def bench_kinetics(results: Dict, quick: bool):
+    optimizer = CornProcessOptimizer()
+    n = 10_000 if quick else 100_000
+    acid, temperature, residence, _ = _candidates(optimizer, n).T
+
+    elapsed = best_of(lambda: optimizer.simulate_kinetics(acid, temperature, residence,
+                                                          method='rk4'))
+    results['kinetics_rk4_sets_per_s'] = metric(n / elapsed, 'sets/s', True)
+
+    # Three-step acid/temperature profile with linear ramps
+    breakpoints = [0.0, 0.3, 0.7]
+    acid_profile = np.stack([acid, 0.5 * acid, acid], axis=1)
+    temperature_profile = np.stack([temperature, temperature - 10, temperature], axis=1)
+    elapsed = best_of(lambda: optimizer.simulate_kinetics(
+        acid_profile, temperature_profile, residence, breakpoints=breakpoints,
+        interpolation='linear', method='rk4'
+    ))
+    results['kinetics_profile_sets_per_s'] = metric(n / elapsed, 'sets/s', True)
+
+    elapsed = best_of(lambda: optimizer.simulate_kinetics(acid, temperature, residence,
+                                                          method='bdf'), 1 if quick else 3)
+    results['kinetics_bdf_sets_per_s'] = metric(n / elapsed, 'sets/s', True)
+
+
+def _backend_state():
+    from backend.models import ProcessState
+    return ProcessState(
+        timestamp=datetime(2024, 1, 1),
+        batch_id='BENCH-001',
+        current_ph=4.5,
+        current_temperature=52.5,
+        current_acid_concentration=1.0,
+        current_so2_level=1200,
+        tank_level=80.0,
+        acid_tank_level=75.0,
+        elapsed_time=0.0,
+        starch_extracted=0.0,
+        protein_extracted=0.0,
+        starch_yield=0.0,
+        starch_purity=95.0
+    )
+
+
+def bench_backend(results: Dict, quick: bool):
+    from backend.optimizer import create_optimizer, create_mpc_controller
+
+    state = _backend_state()
+    engine = create_optimizer()
+    results['optimize_batch_s'] = metric(
+        best_of(lambda: engine.optimize_batch(state), 1 if quick else 3), 's', False
+    )
+
+    controller = create_mpc_controller(create_optimizer())
+    results['mpc_step_s'] = metric(
+        best_of(lambda: controller.compute_mpc_control(state), 1 if quick else 3), 's', False
+    )
+    results['optimize_batch_peak_mib'] = metric(
+        peak_memory(lambda: engine.optimize_batch(state)), 'MiB', False
+    )
+
+
+def bench_historian(results: Dict, quick: bool):
+    from historian import Historian, DAY
+
+    # Same width as the web monitor's samples
+    SIGNALS = ('timestamp', 'acid_concentration', 'temperature', 'flow_rate',
+               'pH', 'yield', 'quality', 'cost')
+
+    n = 50_000 if quick else 200_000
+    # One sample per 2 s, starting on a day boundary
+    rows = np.zeros((n, len(SIGNALS)))
+    rows[:, 0] = 1_700_006_400 + 2.0 * np.arange(n)
+    rows[:, 1:] = np.random.default_rng(0).random((n, len(SIGNALS) - 1))
+    samples = rows.tolist()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = Historian(root, SIGNALS)
+        start = time.perf_counter()
+        for sample in samples:
+            store.append(sample)
+        store.flush()
+        results['historian_ingest_samples_per_s'] = metric(
+            n / (time.perf_counter() - start), 'samples/s', True
+        )
+        store.compact()
+        results['historian_day_query_s'] = metric(
+            best_of(lambda: store.query(1_700_006_400 + DAY, 1_700_006_400 + 2 * DAY)), 's', False
+        )
+        store.close()
+
+    from downsample import Rollups, lttb
+
+    rollups = Rollups(SIGNALS[1:])
+    values = rows[:, 1:]
+    start = time.perf_counter()
+    for timestamp, sample in zip(rows[:, 0], values):
+        rollups.add(timestamp, sample)
+    results['rollup_ingest_samples_per_s'] = metric(
+        n / (time.perf_counter() - start), 'samples/s', True
+    )
+    results['lttb_5000_to_1000_s'] = metric(
+        best_of(lambda: lttb(rows[:5000, 0], rows[:5000, 2], 1000)), 's', False
+    )
+
+
+def bench_startup(results: Dict, quick: bool):
+    repeat = 3 if quick else 7
+    results['interpreter_startup_s'] = metric(
+        min(fresh_interpreter('pass') for _ in range(repeat)), 's', False
+    )
+    results['import_main_s'] = metric(
+        min(fresh_interpreter('import main') for _ in range(repeat)), 's', False
+    )
+    # App import, optimizer construction and a first request through Flask
+    flask_boot = ("import web_interface; "
+                  "web_interface.app.test_client().get('/api/cache_stats')")
+    results['flask_boot_s'] = metric(
+        min(fresh_interpreter(flask_boot) for _ in range(repeat)), 's', False
+    )
+
+
+BENCHMARKS = {
+    'startup': bench_startup,
+    'objective': bench_objective,
+    'optimize_setpoints': bench_optimize_setpoints,
+    'simulate': bench_simulate,
+    'kinetics': bench_kinetics,
+    'historian': bench_historian,
+    'backend': bench_backend
+}
+
+
+def run(selected=None, quick: bool = False) -> Dict:
+    """Run the selected benchmark groups and return a results document"""
+    metrics: Dict[str, Dict] = {}
+    for name, bench in BENCHMARKS.items():
+        if selected and name not in selected:
+            continue
+        print(f"Running {name}...", file=sys.stderr)
+        bench(metrics, quick)
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'quick': quick,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count()
+        },
+        'metrics': metrics
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.2) -> Dict:
+    """
+    Relative change of every metric present in both documents
+
+    A metric regresses when it moves in its bad direction by more than
+    ``threshold`` (0.2 = 20%).
+    """
+    report = {}
+    for name, new in current['metrics'].items():
+        old = baseline['metrics'].get(name)
+        if old is None or not old['value']:
+            continue
+
+        change = (new['value'] - old['value']) / old['value']
+        worse = -change if new['higher_is_better'] else change
+        report[name] = {
+            'baseline': old['value'],
+            'current': new['value'],
+            'change': change,
+            'regression': worse > threshold
+        }
+    return report
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Corn optimizer benchmark suite")
+    parser.add_argument('--output', help="Write results JSON to this path (default: stdout)")
+    parser.add_argument('--compare', help="Baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (default: 0.2)")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS),
+                        help="Run only these benchmark groups")
+    parser.add_argument('--quick', action='store_true', help="Fewer repeats and smaller inputs")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    with np.errstate(invalid='ignore'):
+        results = run(args.only, args.quick)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        results['comparison'] = compare(results, baseline, args.threshold)
+        regressions = [name for name, row in results['comparison'].items() if row['regression']]
+        for name, row in sorted(results['comparison'].items()):
+            flag = 'REGRESSION' if row['regression'] else 'ok'
+            print(f"{name:36s} {row['baseline']:14.4g} -> {row['current']:14.4g} "
+                  f"({row['change']:+.1%}) {flag}", file=sys.stderr)
+        if regressions:
+            exit_code = 1
+
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(document)
+    else:
+        print(document)
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
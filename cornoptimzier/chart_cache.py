@@ -0,0 +1,56 @@
+"""
+Versioned cache of rendered chart payloads
+Each payload is rebuilt at most once per data version, however many clients
+ask for it
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PayloadCache:
+    """
+    One rendered payload per (chart, format), valid for one version
+
+    ``get`` returns the cached bytes while the caller's version matches the
+    one they were built for; otherwise it rebuilds them under a per-entry
+    lock, so concurrent requests for a stale entry trigger a single build.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[Hashable, bytes]] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        self.hits = 0
+        self.builds = 0
+
+    def _lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, chart: str, fmt: str, version: Hashable,
+            build: Callable[[], bytes]) -> bytes:
+        key = (chart, fmt)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock(key):
+            # Another request may have rebuilt it while we waited
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+
+            payload = build()
+            self._entries[key] = (version, payload)
+            self.builds += 1
+            return payload
+
+    def stats(self) -> Dict:
+        return {'entries': len(self._entries), 'hits': self.hits, 'builds': self.builds}
@@ -0,0 +1,241 @@
+"""
+Downsampling for long-range trend queries
+LTTB and min/max envelopes, plus fixed-interval rollup tiers maintained on ingest
+"""
+
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+# Rollup tiers: name, bucket width in seconds, buckets retained
+TIERS = (
+    ('1min', 60, 7 * 24 * 60),
+    ('10min', 600, 30 * 24 * 6),
+    ('1h', 3600, 365 * 24)
+)
+
+# Per-signal statistics kept for every rollup bucket
+STATS = ('min', 'max', 'mean')
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Indices of ``points`` samples chosen by Largest-Triangle-Three-Buckets
+
+    The first and last samples are always kept. Each bucket in between
+    contributes the sample forming the largest triangle with the previously
+    chosen sample and the mean of the next bucket, which preserves peaks
+    and the visual shape of the series. NaN samples are left out of the
+    bucket means and are never chosen over a finite sample.
+
+    The bucket means are computed in one pass, but each choice depends on
+    the one before it, so selection remains one small NumPy step per output
+    point: the cost grows with ``points``, not with ``len(x)``.
+    """
+    n = len(x)
+    if points >= n:
+        return np.arange(n)
+    if points < 3:
+        return np.array([0, n - 1])[:max(points, 0)]
+
+    # points - 2 buckets between the first and last sample, then the last
+    # sample as the final "next bucket"
+    edges = np.append(np.linspace(1, n - 1, points - 1).astype(int), n)
+    finite = ~np.isnan(y)
+    starts = edges[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.add.reduceat(x, starts) / np.diff(edges)
+        mean_y = np.add.reduceat(np.where(finite, y, 0.0), starts) / np.add.reduceat(finite, starts)
+
+    indices = np.empty(points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+
+    # Python scalars keep the per-point overhead down
+    edges, mean_x, mean_y = edges.tolist(), mean_x.tolist(), mean_y.tolist()
+    has_nan = not finite.all()
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = float(x[a]), float(y[a])
+        area = np.abs((ax - mean_x[i + 1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (mean_y[i + 1] - ay))
+        if has_nan:
+            area[np.isnan(area)] = -1.0
+        a = lo + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def minmax_envelope(x: np.ndarray, low: np.ndarray, high: np.ndarray,
+                    buckets: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge consecutive samples into at most ``buckets`` (start, min, max)
+    triples
+
+    ``low`` and ``high`` are the per-sample lower and upper values (the
+    same array for raw samples, the min and max columns for rollups), so
+    envelopes of envelopes stay exact.
+    """
+    n = len(x)
+    if n <= buckets:
+        return x, low, high
+    starts = np.unique(np.linspace(0, n, buckets + 1).astype(int)[:-1])
+    # fmin/fmax skip NaN, so one missing sample does not blank its bucket
+    return x[starts], np.fmin.reduceat(low, starts), np.fmax.reduceat(high, starts)
+
+
+class RollupTier:
+    """
+    Min, max and mean of every signal over fixed ``interval``-second buckets
+
+    Closed buckets live in a RingBuffer of ``capacity`` rows; the bucket
+    still filling is kept in accumulators and included in queries, so a
+    tier is always up to date with the last sample.
+
+    NaN samples are ignored per signal: ``count`` is the number of samples
+    in the bucket, and a signal's statistics are NaN only when all of them
+    were NaN for it.
+    """
+
+    def __init__(self, name: str, interval: int, signals: Sequence[str], capacity: int):
+        self.name = name
+        self.interval = interval
+        self.signals = tuple(signals)
+        columns = ('timestamp', 'count') + tuple(f'{signal}_{stat}' for stat in STATS
+                                                 for signal in self.signals)
+        self.buffer = RingBuffer(columns, capacity)
+
+        self._lock = threading.Lock()
+        self._bucket: Optional[float] = None
+        self._count = 0
+        self._min = np.empty(len(self.signals))
+        self._max = np.empty(len(self.signals))
+        self._sum = np.empty(len(self.signals))
+        # Non-NaN samples per signal, the divisor of the mean
+        self._valid = np.empty(len(self.signals))
+
+    @staticmethod
+    def _mean(sums: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(valid > 0, sums / valid, np.nan)
+
+    def _rows(self, buckets, counts, mins, maxs, sums, valid) -> np.ndarray:
+        return np.vstack([buckets, counts, mins, maxs, self._mean(sums, valid)])
+
+    def _open_row(self) -> np.ndarray:
+        return np.concatenate(([self._bucket, self._count], self._min, self._max,
+                               self._mean(self._sum, self._valid)))
+
+    def _close(self):
+        """Move the open bucket into the buffer"""
+        if self._count:
+            self.buffer.append(self._open_row())
+        self._count = 0
+
+    def add(self, timestamp: float, values: np.ndarray):
+        """Fold one sample (values in signal order) into its bucket"""
+        bucket = timestamp // self.interval * self.interval
+        with self._lock:
+            if self._bucket is not None and bucket <= self._bucket:
+                # Late samples land in the open bucket
+                bucket = self._bucket
+            else:
+                self._close()
+                self._bucket = bucket
+            finite = ~np.isnan(values)
+            if self._count:
+                np.fmin(self._min, values, out=self._min)
+                np.fmax(self._max, values, out=self._max)
+                self._sum += np.where(finite, values, 0.0)
+                self._valid += finite
+            else:
+                self._min[:] = self._max[:] = values
+                self._sum[:] = np.where(finite, values, 0.0)
+                self._valid[:] = finite
+            self._count += 1
+
+    def add_block(self, timestamps: np.ndarray, values: np.ndarray):
+        """Fold samples given as timestamps and a (signals, n) array, oldest first"""
+        if not len(timestamps):
+            return
+        buckets = timestamps // self.interval * self.interval
+        with self._lock:
+            if self._bucket is not None:
+                buckets = np.maximum(buckets, self._bucket)
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+            group_buckets = buckets[starts]
+            counts = np.diff(np.append(starts, len(buckets))).astype(float)
+            finite = ~np.isnan(values)
+            mins = np.fmin.reduceat(values, starts, axis=1)
+            maxs = np.fmax.reduceat(values, starts, axis=1)
+            sums = np.add.reduceat(np.where(finite, values, 0.0), starts, axis=1)
+            valid = np.add.reduceat(finite, starts, axis=1).astype(float)
+
+            if self._count and group_buckets[0] == self._bucket:
+                mins[:, 0] = np.fmin(mins[:, 0], self._min)
+                maxs[:, 0] = np.fmax(maxs[:, 0], self._max)
+                sums[:, 0] += self._sum
+                valid[:, 0] += self._valid
+                counts[0] += self._count
+            else:
+                self._close()
+
+            if len(starts) > 1:
+                self.buffer.extend(self._rows(group_buckets[:-1], counts[:-1], mins[:, :-1],
+                                              maxs[:, :-1], sums[:, :-1], valid[:, :-1]))
+            self._bucket = group_buckets[-1]
+            self._count = int(counts[-1])
+            self._min[:], self._max[:], self._sum[:] = mins[:, -1], maxs[:, -1], sums[:, -1]
+            self._valid[:] = valid[:, -1]
+
+    def query(self, start: Optional[float] = None,
+              end: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Buckets starting in [start, end), including the open one
+
+        The range is located on a view of the buffer and only those rows
+        are copied, so a short query on a long tier stays cheap.
+        """
+        first = None if start is None else start // self.interval * self.interval
+        with self._lock:
+            # Writers hold the lock too, so the view is stable until we copy
+            _, window = self.buffer.window()
+            timestamps = window['timestamp']
+            lo = 0 if first is None else int(np.searchsorted(timestamps, first))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, 'left'))
+            columns = {name: values[lo:hi].copy() for name, values in window.items()}
+            if (self._count and (first is None or self._bucket >= first)
+                    and (end is None or self._bucket < end)):
+                open_row = self._open_row()
+                columns = {name: np.append(values, open_row[i])
+                           for i, (name, values) in enumerate(columns.items())}
+        return columns
+
+
+class Rollups:
+    """The rollup tiers of one sample stream, updated together"""
+
+    def __init__(self, signals: Sequence[str], tiers=TIERS):
+        self.signals = tuple(signals)
+        self.tiers = [RollupTier(name, interval, self.signals, capacity)
+                      for name, interval, capacity in tiers]
+
+    def add(self, timestamp: float, values: np.ndarray):
+        for tier in self.tiers:
+            tier.add(timestamp, values)
+
+    def add_block(self, timestamps: np.ndarray, values: np.ndarray):
+        for tier in self.tiers:
+            tier.add_block(timestamps, values)
+
+    def tier_for(self, span: float, max_points: int) -> RollupTier:
+        """
+        Finest tier covering ``span`` seconds in at most ``max_points``
+        buckets and retaining that far back
+        """
+        for tier in self.tiers:
+            if span / tier.interval <= max_points and tier.interval * tier.buffer.capacity >= span:
+                return tier
+        return self.tiers[-1]
@@ -0,0 +1,449 @@
+"""
+Persistent time-series historian for process samples
+Append-only columnar segment files, memory-mapped for range reads
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+
+class Segment:
+    """
+    Samples whose timestamps fall in [start, start + segment_seconds)
+
+    While it receives data, each column is a raw float64 file
+    ``<start>/<column>.f64`` that only ever grows. Once the historian has
+    moved past it, the segment is compacted into one immutable
+    ``<start>.npy`` holding a (columns, samples) array. Either way reads are
+    memory-mapped views, so slicing a segment never parses or copies it.
+
+    Files are opened only for the duration of an append or mapped per
+    read, never held, so an idle segment costs no file descriptors (each
+    mapping keeps one until it is released).
+    """
+
+    def __init__(self, root: str, start: int, columns: Tuple[str, ...]):
+        self.start = start
+        self.columns = columns
+        self.dir = os.path.join(root, str(start))
+        self.sealed_path = os.path.join(root, f'{start}.npy')
+        # (columns, samples) of the compacted file; None until sealed
+        self.shape: Optional[Tuple[int, int]] = None
+        # Samples the writer has fully appended to every column file
+        self._written = 0
+
+        if os.path.exists(self.sealed_path):
+            self.shape = self._sealed_data().shape
+
+    @property
+    def sealed(self) -> bool:
+        return self.shape is not None
+
+    def _sealed_data(self) -> np.ndarray:
+        return np.load(self.sealed_path, mmap_mode='r')
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.dir, f'{name}.f64')
+
+    def _length(self) -> int:
+        """Samples fully written to every column file"""
+        sizes = [os.path.getsize(self._column_path(name)) if os.path.exists(self._column_path(name)) else 0
+                 for name in self.columns]
+        return min(sizes) // 8
+
+    def __len__(self) -> int:
+        return self.shape[1] if self.sealed else self._length()
+
+    def prepare(self):
+        """Make the segment ready for appends, dropping any torn tail"""
+        os.makedirs(self.dir, exist_ok=True)
+        self._written = self._length()
+        self.append(np.empty((len(self.columns), 0)))
+
+    def append(self, block: np.ndarray):
+        """Append a (columns, n) block, one open-write-close per column"""
+        end = self._written * 8
+        for name, column in zip(self.columns, block):
+            with open(self._column_path(name), 'ab') as f:
+                # A failed earlier append may have left some columns longer
+                if f.tell() != end:
+                    f.truncate(end)
+                f.write(np.ascontiguousarray(column).tobytes())
+        self._written += block.shape[1]
+
+    def view(self) -> Dict[str, np.ndarray]:
+        """Read-only column views of every sample in the segment"""
+        if self.sealed:
+            data = self._sealed_data()
+            return {name: data[i] for i, name in enumerate(self.columns)}
+        length = self._length()
+        if length == 0:
+            return {name: np.empty(0) for name in self.columns}
+        return {name: np.memmap(self._column_path(name), dtype=np.float64, mode='r', shape=(length,))
+                for name in self.columns}
+
+    def compact(self) -> str:
+        """Write the column files into one .npy; returns the temp path to install"""
+        columns = self.view()
+        length = len(columns[self.columns[0]])
+        tmp_path = f'{self.sealed_path}.{os.getpid()}.tmp'
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64,
+                                        shape=(len(self.columns), length))
+        for i, name in enumerate(self.columns):
+            out[i] = columns[name]
+        out.flush()
+        del out
+        return tmp_path
+
+    def install(self, tmp_path: str):
+        """Swap in a compacted file and remove the column files"""
+        os.replace(tmp_path, self.sealed_path)
+        self.shape = self._sealed_data().shape
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def remove(self):
+        if os.path.exists(self.sealed_path):
+            os.remove(self.sealed_path)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self) * len(self.columns) * 8
+
+
+class Historian:
+    """
+    Single-writer store of every sample, partitioned into time segments
+
+    Samples are staged in memory and written out in blocks of up to
+    ``flush_rows`` (or every ``flush_interval`` seconds), one sequential
+    write per column, so ingest costs a few array stores per sample.
+    Column files are opened only while a block is written, so a historian
+    holds no file descriptors between flushes however many are open.
+    Timestamps must not go backwards; late samples are counted and dropped.
+    Because they are sorted, a time range is located by binary search and
+    returned as views of the memory-mapped segment files. Reads never force
+    a flush: samples still staged are read from memory alongside the files.
+
+    Only a range lying within one segment (a UTC day by default) and
+    entirely on disk is zero-copy. Ranges that span segments, such as a
+    rolling 24 h window, or that reach into the staged samples are
+    concatenated into new arrays; iter_days gives the same data as
+    per-segment views without copying.
+
+    Segments the writer has left are compacted into a single file in the
+    background. With ``retention_seconds`` set, segments that end before
+    the newest sample minus the retention period are deleted.
+    """
+
+    def __init__(self, root: str, columns: Sequence[str], time_column: str = 'timestamp',
+                 segment_seconds: int = DAY, retention_seconds: Optional[float] = None,
+                 flush_rows: int = 4096, flush_interval: float = 1.0):
+        self.root = root
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.time_column = time_column
+        self._time_index = self.columns.index(time_column)
+        self.segment_seconds = int(segment_seconds)
+        self.retention_seconds = retention_seconds
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+
+        os.makedirs(root, exist_ok=True)
+        self._check_layout()
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compactions: List[threading.Thread] = []
+        self._segments: Dict[int, Segment] = self._load_segments()
+        self._active: Optional[Segment] = None
+        self._staging = np.empty((len(self.columns), flush_rows))
+        self._staged = 0
+        self._last_flush = time.monotonic()
+
+        self.last_timestamp = -np.inf
+        if self._segments:
+            newest = self._segments[max(self._segments)].view()[time_column]
+            if len(newest):
+                self.last_timestamp = float(newest[-1])
+
+        self.appended = 0
+        self.out_of_order = 0
+        self.copying_queries = 0
+
+        # Anything left as column files other than the newest segment
+        # belongs to a previous run
+        self._compact_in_background()
+
+    def _check_layout(self):
+        """Refuse to mix segments written with different columns"""
+        meta_path = os.path.join(self.root, 'historian.json')
+        meta = {'columns': list(self.columns), 'segment_seconds': self.segment_seconds}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                existing = json.load(f)
+            if existing != meta:
+                raise ValueError(f"Historian at {self.root} was written with {existing}, not {meta}")
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+
+    def _load_segments(self) -> Dict[int, Segment]:
+        segments = {}
+        for entry in os.listdir(self.root):
+            if entry.endswith('.tmp'):
+                # Interrupted compaction; the column files are still there
+                os.remove(os.path.join(self.root, entry))
+                continue
+            stem = entry[:-len('.npy')] if entry.endswith('.npy') else entry
+            if stem.isdigit() and int(stem) not in segments:
+                segments[int(stem)] = Segment(self.root, int(stem), self.columns)
+        for segment in segments.values():
+            if segment.sealed and os.path.isdir(segment.dir):
+                # Crashed between installing the compacted file and cleanup
+                shutil.rmtree(segment.dir, ignore_errors=True)
+        return segments
+
+    def _segment_start(self, timestamp: float) -> int:
+        return int(timestamp // self.segment_seconds) * self.segment_seconds
+
+    def append(self, values: Sequence[float]) -> bool:
+        """Append one sample given in column order; False if it was dropped"""
+        timestamp = values[self._time_index]
+        with self._lock:
+            if timestamp < self.last_timestamp:
+                self.out_of_order += 1
+                return False
+            start = self._segment_start(timestamp)
+            self.last_timestamp = timestamp
+            if self._active is None or start != self._active.start:
+                self._roll(start)
+            self._staging[:, self._staged] = values
+            self._staged += 1
+            self.appended += 1
+            if (self._staged == self.flush_rows
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush()
+        return True
+
+    def append_row(self, row: Dict[str, float]) -> bool:
+        """Append one sample given as a column -> value mapping"""
+        return self.append([row[name] for name in self.columns])
+
+    def append_block(self, block: np.ndarray) -> int:
+        """
+        Append samples given as a (columns, n) array, oldest first
+
+        Returns how many were stored; samples older than their predecessor
+        are dropped.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        with self._lock:
+            timestamps = block[self._time_index]
+            previous = np.maximum.accumulate(np.concatenate(([self.last_timestamp], timestamps)))[:-1]
+            keep = timestamps >= previous
+            if not keep.all():
+                self.out_of_order += int((~keep).sum())
+                block = block[:, keep]
+                timestamps = block[self._time_index]
+            if not len(timestamps):
+                return 0
+
+            self._flush()
+            starts = (timestamps // self.segment_seconds).astype(np.int64) * self.segment_seconds
+            edges = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1, [len(starts)]))
+            for lo, hi in zip(edges[:-1], edges[1:]):
+                if self._active is None or int(starts[lo]) != self._active.start:
+                    self.last_timestamp = float(timestamps[lo])
+                    self._roll(int(starts[lo]))
+                self._active.append(block[:, lo:hi])
+
+            self.last_timestamp = float(timestamps[-1])
+            self.appended += len(timestamps)
+            self._last_flush = time.monotonic()
+        return len(timestamps)
+
+    def _flush(self):
+        if self._staged:
+            self._active.append(self._staging[:, :self._staged])
+            self._staged = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        """Write staged samples out to the segment files"""
+        with self._lock:
+            self._flush()
+
+    def _roll(self, start: int):
+        """Move the writer to the segment starting at ``start``"""
+        self._flush()
+
+        previous = self._active
+        self._active = self._segments.get(start)
+        if self._active is None:
+            self._active = self._segments[start] = Segment(self.root, start, self.columns)
+        self._active.prepare()
+
+        if previous is not None:
+            logger.info(f"Historian segment {previous.start} closed with {len(previous)} samples")
+        self._expire()
+        self._compact_in_background()
+
+    def _expire(self):
+        """Delete segments entirely older than the retention period"""
+        if self.retention_seconds is None:
+            return
+        horizon = self.last_timestamp - self.retention_seconds
+        for start in sorted(self._segments):
+            segment = self._segments[start]
+            if segment is self._active or start + self.segment_seconds > horizon:
+                break
+            del self._segments[start]
+            segment.remove()
+            logger.info(f"Historian segment {start} expired")
+
+    def _compact_in_background(self):
+        thread = threading.Thread(target=self.compact)
+        thread.daemon = True
+        thread.start()
+        self._compactions = [t for t in self._compactions if t.is_alive()] + [thread]
+
+    def compact(self) -> int:
+        """Compact every segment the writer has left; returns how many"""
+        compacted = 0
+        with self._compact_lock:
+            while True:
+                with self._lock:
+                    newest = max(self._segments, default=None)
+                    pending = [segment for start, segment in sorted(self._segments.items())
+                               if not segment.sealed and segment is not self._active
+                               and (self._active is not None or start != newest)]
+                if not pending:
+                    return compacted
+                for segment in pending:
+                    # The segment no longer changes, so copy it unlocked
+                    tmp_path = segment.compact()
+                    with self._lock:
+                        if self._segments.get(segment.start) is segment:
+                            segment.install(tmp_path)
+                            compacted += 1
+                        else:
+                            os.remove(tmp_path)
+
+    def _staged_view(self) -> Optional[Dict[str, np.ndarray]]:
+        """Copy of the samples not yet written out; caller holds the lock"""
+        if not self._staged:
+            return None
+        staged = self._staging[:, :self._staged].copy()
+        return {name: staged[i] for i, name in enumerate(self.columns)}
+
+    def _ranges(self, start: Optional[float], end: Optional[float]) -> List[Dict[str, np.ndarray]]:
+        """
+        Column views of samples with start <= timestamp < end, one per
+        segment, then one for the staged samples
+        """
+        with self._lock:
+            views = [segment.view() for first, segment in sorted(self._segments.items())
+                     if (start is None or first + self.segment_seconds > start)
+                     and (end is None or first < end)]
+            # Staged samples are the newest and belong to the active segment
+            staged = self._staged_view()
+            if staged is not None:
+                views.append(staged)
+
+        ranges = []
+        for view in views:
+            timestamps = view[self.time_column]
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, 'left'))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, 'left'))
+            if hi > lo:
+                ranges.append({name: values[lo:hi] for name, values in view.items()})
+        return ranges
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Samples with ``start <= timestamp < end`` (open-ended when None)
+
+        Returns read-only views into a segment file when the range lies
+        within one segment and has been written out. Otherwise (the range
+        spans segments or includes staged samples) the parts are copied
+        into new arrays, and ``copying_queries`` counts it.
+        """
+        names = self.columns if columns is None else tuple(columns)
+        ranges = self._ranges(start, end)
+        if not ranges:
+            return {name: np.empty(0) for name in names}
+        if len(ranges) == 1:
+            return {name: ranges[0][name] for name in names}
+        self.copying_queries += 1
+        return {name: np.concatenate([part[name] for part in ranges]) for name in names}
+
+    def count(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        """Number of samples with ``start <= timestamp < end``, without reading them"""
+        return sum(len(part[self.time_column]) for part in self._ranges(start, end))
+
+    def iter_days(self, start: Optional[float] = None, end: Optional[float] = None):
+        """
+        Column views of ``query(start, end)``, one per segment and zero-copy,
+        followed by a copy of any staged samples
+        """
+        yield from self._ranges(start, end)
+
+    def tail(self, n: int) -> np.ndarray:
+        """Copy of the newest ``n`` samples as a (columns, n) array"""
+        with self._lock:
+            views = [self._segments[start].view() for start in sorted(self._segments, reverse=True)]
+            staged = self._staged_view()
+            if staged is not None:
+                views.insert(0, staged)
+
+        parts, remaining = [], n
+        for view in views:
+            if remaining <= 0:
+                break
+            length = len(view[self.time_column])
+            take = min(remaining, length)
+            if take:
+                parts.append(np.stack([view[name][length - take:] for name in self.columns]))
+                remaining -= take
+        if not parts:
+            return np.empty((len(self.columns), 0))
+        return np.concatenate(parts[::-1], axis=1)
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._active = None
+        # A compaction still running would race a historian reopened on the
+        # same root, which discards temp files it finds
+        for thread in self._compactions:
+            thread.join()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            segments = list(self._segments.values())
+            staged = self._staged
+        return {
+            'root': self.root,
+            'segments': len(segments),
+            'sealed_segments': sum(segment.sealed for segment in segments),
+            'samples': sum(len(segment) for segment in segments) + staged,
+            'bytes': sum(segment.nbytes for segment in segments),
+            'appended': self.appended,
+            'out_of_order': self.out_of_order,
+            'staged': staged,
+            'copying_queries': self.copying_queries,
+            'last_timestamp': None if np.isinf(self.last_timestamp) else self.last_timestamp,
+            'retention_seconds': self.retention_seconds
+        }
@@ -0,0 +1,241 @@
+"""
+Background job queue for long-running optimizations
+Bounded worker pool with a queue-depth limit, single-flight deduplication of
+identical in-flight requests, status polling and cancellation
+"""
+
+import uuid
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a submission would exceed the queue-depth limit"""
+
+
+class Job:
+    """One submitted unit of work and its outcome"""
+
+    def __init__(self, kind: str, key: Optional[str], params: Dict,
+                 labels: Optional[Dict] = None, lane: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.params = params
+        self.labels = labels or {}
+        self.lane = lane
+        self.status = QUEUED
+        self.submissions = 1
+        self.submitted_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        self._finished = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished; False on timeout"""
+        return self._finished.wait(timeout)
+
+    def to_dict(self, include_result: bool = False) -> Dict:
+        info = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'labels': self.labels,
+            'status': self.status,
+            'submissions': self.submissions,
+            'submitted_at': self.submitted_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'error': self.error
+        }
+        if include_result:
+            info['result'] = self.result
+        return info
+
+
+class JobQueue:
+    """
+    Thread pool front end that never blocks the submitting thread
+
+    At most ``max_workers`` jobs run at once and at most ``max_pending``
+    jobs may be queued or running; further submissions raise
+    QueueFullError. A submission whose ``key`` matches a queued or running
+    job joins that job instead of starting another run. Jobs sharing a
+    ``lane`` run one at a time, in submission order, for work that must not
+    overlap (e.g. solves on one optimizer); a job waiting for its lane does
+    not hold a worker. Finished jobs are kept for polling until ``history``
+    newer ones have finished.
+
+    Only queued jobs can be cancelled: the optimizers have no safe point at
+    which a running solve could be interrupted.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, history: int = 100):
+        if max_workers < 1 or max_pending < 1:
+            raise ValueError("max_workers and max_pending must be positive")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.history = history
+
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='optimizer-job')
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._inflight: Dict[str, Job] = {}
+        self._pending = 0
+        # Busy lanes, each with the jobs waiting for it
+        self._lanes: Dict[str, deque] = {}
+
+        self.deduplicated = 0
+        self.rejected = 0
+
+    def submit(self, func: Callable, kind: str = 'job', key: Optional[str] = None,
+               labels: Optional[Dict] = None, lane: Optional[str] = None,
+               **params) -> Tuple[Job, bool]:
+        """
+        Queue ``func(**params)`` and return (job, deduplicated)
+
+        ``deduplicated`` is True when an identical in-flight job was joined.
+        ``labels`` are stored on the job for filtering, e.g. by line.
+        """
+        with self._lock:
+            if key is not None and key in self._inflight:
+                job = self._inflight[key]
+                job.submissions += 1
+                self.deduplicated += 1
+                return job, True
+
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise QueueFullError(f"{self._pending} jobs pending (limit {self.max_pending})")
+
+            job = Job(kind, key, params, labels, lane)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._inflight[key] = job
+            self._pending += 1
+            if lane is None:
+                self._dispatch(job, func, params)
+            elif lane in self._lanes:
+                self._lanes[lane].append((job, func, params))
+            else:
+                self._lanes[lane] = deque()
+                self._dispatch(job, func, params)
+
+        logger.info(f"Queued {kind} job {job.id}")
+        return job, False
+
+    def _dispatch(self, job: Job, func: Callable, params: Dict):
+        """Hand a job to the pool; caller holds the lock"""
+        job.future = self._executor.submit(self._run, job, func, params)
+
+    def _release_lane(self, lane: str):
+        """Start the next job waiting for ``lane``, or free it; caller holds the lock"""
+        waiting = self._lanes[lane]
+        if waiting:
+            self._dispatch(*waiting.popleft())
+        else:
+            del self._lanes[lane]
+
+    def _run(self, job: Job, func: Callable, params: Dict):
+        with self._lock:
+            if job.status != QUEUED:
+                return
+            job.status = RUNNING
+            job.started_at = datetime.now()
+
+        try:
+            result = func(**params)
+            status, error = DONE, None
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            result, status, error = None, FAILED, str(e)
+
+        with self._lock:
+            job.result, job.error = result, error
+            self._finish(job, status)
+
+    def _finish(self, job: Job, status: str):
+        """Record a terminal status; caller holds the lock"""
+        job.status = status
+        job.finished_at = datetime.now()
+        self._pending -= 1
+        if job.key is not None and self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+        if job.lane is not None and job.future is not None:
+            # The lane's dispatched job is done; a waiting one never held it
+            self._release_lane(job.lane)
+        job._finished.set()
+
+        finished = [job_id for job_id, other in self._jobs.items() if other.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job; False if it is unknown, running or finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return False
+            if job.future is None:
+                # Still waiting for its lane
+                self._lanes[job.lane] = deque(entry for entry in self._lanes[job.lane]
+                                              if entry[0] is not job)
+            elif not job.future.cancel():
+                return False
+            self._finish(job, CANCELLED)
+        logger.info(f"Cancelled job {job_id}")
+        return True
+
+    def jobs(self) -> List[Job]:
+        """Known jobs, oldest first"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'busy_lanes': len(self._lanes),
+                'waiting_for_lane': sum(len(waiting) for waiting in self._lanes.values()),
+                'deduplicated': self.deduplicated,
+                'rejected': self.rejected,
+                'by_status': counts
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Cancel queued jobs and stop the pool"""
+        with self._lock:
+            # Lane-waiting jobs first, so cancelling a lane's job starts nothing
+            for waiting in self._lanes.values():
+                while waiting:
+                    self._finish(waiting.popleft()[0], CANCELLED)
+            for job in list(self._jobs.values()):
+                if job.status == QUEUED and job.future.cancel():
+                    self._finish(job, CANCELLED)
+        self._executor.shutdown(wait=wait)
@@ -4,25 +4,42 @@ Real-time optimization system for corn processing acid chemistry
 """
 
 import numpy as np
-import pandas as pd
-from scipy.optimize import minimize, differential_evolution
-from scipy.integrate import odeint
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Tuple, Optional, Union
 import json
+import os
+import argparse
+import hashlib
+from collections import OrderedDict
+from functools import partial
+from contextlib import nullcontext
+
+from result_cache import OptimizationCache, problem_key
+from pareto import nsga2
+from parallel import get_map, map_batches
+from kinetics import integrate_hydrolysis
+from profiling import OptimizationProfiler
+
+# pandas and scipy.optimize dominate import time; they are imported on the
+# code paths that use them so that workers and the web app start quickly
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+DEFAULT_OUTPUT_DIR = '/projects/corn-optimizer'
+
 class CornProcessOptimizer:
     """
     Multi-objective optimization system for corn processing acid set points
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[OptimizationCache] = None,
+                 workers: Union[int, Callable] = 1,
+                 profiler: Optional[OptimizationProfiler] = None):
         self.process_params = {
             'k0': 2.5e6,  # Pre-exponential factor
             'Ea': 85000,  # Activation energy (J/mol)
@@ -57,6 +74,82 @@ class CornProcessOptimizer:
         
         self.current_setpoints = {}
         self.process_data = []
+
+        # Last converged optimum and DE population, reused for warm starts
+        self._warm_state: Optional[Dict] = None
+
+        # Optional result cache in front of optimize_setpoints
+        self.cache = cache
+
+        # Non-dominated set from the last optimize_pareto run
+        self.pareto_front: Optional[Dict] = None
+
+        # Solver options when batch conversion integrates the hydrolysis
+        # ODE instead of using the closed form; None = closed form
+        self.ode_kinetics: Optional[Dict] = None
+
+        # Response surfaces from sweep(), keyed by grid spec
+        self._sweep_cache: 'OrderedDict[str, Dict]' = OrderedDict()
+
+        # Population scoring parallelism: 1 = serial, N or -1 = shared
+        # process pool of N / all cores, or any map-like callable
+        self.workers = workers
+
+        # Optional instrumentation; every hook is skipped when this is None
+        self.profiler = profiler
+
+    # Run-time state that stays in the parent process when the optimizer is
+    # pickled to pool workers; only the problem definition is shipped
+    _UNPICKLED_ATTRS = ('cache', 'process_data', '_warm_state', 'pareto_front',
+                        '_sweep_cache', 'workers', 'profiler')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in self._UNPICKLED_ATTRS:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cache = None
+        self.process_data = []
+        self._warm_state = None
+        self.pareto_front = None
+        self._sweep_cache = OrderedDict()
+        self.workers = 1
+        self.profiler = None
+
+    def enable_profiling(self, history: int = 20) -> OptimizationProfiler:
+        """Attach a profiler; optimization results then carry a 'profile' entry"""
+        if self.profiler is None:
+            self.profiler = OptimizationProfiler(history)
+        return self.profiler
+
+    def disable_profiling(self):
+        """Detach the profiler so instrumentation costs nothing"""
+        self.profiler = None
+
+    def _phase(self, name: str):
+        """Profiler phase context, or a no-op when profiling is disabled"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.phase(name)
+
+    def _profiled(self, label: str, func: Callable, *args, **kwargs) -> Dict:
+        """Run an optimization entry point as one profiled run"""
+        if self.profiler is None:
+            return func(*args, **kwargs)
+
+        self.profiler.start_run(label)
+        result = {}
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            details = result.get('optimization_details', {}) if result else {}
+            profile = self.profiler.end_run(mode=details.get('mode'))
+        if result:
+            result['profile'] = profile
+        return result
         
     def hydrolysis_kinetics(self, starch_conc: float, t: float, 
                            acid_conc: float, temperature: float) -> float:
@@ -148,6 +241,9 @@ class CornProcessOptimizer:
         """
         Multi-objective optimization function
         """
+        if self.profiler is not None:
+            self.profiler.count_evaluations(1)
+
         yield_val = self.yield_function(variables)
         quality_val = self.quality_function(variables)
         cost_val = self.cost_function(variables)
@@ -163,6 +259,304 @@ class CornProcessOptimizer:
         
         return objective
     
+    def _exact_conversion_batch(self, acid_conc: np.ndarray, temperature: np.ndarray,
+                                residence_time: np.ndarray) -> np.ndarray:
+        """
+        Closed-form calculate_conversion over arrays of process conditions
+        """
+        T_kelvin = temperature + 273.15
+        k = self.process_params['k0'] * np.exp(-self.process_params['Ea'] /
+                                              (self.process_params['R'] * T_kelvin))
+
+        conversion = 1 - np.exp(-k * (acid_conc ** self.process_params['n']) *
+                               residence_time * 60)
+        return np.minimum(conversion, 0.98)
+
+    def calculate_conversion_batch(self, acid_conc: np.ndarray, temperature: np.ndarray,
+                                   residence_time: np.ndarray) -> np.ndarray:
+        """
+        Vectorized calculate_conversion over arrays of process conditions
+
+        Integrates the hydrolysis ODE when ODE kinetics are enabled.
+        """
+        if self.ode_kinetics is not None:
+            conversion = self.simulate_kinetics(acid_conc, temperature, residence_time,
+                                                **self.ode_kinetics)['conversion']
+            return np.minimum(conversion, 0.98)
+        return self._exact_conversion_batch(acid_conc, temperature, residence_time)
+
+    def simulate_kinetics(self, acid_conc, temperature, residence_time,
+                          breakpoints: Optional[List[float]] = None,
+                          interpolation: str = 'hold',
+                          method: str = 'auto',
+                          samples: Optional[int] = None,
+                          **solver_options) -> Dict:
+        """
+        Integrate hydrolysis_kinetics for a batch of condition sets
+
+        acid_conc and temperature are constant per condition set, or
+        piecewise setpoint profiles of shape (N, len(breakpoints)) with
+        breakpoints given as fractions of each residence time (minutes).
+        See kinetics.integrate_hydrolysis for the solver choices and the
+        returned conversion, starch trajectory and solver statistics.
+        """
+        return integrate_hydrolysis(
+            self.hydrolysis_kinetics, acid_conc, temperature, residence_time,
+            breakpoints=breakpoints, interpolation=interpolation, method=method,
+            samples=samples, **solver_options
+        )
+
+    def enable_ode_kinetics(self, method: str = 'auto', **solver_options):
+        """
+        Score batch conversion by integrating the hydrolysis ODE
+
+        The optimizers, sweeps and Pareto search then run on the integrated
+        kinetics rather than the closed form; scalar calculate_conversion
+        is unaffected.
+        """
+        self.ode_kinetics = {'method': method, **solver_options}
+
+    def disable_ode_kinetics(self):
+        """Go back to the closed-form conversion for batch queries"""
+        self.ode_kinetics = None
+
+    @staticmethod
+    def _unpack_candidates(candidates) -> Tuple[np.ndarray, ...]:
+        """
+        Split candidates into acid_conc, temperature, residence_time and
+        flow_rate arrays
+
+        Accepts an (..., 4) array, or a tuple of four arrays that broadcast
+        against each other (used by sweeps to avoid materializing the grid).
+        """
+        if isinstance(candidates, tuple):
+            return tuple(np.asarray(column, dtype=float) for column in candidates)
+        return tuple(np.moveaxis(np.asarray(candidates, dtype=float), -1, 0))
+
+    def yield_function_batch(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Calculate process yield for an (N, 4) candidate matrix
+        """
+        acid_conc, temperature, residence_time, flow_rate = self._unpack_candidates(candidates)
+        conversion = self.calculate_conversion_batch(acid_conc, temperature, residence_time)
+
+        selectivity = 0.95 - 0.1 * np.maximum(0, (acid_conc - 1.5) / 1.0) - \
+                     0.05 * np.maximum(0, (temperature - 80) / 15)
+
+        return conversion * selectivity
+
+    def quality_function_batch(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Calculate product quality score (0-100) for an (N, 4) candidate matrix
+        """
+        acid_conc, temperature, residence_time, flow_rate = self._unpack_candidates(candidates)
+
+        degradation = 0.1 * np.maximum(0, (acid_conc - 1.8) / 0.7) + \
+                     0.15 * np.maximum(0, (temperature - 85) / 10) + \
+                     0.05 * np.maximum(0, (residence_time - 90) / 30)
+
+        quality = 100 - (degradation * 100)
+        return np.maximum(quality, 70)
+
+    def cost_function_batch(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Calculate operating cost ($/ton) for an (N, 4) candidate matrix
+        """
+        acid_conc, temperature, residence_time, flow_rate = self._unpack_candidates(candidates)
+
+        acid_cost = acid_conc * 12.5
+        energy_cost = (temperature - 25) * 0.8
+        time_cost = residence_time * 0.15
+
+        return acid_cost + energy_cost + time_cost
+
+    def safety_function_batch(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Calculate safety margin (higher is safer) for an (N, 4) candidate matrix
+        """
+        acid_conc, temperature, residence_time, flow_rate = self._unpack_candidates(candidates)
+
+        acid_margin = (self.safety_limits['acid_conc_max'] - acid_conc) / \
+                     self.safety_limits['acid_conc_max']
+        temp_margin = (self.safety_limits['temp_max'] - temperature) / \
+                     self.safety_limits['temp_max']
+
+        pH_approx = -np.log10(acid_conc)
+        pH_margin = (pH_approx - self.safety_limits['pH_min']) / 2.5
+
+        safety_score = 100 * np.minimum(np.minimum(acid_margin, temp_margin), pH_margin)
+        return np.maximum(safety_score, 0)
+
+    def objective_function_batch(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Multi-objective optimization function for an (N, 4) candidate matrix
+        """
+        candidates = self._unpack_candidates(candidates)
+        if self.profiler is None:
+            yield_val = self.yield_function_batch(candidates)
+            quality_val = self.quality_function_batch(candidates)
+            cost_val = self.cost_function_batch(candidates)
+            safety_val = self.safety_function_batch(candidates)
+        else:
+            timed = self.profiler.timed
+            yield_val = timed('yield_function', self.yield_function_batch, candidates)
+            quality_val = timed('quality_function', self.quality_function_batch, candidates)
+            cost_val = timed('cost_function', self.cost_function_batch, candidates)
+            safety_val = timed('safety_function', self.safety_function_batch, candidates)
+
+        return (
+            -self.weights['yield'] * yield_val +
+            -self.weights['quality'] * (quality_val / 100) +
+            self.weights['cost'] * (cost_val / 50) +
+            -self.weights['safety'] * (safety_val / 100)
+        )
+
+    def objective_gradient_batch(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Analytic gradient of objective_function for an (N, 4) candidate matrix
+
+        Differentiates the closed-form model term by term. At the kinks of
+        the max/min clauses the gradient of the active branch is returned,
+        and capped conversion or floored quality/safety contribute zero.
+        """
+        acid_conc, temperature, residence_time, flow_rate = self._unpack_candidates(candidates)
+        gradient = np.zeros(np.broadcast(acid_conc, temperature, residence_time).shape + (4,))
+        ln10 = np.log(10)
+
+        # Yield: conversion (1 - exp(-z)) times selectivity
+        T_kelvin = temperature + 273.15
+        k = self.process_params['k0'] * np.exp(-self.process_params['Ea'] /
+                                              (self.process_params['R'] * T_kelvin))
+        z = k * acid_conc ** self.process_params['n'] * residence_time * 60
+        conversion = 1 - np.exp(-z)
+        uncapped = conversion < 0.98
+        conversion = np.minimum(conversion, 0.98)
+        dconv_dz = np.where(uncapped, np.exp(-z), 0.0)
+        dconv_da = dconv_dz * z * self.process_params['n'] / acid_conc
+        dconv_dT = dconv_dz * z * self.process_params['Ea'] / (self.process_params['R'] * T_kelvin ** 2)
+        dconv_dt = dconv_dz * z / residence_time
+
+        selectivity = 0.95 - 0.1 * np.maximum(0, (acid_conc - 1.5) / 1.0) - \
+                     0.05 * np.maximum(0, (temperature - 80) / 15)
+        dsel_da = np.where(acid_conc > 1.5, -0.1, 0.0)
+        dsel_dT = np.where(temperature > 80, -0.05 / 15, 0.0)
+
+        w_yield = -self.weights['yield']
+        gradient[..., 0] += w_yield * (dconv_da * selectivity + conversion * dsel_da)
+        gradient[..., 1] += w_yield * (dconv_dT * selectivity + conversion * dsel_dT)
+        gradient[..., 2] += w_yield * dconv_dt * selectivity
+
+        # Quality: 100 - 100 * degradation, floored at 70
+        quality = 100 - 100 * (0.1 * np.maximum(0, (acid_conc - 1.8) / 0.7) +
+                               0.15 * np.maximum(0, (temperature - 85) / 10) +
+                               0.05 * np.maximum(0, (residence_time - 90) / 30))
+        w_quality = -self.weights['quality'] / 100 * np.where(quality > 70, -100.0, 0.0)
+        gradient[..., 0] += w_quality * np.where(acid_conc > 1.8, 0.1 / 0.7, 0.0)
+        gradient[..., 1] += w_quality * np.where(temperature > 85, 0.15 / 10, 0.0)
+        gradient[..., 2] += w_quality * np.where(residence_time > 90, 0.05 / 30, 0.0)
+
+        # Cost is linear
+        w_cost = self.weights['cost'] / 50
+        gradient[..., 0] += w_cost * 12.5
+        gradient[..., 1] += w_cost * 0.8
+        gradient[..., 2] += w_cost * 0.15
+
+        # Safety: 100 * smallest margin, floored at 0
+        acid_max = self.safety_limits['acid_conc_max']
+        temp_max = self.safety_limits['temp_max']
+        margins = np.stack(np.broadcast_arrays(
+            (acid_max - acid_conc) / acid_max,
+            (temp_max - temperature) / temp_max,
+            (-np.log10(acid_conc) - self.safety_limits['pH_min']) / 2.5
+        ))
+        active = np.argmin(margins, axis=0)
+        w_safety = -self.weights['safety'] / 100 * np.where(margins.min(axis=0) > 0, 100.0, 0.0)
+        gradient[..., 0] += w_safety * np.where(active == 0, -1 / acid_max,
+                                                np.where(active == 2, -1 / (2.5 * acid_conc * ln10), 0.0))
+        gradient[..., 1] += w_safety * np.where(active == 1, -1 / temp_max, 0.0)
+
+        return gradient
+
+    def objective_gradient(self, variables: List[float]) -> np.ndarray:
+        """
+        Analytic gradient of objective_function
+        """
+        return self.objective_gradient_batch(np.asarray(variables, dtype=float)[None, :])[0]
+
+    def _vectorized_objective(self, x: np.ndarray,
+                              map_func: Optional[Callable] = None,
+                              batch_objective: Optional[Callable] = None) -> np.ndarray:
+        """
+        Adapter for differential_evolution(vectorized=True), which passes
+        candidates as a (4, S) array; with ``map_func`` the population is
+        scored in parallel chunks. ``batch_objective`` defaults to
+        objective_function_batch.
+        """
+        if batch_objective is None:
+            batch_objective = self.objective_function_batch
+        candidates = np.atleast_2d(x.T)
+        if self.profiler is not None:
+            self.profiler.count_evaluations(len(candidates))
+        return map_batches(batch_objective, candidates, map_func)
+
+    # Lowest acid concentration a disturbed sample is allowed to reach (M);
+    # keeps pH and the acid-order power defined in robust scoring
+    ROBUST_ACID_FLOOR = 1e-3
+
+    def disturbance_samples(self, n_samples: int = 64, seed: Optional[int] = 0) -> np.ndarray:
+        """
+        (K, 4) matrix of additive disturbances on acid_conc, temperature,
+        residence_time and flow_rate, drawn with DISTURBANCE_SCALES
+        """
+        rng = np.random.default_rng(seed)
+        noise = np.zeros((n_samples, 4))
+        noise[:, [0, 1, 3]] = rng.normal(0, self.DISTURBANCE_SCALES, size=(n_samples, 3))
+        return noise
+
+    def robust_objective_batch(self, candidates: np.ndarray, noise: np.ndarray,
+                               statistic: Union[str, float] = 'mean') -> np.ndarray:
+        """
+        Objective of an (S, 4) candidate matrix under K disturbance samples
+
+        Every candidate sees the same ``noise`` rows (common random numbers),
+        and the whole S x K block is scored in one vectorized call before
+        being reduced along K by ``statistic``: 'mean' for the expected
+        objective, or a percentile in [0, 100] (e.g. 90 for a pessimistic
+        robust optimum, since the objective is minimized).
+        """
+        candidates = np.asarray(candidates, dtype=float)
+        disturbed = candidates[:, None, :] + noise[None, :, :]
+        disturbed[..., 0] = np.maximum(disturbed[..., 0], self.ROBUST_ACID_FLOOR)
+
+        objective = self.objective_function_batch(disturbed)
+        if statistic == 'mean':
+            return objective.mean(axis=1)
+        return np.percentile(objective, float(statistic), axis=1)
+
+    def performance_batch(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        (N, 4) matrix of yield, quality, cost and safety for an (N, 4) candidate matrix
+        """
+        candidates = self._unpack_candidates(candidates)
+        return np.column_stack([
+            self.yield_function_batch(candidates),
+            self.quality_function_batch(candidates),
+            self.cost_function_batch(candidates),
+            self.safety_function_batch(candidates)
+        ])
+
+    def objective_coefficients(self, weights: Optional[Dict] = None) -> np.ndarray:
+        """
+        Coefficients turning a performance_batch row into the weighted objective
+        """
+        weights = weights if weights is not None else self.weights
+        return np.array([
+            -weights['yield'],
+            -weights['quality'] / 100,
+            weights['cost'] / 50,
+            -weights['safety'] / 100
+        ])
+
     def constraint_functions(self, variables: List[float]) -> List[float]:
         """
         Define constraint violations
@@ -187,76 +581,611 @@ class CornProcessOptimizer:
         ]
         
         return constraints
-    
-    def optimize_setpoints(self) -> Dict:
+
+    def constraint_jacobian(self, variables: List[float]) -> np.ndarray:
         """
-        Perform multi-objective optimization
+        Analytic Jacobian of constraint_functions, one row per constraint
         """
-        logger.info("Starting optimization...")
-        
-        # Initial guess
-        x0 = [1.2, 75, 60, 200]  # acid_conc, temp, residence_time, flow_rate
-        
-        # Bounds for variables
-        bounds = [
+        acid_conc = variables[0]
+        jacobian = np.zeros((11, 4))
+
+        # Lower/upper bound pairs on each decision variable
+        for i in range(4):
+            jacobian[2 * i, i] = 1.0
+            jacobian[2 * i + 1, i] = -1.0
+
+        jacobian[8, 0] = -1.0
+        jacobian[9, 1] = -1.0
+        jacobian[10, 0] = -1 / (acid_conc * np.log(10))
+        return jacobian
+
+    def constraint_violation(self, variables: List[float]) -> float:
+        """Largest violation of constraint_functions (0 when feasible)"""
+        return float(max(0.0, -min(self.constraint_functions(variables))))
+    
+    # Relative problem drift below which the last optimum is only polished
+    # locally, and below which the last DE population seeds the next run
+    WARM_POLISH_TOL = 1e-3
+    WARM_START_TOL = 0.1
+
+    def _bounds(self) -> List[Tuple[float, float]]:
+        """Decision variable bounds: acid_conc, temperature, residence_time, flow_rate"""
+        return [
             self.constraints['acid_conc'],
             self.constraints['temperature'],
             self.constraints['residence_time'],
             self.constraints['flow_rate']
         ]
-        
-        # Constraint definitions for scipy
-        cons = {'type': 'ineq', 'fun': lambda x: self.constraint_functions(x)}
-        
-        # Optimization using differential evolution (global optimizer)
-        result = differential_evolution(
-            self.objective_function,
-            bounds,
+
+    def _problem_snapshot(self) -> Dict:
+        """Copy of everything that defines the optimization problem"""
+        return {
+            'process_params': dict(self.process_params),
+            'weights': dict(self.weights),
+            'constraints': {key: tuple(value) for key, value in self.constraints.items()},
+            'safety_limits': dict(self.safety_limits),
+            'ode_kinetics': dict(self.ode_kinetics) if self.ode_kinetics is not None else None
+        }
+
+    def _problem_drift(self, previous: Dict) -> float:
+        """
+        Largest relative change between a problem snapshot and the current problem
+
+        Scalars are compared relative to their old value, constraint bounds
+        relative to the old bound width. Added or removed keys count as an
+        unbounded change.
+        """
+        current = self._problem_snapshot()
+        if previous.get('ode_kinetics') != current['ode_kinetics']:
+            return np.inf
+        drift = 0.0
+
+        for group in ('process_params', 'weights', 'safety_limits'):
+            old, new = previous[group], current[group]
+            if old.keys() != new.keys():
+                return np.inf
+            for key, old_val in old.items():
+                scale = max(abs(old_val), 1e-12)
+                drift = max(drift, abs(new[key] - old_val) / scale)
+
+        old, new = previous['constraints'], current['constraints']
+        if old.keys() != new.keys():
+            return np.inf
+        for key, (old_lo, old_hi) in old.items():
+            new_lo, new_hi = new[key]
+            width = max(old_hi - old_lo, 1e-12)
+            drift = max(drift, abs(new_lo - old_lo) / width, abs(new_hi - old_hi) / width)
+
+        return drift
+
+    def _run_differential_evolution(self, bounds: List[Tuple[float, float]],
+                                    init='latinhypercube',
+                                    batch_objective: Optional[Callable] = None,
+                                    **options):
+        """
+        Global search; each generation is scored in a single vectorized pass
+
+        ``options`` override the differential_evolution settings below.
+        """
+        map_func = get_map(self.workers)
+        callback = None
+        if self.profiler is not None:
+            self.profiler.mark_generation_start()
+            callback = self.profiler.generation_callback
+
+        from scipy.optimize import differential_evolution
+
+        settings = dict(
+            args=(map_func, batch_objective),
             maxiter=100,
             popsize=15,
             atol=1e-6,
-            seed=42
+            seed=42,
+            init=init,
+            vectorized=True,
+            updating='deferred',
+            callback=callback
         )
+        settings.update(options)
+
+        with self._phase('differential_evolution'):
+            return differential_evolution(self._vectorized_objective, bounds, **settings)
+
+    # Short global stage of the hybrid solver; the constrained polish does
+    # the final convergence, so DE's own L-BFGS-B polish is skipped
+    HYBRID_DE_OPTIONS = {'maxiter': 15, 'popsize': 10, 'tol': 0.05, 'polish': False}
+    LOCAL_METHODS = ('SLSQP', 'trust-constr')
+    FEASIBILITY_TOL = 1e-8
+
+    def _polish_functions(self) -> Tuple[Callable, Union[Callable, str]]:
+        """
+        Objective and gradient for local polishing, on the model DE searched
+
+        The analytic gradient is that of the closed-form model. With ODE
+        kinetics enabled the batch objective is polished instead, with
+        finite-difference gradients.
+        """
+        if self.ode_kinetics is None:
+            return self.objective_function, self.objective_gradient
+
+        def objective(x):
+            return float(self._vectorized_objective(np.asarray(x, dtype=float)[:, None])[0])
+        return objective, '2-point'
+
+    def _check_feasible_region(self):
+        """
+        Raise ValueError when constraint_functions admit no point inside the
+        bounds
+
+        The safety constraints only bound acid_conc (directly and through
+        pH = -log10(acid_conc)) and temperature from above, so this is a
+        check of each upper limit against the lower bound.
+        """
+        acid_lo = self.constraints['acid_conc'][0]
+        temp_lo = self.constraints['temperature'][0]
+        acid_for_pH = 10 ** -self.safety_limits['pH_min']
+        conflicts = []
+        if self.safety_limits['acid_conc_max'] < acid_lo:
+            conflicts.append(f"acid_conc_max {self.safety_limits['acid_conc_max']:g} M "
+                             f"is below the acid_conc bound {acid_lo:g} M")
+        if acid_for_pH < acid_lo:
+            conflicts.append(f"pH_min {self.safety_limits['pH_min']:g} needs "
+                             f"acid_conc <= {acid_for_pH:.3g} M, below the acid_conc bound "
+                             f"{acid_lo:g} M (pH {-np.log10(acid_lo):.2f})")
+        if self.safety_limits['temp_max'] < temp_lo:
+            conflicts.append(f"temp_max {self.safety_limits['temp_max']:g} °C "
+                             f"is below the temperature bound {temp_lo:g} °C")
+        if conflicts:
+            raise ValueError("No setpoint satisfies the safety limits within the bounds: "
+                             + '; '.join(conflicts))
+
+    def _constrained_polish(self, x0: np.ndarray, local_method: str):
+        """
+        Local solve from ``x0`` with analytic gradients, enforcing every
+        constraint_functions entry as a hard inequality
+        """
+        from scipy.optimize import Bounds, minimize
+
+        constraint = {'type': 'ineq', 'fun': self.constraint_functions,
+                      'jac': self.constraint_jacobian}
+        lower, upper = np.array(self._bounds(), dtype=float).T
+        options = {'maxiter': 200}
+        if local_method == 'SLSQP':
+            options['ftol'] = 1e-12
+        else:
+            # The optimum usually sits on the box; the default barrier keeps
+            # the interior-point iterates too far from it to converge
+            options['initial_barrier_parameter'] = 1e-3
+
+        objective, gradient = self._polish_functions()
+        with self._phase('constrained_polish'):
+            result = minimize(
+                objective,
+                x0,
+                jac=gradient,
+                method=local_method,
+                # Iterates stay inside the box, where log10/pow are defined
+                bounds=Bounds(lower, upper, keep_feasible=True),
+                constraints=[constraint],
+                options=options
+            )
+        result.max_violation = self.constraint_violation(result.x)
+        result.feasible = result.max_violation <= self.FEASIBILITY_TOL
+        return result
+
+    def _hybrid_polish(self, result, local_method: str):
+        """
+        Polish a global result under hard constraints
+
+        The polished point replaces the global one if it is feasible. The
+        result only counts as a success when it is feasible, so infeasible
+        setpoints are never returned as a hybrid optimum.
+        """
+        polished = self._constrained_polish(result.x, local_method)
+        if polished.feasible:
+            result.x, result.fun = polished.x, float(polished.fun)
+        result.nfev = int(result.nfev) + int(polished.nfev)
+        result.njev = int(getattr(polished, 'njev', 0))
+        result.max_violation = self.constraint_violation(result.x)
+        result.feasible = result.max_violation <= self.FEASIBILITY_TOL
+        result.success = bool(result.feasible and np.isfinite(result.fun))
+        if not result.feasible:
+            logger.warning(f"Constrained polish found no feasible point "
+                           f"(violation {result.max_violation:.3g})")
+        return result
+
+    def _warm_solve(self, bounds: List[Tuple[float, float]],
+                    local_method: Optional[str] = None):
+        """
+        Re-optimize from the last converged state, or return None when the
+        problem has moved too far for a warm start to be trusted
+
+        With a ``local_method`` (hybrid mode) the polish enforces the hard
+        constraints and the warm DE stage is the short hybrid one.
+        """
+        if self._warm_state is None:
+            return None, 'cold'
+
+        drift = self._problem_drift(self._warm_state['problem'])
+        lower, upper = np.array(bounds, dtype=float).T
+        x_prev = np.clip(self._warm_state['x'], lower, upper)
+
+        if drift <= self.WARM_POLISH_TOL:
+            if local_method is not None:
+                result = self._constrained_polish(x_prev, local_method)
+                result.success = bool(result.success and result.feasible)
+                return result, 'polish'
+
+            from scipy.optimize import minimize
+
+            objective, gradient = self._polish_functions()
+            with self._phase('local_polish'):
+                result = minimize(
+                    objective,
+                    x_prev,
+                    jac=gradient,
+                    method='L-BFGS-B',
+                    bounds=bounds,
+                    options={'maxfun': 50}
+                )
+            return result, 'polish'
+
+        if drift <= self.WARM_START_TOL:
+            population = np.clip(self._warm_state['population'], lower, upper)
+            population[0] = x_prev
+            options = self.HYBRID_DE_OPTIONS if local_method is not None else {}
+            return self._run_differential_evolution(bounds, init=population, **options), 'warm'
+
+        return None, 'cold'
+
+    def optimize_setpoints(self, warm_start: bool = True, use_cache: bool = True,
+                           method: str = 'de', local_method: str = 'SLSQP') -> Dict:
+        """
+        Perform multi-objective optimization
+
+        ``method='de'`` runs differential evolution, where the safety limits
+        only act through safety_function. ``method='hybrid'`` runs a short DE
+        and then a gradient-based ``local_method`` polish (SLSQP or
+        trust-constr) with constraint_functions as hard constraints; the
+        details report its largest violation. Hybrid mode raises ValueError
+        when the safety limits leave no feasible point inside the bounds,
+        as the shipped pH_min of 1.8 does (0.1 M acid is already pH 1.0),
+        and fails rather than return infeasible setpoints.
+
+        With ``warm_start`` the last converged optimum and DE population are
+        reused when the problem (weights, constraints, safety limits, process
+        parameters) has only moved slightly since the previous solve: tiny
+        changes get a bounded local polish, small ones a DE run seeded with
+        the previous population. Anything larger falls back to a full search.
+
+        If a cache is attached, identical problems are answered from it
+        without solving. Only cold solves are stored: warm and polished
+        results depend on the solve history, and a cache hit must return
+        what a fresh solve of the problem would.
+        """
+        if method not in ('de', 'hybrid'):
+            raise ValueError("method must be 'de' or 'hybrid'")
+        if local_method not in self.LOCAL_METHODS:
+            raise ValueError(f"local_method must be one of {self.LOCAL_METHODS}")
+        if method == 'hybrid':
+            self._check_feasible_region()
+        return self._profiled('optimize_setpoints', self._optimize_setpoints,
+                              warm_start, use_cache, local_method if method == 'hybrid' else None)
+
+    def _optimize_setpoints(self, warm_start: bool, use_cache: bool,
+                            local_method: Optional[str]) -> Dict:
+        cache_key = None
+        if self.cache is not None and use_cache:
+            options = {} if local_method is None else {'hybrid': local_method}
+            cache_key = problem_key(self._problem_snapshot(), **options)
+            with self._phase('cache_lookup'):
+                cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached['optimization_details'] = {'mode': 'cache', 'function_evaluations': 0}
+                self.current_setpoints = cached
+                self._adopt_cached_optimum(cached)
+                logger.info("Optimization served from cache")
+                return cached
+
+        logger.info("Starting optimization...")
+        
+        # Bounds for variables
+        bounds = self._bounds()
+        hybrid = local_method is not None
+        
+        result, mode = (None, 'cold')
+        if warm_start:
+            result, mode = self._warm_solve(bounds, local_method)
+
+        if result is not None and hybrid and mode == 'warm':
+            result = self._hybrid_polish(result, local_method)
+
+        if result is None or not result.success:
+            # Optimization using differential evolution (global optimizer)
+            if hybrid:
+                result = self._hybrid_polish(
+                    self._run_differential_evolution(bounds, **self.HYBRID_DE_OPTIONS),
+                    local_method
+                )
+            else:
+                result = self._run_differential_evolution(bounds)
+            mode = 'cold'
         
         if result.success:
-            optimal_vars = result.x
-            acid_conc, temperature, residence_time, flow_rate = optimal_vars
-            
-            # Calculate performance metrics
-            yield_val = self.yield_function(optimal_vars)
-            quality_val = self.quality_function(optimal_vars)
-            cost_val = self.cost_function(optimal_vars)
-            safety_val = self.safety_function(optimal_vars)
-            
-            optimal_setpoints = {
-                'acid_concentration': acid_conc,
-                'temperature': temperature,
-                'residence_time': residence_time,
-                'flow_rate': flow_rate,
-                'pH_setpoint': -np.log10(acid_conc),
-                'performance': {
-                    'yield': yield_val,
-                    'quality': quality_val,
-                    'cost': cost_val,
-                    'safety': safety_val,
-                    'objective_value': result.fun
-                },
-                'timestamp': datetime.now().isoformat()
-            }
+            details = {'mode': mode, 'function_evaluations': int(result.nfev)}
+            if hybrid:
+                details.update({
+                    'method': 'hybrid',
+                    'local_method': local_method,
+                    'gradient_evaluations': int(getattr(result, 'njev', 0)),
+                    'feasible': bool(result.feasible),
+                    'max_constraint_violation': float(result.max_violation)
+                })
+            with self._phase('report'):
+                optimal_setpoints = self._build_setpoints(result.x, result.fun, details)
             
             self.current_setpoints = optimal_setpoints
-            logger.info(f"Optimization successful. Yield: {yield_val:.3f}, Quality: {quality_val:.1f}")
+            self._update_warm_state(result)
+            if cache_key is not None and mode == 'cold':
+                self.cache.put(cache_key, optimal_setpoints)
+            logger.info(f"Optimization successful ({mode}, {result.nfev} evaluations). "
+                        f"Yield: {optimal_setpoints['performance']['yield']:.3f}, "
+                        f"Quality: {optimal_setpoints['performance']['quality']:.1f}")
             
         else:
             logger.error("Optimization failed!")
             optimal_setpoints = {}
             
         return optimal_setpoints
+
+    def optimize_robust(self, n_samples: int = 64, statistic: Union[str, float] = 'mean',
+                        seed: Optional[int] = 0, use_cache: bool = True) -> Dict:
+        """
+        Optimize setpoints for performance under disturbances
+
+        Minimizes the expected objective (``statistic='mean'``) or a chosen
+        percentile of it across ``n_samples`` disturbance draws of the size
+        simulate_process applies (acid 0.05 M, temperature 2 °C and flow
+        10 L/min standard deviations). The same draws are reused for every
+        candidate, so DE compares candidates on common random numbers, and
+        each generation is one (population x samples) vectorized call.
+        """
+        return self._profiled('optimize_robust', self._optimize_robust,
+                              n_samples, statistic, seed, use_cache)
+
+    def _optimize_robust(self, n_samples: int, statistic: Union[str, float],
+                         seed: Optional[int], use_cache: bool) -> Dict:
+        if statistic != 'mean' and not 0 <= float(statistic) <= 100:
+            raise ValueError("statistic must be 'mean' or a percentile in [0, 100]")
+
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = problem_key(self._problem_snapshot(),
+                                    robust={'n_samples': n_samples, 'statistic': statistic,
+                                            'seed': seed})
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached['optimization_details']['mode'] = 'cache'
+                cached['optimization_details']['function_evaluations'] = 0
+                self.current_setpoints = cached
+                logger.info("Robust optimization served from cache")
+                return cached
+
+        logger.info(f"Starting robust optimization ({statistic} over {n_samples} samples)...")
+
+        noise = self.disturbance_samples(n_samples, seed)
+        batch_objective = partial(self.robust_objective_batch, noise=noise, statistic=statistic)
+        result = self._run_differential_evolution(self._bounds(), batch_objective=batch_objective)
+
+        if not result.success:
+            logger.error("Robust optimization failed!")
+            return {}
+
+        with self._phase('report'):
+            optimal_setpoints = self._build_setpoints(
+                result.x, self.objective_function(result.x),
+                {'mode': 'robust',
+                 'function_evaluations': int(result.nfev),
+                 'statistic': statistic,
+                 'samples': n_samples,
+                 'robust_objective': float(result.fun)}
+            )
+        self.current_setpoints = optimal_setpoints
+        if cache_key is not None:
+            self.cache.put(cache_key, optimal_setpoints)
+
+        logger.info(f"Robust optimization successful. Robust objective: {result.fun:.4f}, "
+                    f"nominal: {optimal_setpoints['performance']['objective_value']:.4f}")
+        return optimal_setpoints
+
+    def _build_setpoints(self, optimal_vars: np.ndarray, objective_value: float,
+                         details: Dict) -> Dict:
+        """Setpoint dict with performance metrics for an optimal decision vector"""
+        acid_conc, temperature, residence_time, flow_rate = optimal_vars
+        
+        # Calculate performance metrics
+        yield_val = self.yield_function(optimal_vars)
+        quality_val = self.quality_function(optimal_vars)
+        cost_val = self.cost_function(optimal_vars)
+        safety_val = self.safety_function(optimal_vars)
+        
+        return {
+            'acid_concentration': acid_conc,
+            'temperature': temperature,
+            'residence_time': residence_time,
+            'flow_rate': flow_rate,
+            'pH_setpoint': -np.log10(acid_conc),
+            'performance': {
+                'yield': yield_val,
+                'quality': quality_val,
+                'cost': cost_val,
+                'safety': safety_val,
+                'objective_value': objective_value
+            },
+            'optimization_details': details,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def _pareto_objectives(self, candidates: np.ndarray,
+                           map_func: Optional[Callable] = None) -> np.ndarray:
+        """Objectives to minimize for the Pareto search: -yield, -quality, cost, -safety"""
+        performance = map_batches(self.performance_batch, candidates, map_func)
+        return performance * np.array([-1.0, -1.0, 1.0, -1.0])
+
+    def optimize_pareto(self, pop_size: int = 100, generations: int = 100,
+                        seed: Optional[int] = 42,
+                        workers: Union[int, Callable, None] = None) -> Dict:
+        """
+        Multi-objective optimization of yield, quality, cost and safety
+
+        Returns the non-dominated set found in a single evolutionary run,
+        independent of ``weights``. The front is kept so that
+        ``select_pareto_setpoints`` can answer any weight vector without a new
+        optimization. ``workers`` overrides ``self.workers`` for scoring
+        each generation in parallel chunks.
+        """
+        logger.info("Starting Pareto optimization...")
+
+        map_func = get_map(self.workers if workers is None else workers)
+        front = nsga2(
+            lambda X: self._pareto_objectives(X, map_func),
+            self._bounds(),
+            pop_size=pop_size,
+            generations=generations,
+            seed=seed
+        )
+
+        problem = self._problem_snapshot()
+        del problem['weights']
+        self.pareto_front = {
+            'x': front['x'],
+            'performance': front['objectives'] * np.array([-1.0, -1.0, 1.0, -1.0]),
+            'problem': problem,
+            'function_evaluations': front['function_evaluations']
+        }
+
+        return {
+            'size': len(front['x']),
+            'setpoints': front['x'].tolist(),
+            'performance': [
+                dict(zip(('yield', 'quality', 'cost', 'safety'), row))
+                for row in self.pareto_front['performance'].tolist()
+            ],
+            'function_evaluations': front['function_evaluations']
+        }
+
+    def select_pareto_setpoints(self, weights: Optional[Dict] = None) -> Dict:
+        """
+        Pick the best stored Pareto point for a weight vector
+
+        This is a single dot product over the front rather than a new
+        optimization. The front is rebuilt first if anything other than the
+        weights has changed since it was computed.
+        """
+        problem = self._problem_snapshot()
+        del problem['weights']
+        if self.pareto_front is None or self.pareto_front['problem'] != problem:
+            logger.info("Pareto front missing or stale, recomputing...")
+            self.optimize_pareto()
+
+        objective = self.pareto_front['performance'] @ self.objective_coefficients(weights)
+        best = int(np.argmin(objective))
+
+        optimal_setpoints = self._build_setpoints(
+            self.pareto_front['x'][best], objective[best],
+            {'mode': 'pareto', 'function_evaluations': 0,
+             'front_size': len(self.pareto_front['x'])}
+        )
+        self.current_setpoints = optimal_setpoints
+        return optimal_setpoints
+
+    def _update_warm_state(self, result):
+        """Remember the converged optimum and population for the next solve"""
+        population = getattr(result, 'population', None)
+        if population is None:
+            # Local polish: keep the previous population around the new optimum
+            population = self._warm_state['population'].copy()
+        population = np.array(population, dtype=float)
+        population[0] = result.x
+
+        self._warm_state = {
+            'problem': self._problem_snapshot(),
+            'x': np.array(result.x, dtype=float),
+            'fun': float(result.fun),
+            'population': population
+        }
     
-    def simulate_process(self, duration_hours: float = 8, 
-                        disturbances: Optional[Dict] = None) -> pd.DataFrame:
+    def _adopt_cached_optimum(self, setpoints: Dict):
+        """Point the warm state at a cached optimum of the current problem"""
+        if self._warm_state is None:
+            # No population to seed from yet; the next solve runs cold anyway
+            return
+        x = np.array([setpoints['acid_concentration'], setpoints['temperature'],
+                      setpoints['residence_time'], setpoints['flow_rate']], dtype=float)
+        population = self._warm_state['population'].copy()
+        population[0] = x
+
+        self._warm_state = {
+            'problem': self._problem_snapshot(),
+            'x': x,
+            'fun': float(setpoints['performance']['objective_value']),
+            'population': population
+        }
+    
+    # Standard deviations of the acid, temperature and flow disturbances
+    DISTURBANCE_SCALES = np.array([0.05, 2.0, 10.0])
+
+    def _simulation_columns(self, time_points: np.ndarray,
+                            noise: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Score a block of simulated samples around the current setpoints
+
+        ``noise`` is an (N, 3) array of acid, temperature and flow
+        disturbances, or None for undisturbed operation.
+        """
+        n_points = len(time_points)
+        candidates = np.empty((n_points, 4))
+        candidates[:, 0] = self.current_setpoints['acid_concentration']
+        candidates[:, 1] = self.current_setpoints['temperature']
+        candidates[:, 2] = self.current_setpoints['residence_time']
+        candidates[:, 3] = self.current_setpoints['flow_rate']
+
+        if noise is not None:
+            candidates[:, [0, 1, 3]] += noise
+
+        return {
+            'time': time_points,
+            'acid_concentration': candidates[:, 0],
+            'temperature': candidates[:, 1],
+            'residence_time': candidates[:, 2],
+            'flow_rate': candidates[:, 3],
+            'pH': -np.log10(candidates[:, 0]),
+            'yield': self.yield_function_batch(candidates),
+            'quality': self.quality_function_batch(candidates),
+            'cost': self.cost_function_batch(candidates)
+        }
+
+    @staticmethod
+    def _disturbance_rng(seed) -> Union[np.random.Generator, np.random.RandomState]:
+        """Random source for ``seed``; Generator/RandomState instances are used as given"""
+        if isinstance(seed, (np.random.Generator, np.random.RandomState)):
+            return seed
+        return np.random.default_rng(seed)
+
+    def simulate_process(self, duration_hours: float = 8,
+                        disturbances: Optional[Dict] = None,
+                        seed: Union[int, np.random.Generator, np.random.RandomState, None] = None
+                        ) -> 'pd.DataFrame':
         """
         Simulate process operation with disturbances
+
+        All disturbances are drawn in one call from ``np.random.default_rng(seed)``,
+        so a given seed always reproduces the same frame bit for bit.
+
+        These are not the numbers the former per-sample loop drew from the
+        global ``np.random`` state. To reproduce a run made with
+        ``np.random.seed(s)``, pass ``seed=np.random.RandomState(s)``: it
+        yields the same acid, temperature, flow draw sequence.
         """
         logger.info(f"Simulating process for {duration_hours} hours...")
         
@@ -264,41 +1193,151 @@ class CornProcessOptimizer:
             self.optimize_setpoints()
         
         time_points = np.linspace(0, duration_hours * 60, int(duration_hours * 60))
-        results = []
-        
-        for t in time_points:
-            # Add disturbances if provided
-            acid_conc = self.current_setpoints['acid_concentration']
-            temperature = self.current_setpoints['temperature']
-            residence_time = self.current_setpoints['residence_time']
-            flow_rate = self.current_setpoints['flow_rate']
-            
-            if disturbances:
-                # Add random disturbances
-                acid_conc += np.random.normal(0, 0.05)
-                temperature += np.random.normal(0, 2.0)
-                flow_rate += np.random.normal(0, 10.0)
-            
-            # Calculate current performance
-            variables = [acid_conc, temperature, residence_time, flow_rate]
-            yield_val = self.yield_function(variables)
-            quality_val = self.quality_function(variables)
-            cost_val = self.cost_function(variables)
-            
-            results.append({
-                'time': t,
-                'acid_concentration': acid_conc,
-                'temperature': temperature,
-                'residence_time': residence_time,
-                'flow_rate': flow_rate,
-                'pH': -np.log10(acid_conc),
-                'yield': yield_val,
-                'quality': quality_val,
-                'cost': cost_val
-            })
-        
-        return pd.DataFrame(results)
-    
+
+        noise = None
+        if disturbances:
+            # Draws are laid out per time step as (acid, temperature, flow)
+            rng = self._disturbance_rng(seed)
+            noise = rng.normal(0, self.DISTURBANCE_SCALES, size=(len(time_points), 3))
+
+        import pandas as pd
+        return pd.DataFrame(self._simulation_columns(time_points, noise))
+
+    def simulate_process_chunks(self, duration_hours: float = 8,
+                                disturbances: Optional[Dict] = None,
+                                seed: Union[int, np.random.Generator,
+                                            np.random.RandomState, None] = None,
+                                chunk_size: int = 10080) -> Iterator['pd.DataFrame']:
+        """
+        Simulate process operation as a stream of fixed-size DataFrame chunks
+
+        Peak memory is bounded by ``chunk_size`` regardless of the horizon.
+        Concatenating the chunks reproduces ``simulate_process`` for the same
+        seed exactly.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        import pandas as pd
+
+        logger.info(f"Simulating process for {duration_hours} hours in chunks of {chunk_size}...")
+
+        if not self.current_setpoints:
+            self.optimize_setpoints()
+
+        # Same grid as np.linspace(0, stop, n_points), generated piecewise
+        stop = duration_hours * 60
+        n_points = int(duration_hours * 60)
+        step = stop / (n_points - 1) if n_points > 1 else 0.0
+        rng = self._disturbance_rng(seed) if disturbances else None
+
+        for start in range(0, n_points, chunk_size):
+            end = min(start + chunk_size, n_points)
+            time_points = np.arange(start, end) * step
+            if end == n_points and n_points > 1:
+                time_points[-1] = stop
+
+            noise = None
+            if rng is not None:
+                noise = rng.normal(0, self.DISTURBANCE_SCALES, size=(end - start, 3))
+
+            yield pd.DataFrame(self._simulation_columns(time_points, noise))
+
+    # Decision variables in candidate-column order, and the operating point
+    # used for variables a sweep holds fixed when no setpoints exist yet
+    DECISION_VARIABLES = ('acid_conc', 'temperature', 'residence_time', 'flow_rate')
+    DEFAULT_OPERATING_POINT = (1.2, 75, 60, 200)
+    SWEEP_CACHE_SIZE = 8
+
+    def sweep(self, fixed: Optional[Dict[str, float]] = None, **axes) -> Dict:
+        """
+        Response surface of all metrics over a grid of operating conditions
+
+        Pass a 1-D grid for any subset of ``acid_conc``, ``temperature``,
+        ``residence_time`` and ``flow_rate``, e.g.
+        ``sweep(acid_conc=np.linspace(0.1, 2.5, 100), temperature=np.arange(60, 96))``.
+        The remaining variables are held at ``fixed`` values, else the
+        current setpoints, else DEFAULT_OPERATING_POINT. Returns dense arrays
+        with one dimension per swept variable (in DECISION_VARIABLES order),
+        computed by broadcasting without materializing the grid. Results are
+        cached by grid spec and problem definition and returned read-only.
+        """
+        unknown = set(axes) - set(self.DECISION_VARIABLES)
+        if fixed:
+            unknown |= set(fixed) - set(self.DECISION_VARIABLES)
+        if unknown:
+            raise ValueError(f"Unknown sweep variables: {sorted(unknown)}")
+
+        dims = tuple(name for name in self.DECISION_VARIABLES if name in axes)
+        grids = {name: np.asarray(axes[name], dtype=float).ravel() for name in dims}
+
+        if self.current_setpoints:
+            base = dict(zip(self.DECISION_VARIABLES, (
+                self.current_setpoints['acid_concentration'],
+                self.current_setpoints['temperature'],
+                self.current_setpoints['residence_time'],
+                self.current_setpoints['flow_rate']
+            )))
+        else:
+            base = dict(zip(self.DECISION_VARIABLES, self.DEFAULT_OPERATING_POINT))
+        base.update(fixed or {})
+        held = {name: float(base[name]) for name in self.DECISION_VARIABLES if name not in dims}
+
+        key = problem_key(
+            self._problem_snapshot(),
+            dims=dims,
+            grids={name: hashlib.sha1(grid.tobytes()).hexdigest() for name, grid in grids.items()},
+            held=held
+        )
+        cached = self._sweep_cache.get(key)
+        if cached is not None:
+            self._sweep_cache.move_to_end(key)
+            return cached
+
+        # Each swept variable varies along its own axis and broadcasts
+        columns = []
+        for name in self.DECISION_VARIABLES:
+            if name in grids:
+                shape = [1] * len(dims)
+                shape[dims.index(name)] = -1
+                columns.append(grids[name].reshape(shape))
+            else:
+                columns.append(np.asarray(held[name]))
+        candidates = tuple(columns)
+        grid_shape = tuple(len(grids[name]) for name in dims)
+
+        surface = {
+            'dims': dims,
+            'axes': grids,
+            'fixed': held
+        }
+        # Metrics in performance_batch column order, so objective_coefficients apply
+        metrics = (('yield', self.yield_function_batch),
+                   ('quality', self.quality_function_batch),
+                   ('cost', self.cost_function_batch),
+                   ('safety', self.safety_function_batch))
+        for metric, func in metrics:
+            surface[metric] = np.broadcast_to(func(candidates), grid_shape)
+
+        surface['objective'] = sum(
+            coefficient * surface[metric]
+            for coefficient, (metric, _) in zip(self.objective_coefficients(), metrics)
+        )
+
+        for value in [*surface['axes'].values(), *(surface[metric] for metric, _ in metrics),
+                      surface['objective']]:
+            value.flags.writeable = False
+
+        self._sweep_cache[key] = surface
+        while len(self._sweep_cache) > self.SWEEP_CACHE_SIZE:
+            self._sweep_cache.popitem(last=False)
+
+        return surface
+
+    def _timed_safety_check(self, variables: List[float]) -> Dict[str, bool]:
+        with self._phase('safety_check'):
+            return self.safety_check(variables)
+
     def safety_check(self, variables: List[float]) -> Dict[str, bool]:
         """
         Check if current conditions are within safety limits
@@ -307,9 +1346,9 @@ class CornProcessOptimizer:
         pH = -np.log10(acid_conc)
         
         safety_status = {
-            'acid_concentration_safe': acid_conc <= self.safety_limits['acid_conc_max'],
-            'temperature_safe': temperature <= self.safety_limits['temp_max'],
-            'pH_safe': pH >= self.safety_limits['pH_min'],
+            'acid_concentration_safe': bool(acid_conc <= self.safety_limits['acid_conc_max']),
+            'temperature_safe': bool(temperature <= self.safety_limits['temp_max']),
+            'pH_safe': bool(pH >= self.safety_limits['pH_min']),
             'overall_safe': True
         }
         
@@ -325,6 +1364,9 @@ class CornProcessOptimizer:
         """
         Generate optimization report
         """
+        return self._profiled('generate_report', self._generate_report)
+
+    def _generate_report(self) -> Dict:
         if not self.current_setpoints:
             return {"error": "No optimization results available"}
         
@@ -345,7 +1387,7 @@ class CornProcessOptimizer:
                     "safety_margin": f"{self.current_setpoints['performance']['safety']:.1f}/100"
                 }
             },
-            "safety_assessment": self.safety_check([
+            "safety_assessment": self._timed_safety_check([
                 self.current_setpoints['acid_concentration'],
                 self.current_setpoints['temperature'],
                 self.current_setpoints['residence_time'],
@@ -355,10 +1397,13 @@ class CornProcessOptimizer:
         
         return report
 
-def main():
+def main(output_dir: Optional[str] = None, duration_hours: float = 8):
     """
     Main execution function
     """
+    if output_dir is None:
+        output_dir = os.environ.get('CORN_OPTIMIZER_OUTPUT_DIR', DEFAULT_OUTPUT_DIR)
+
     print("=== Corn Processing Acid Set Point Optimizer ===")
     print("Initializing optimization system...")
     
@@ -388,27 +1433,48 @@ def main():
             if check != 'overall_safe':
                 print(f"  {check.replace('_', ' ').title()}: {'' if status else ''}")
         
-        # Simulate process
-        print("\nSimulating 8-hour process operation...")
-        simulation_data = optimizer.simulate_process(duration_hours=8, 
-                                                   disturbances={'enable': True})
-        
-        print(f"Simulation completed. Average yield: {simulation_data['yield'].mean():.1%}")
-        print(f"Average quality score: {simulation_data['quality'].mean():.1f}")
-        print(f"Average operating cost: ${simulation_data['cost'].mean():.2f}/ton")
+        # Simulate process, streaming chunks to disk so memory stays flat
+        print(f"\nSimulating {duration_hours:g}-hour process operation...")
+
+        n_rows = 0
+        totals = {'yield': 0.0, 'quality': 0.0, 'cost': 0.0}
+        from simulation_io import SimulationWriter
+
+        with SimulationWriter(output_dir) as writer:
+            for chunk in optimizer.simulate_process_chunks(duration_hours=duration_hours,
+                                                           disturbances={'enable': True}):
+                writer.write(chunk)
+                n_rows += len(chunk)
+                for column in totals:
+                    totals[column] += chunk[column].sum()
+
+        if n_rows:
+            print(f"Simulation completed. Average yield: {totals['yield'] / n_rows:.1%}")
+            print(f"Average quality score: {totals['quality'] / n_rows:.1f}")
+            print(f"Average operating cost: ${totals['cost'] / n_rows:.2f}/ton")
+        else:
+            # Under one sample per minute: nothing to average
+            print("Simulation completed. No samples in a horizon under one minute.")
         
         # Save results
-        with open('/projects/corn-optimizer/optimization_results.json', 'w') as f:
+        with open(os.path.join(output_dir, 'optimization_results.json'), 'w') as f:
             json.dump(report, f, indent=2)
         
-        simulation_data.to_csv('/projects/corn-optimizer/simulation_data.csv', index=False)
-        
-        print("\nResults saved to:")
+        print(f"\nResults saved to {output_dir}:")
         print("- optimization_results.json")
-        print("- simulation_data.csv")
+        if writer.paths and writer.format == 'parquet':
+            print(f"- {writer.basename}.parquet")
+        elif writer.paths:
+            print(f"- {writer.basename}_*.npz ({len(writer.paths)} parts)")
         
     else:
         print("Optimization failed. Please check constraints and parameters.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Corn Processing Acid Set Point Optimizer")
+    parser.add_argument('--output-dir', default=None,
+                        help=f"Results directory (default: $CORN_OPTIMIZER_OUTPUT_DIR or {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument('--hours', type=float, default=8,
+                        help="Simulation horizon in hours")
+    args = parser.parse_args()
+    main(output_dir=args.output_dir, duration_hours=args.hours)
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Shared process pools for parallel objective evaluation
+Pools are created on first use and reused across optimizations
+"""
+
+import os
+import atexit
+import logging
+import threading
+import multiprocessing
+import multiprocessing.pool
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_pools: Dict[int, multiprocessing.pool.Pool] = {}
+_pools_lock = threading.Lock()
+
+
+def resolve_workers(workers: int) -> int:
+    """Number of processes for a scipy-style ``workers`` value (-1 = all cores)"""
+    if workers == -1:
+        return os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be -1 or a positive integer")
+    return workers
+
+
+class PoolMap:
+    """``map`` of a shared pool, carrying the pool size for chunking"""
+
+    def __init__(self, pool: multiprocessing.pool.Pool, processes: int):
+        self.pool = pool
+        self.processes = processes
+
+    def __call__(self, func: Callable, iterable):
+        return self.pool.map(func, iterable)
+
+
+def get_pool(processes: int) -> multiprocessing.pool.Pool:
+    """Return the shared pool of the given size, starting it on first use"""
+    with _pools_lock:
+        pool = _pools.get(processes)
+        if pool is None:
+            logger.info(f"Starting shared worker pool with {processes} processes")
+            pool = multiprocessing.Pool(processes)
+            _pools[processes] = pool
+        return pool
+
+
+def get_map(workers: Union[int, Callable, None]) -> Optional[Callable]:
+    """
+    Map-like callable for a ``workers`` option
+
+    ``None`` or ``1`` means serial evaluation and returns None; an integer
+    (or -1 for all cores) returns the ``map`` of a shared pool as a
+    PoolMap; a callable is assumed to be map-like already and is returned
+    unchanged.
+    """
+    if workers is None:
+        return None
+    if callable(workers):
+        return workers
+    processes = resolve_workers(workers)
+    if processes == 1:
+        return None
+    return PoolMap(get_pool(processes), processes)
+
+
+def map_batches(func: Callable[[np.ndarray], np.ndarray], candidates: np.ndarray,
+                map_func: Optional[Callable] = None) -> np.ndarray:
+    """
+    Apply a batch scoring function to a candidate matrix, split into one
+    chunk per worker across ``map_func`` when given
+
+    The worker count is the pool size of a PoolMap; other map-like
+    callables get one chunk per core.
+    """
+    if map_func is None:
+        return func(candidates)
+    workers = getattr(map_func, 'processes', None) or os.cpu_count() or 1
+    n_chunks = max(1, min(len(candidates), workers))
+    return np.concatenate(list(map_func(func, np.array_split(candidates, n_chunks))))
+
+
+def shutdown_pools():
+    """Terminate every shared pool"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.terminate()
+            pool.join()
+        _pools.clear()
+
+
+atexit.register(shutdown_pools)
@@ -0,0 +1,160 @@
+"""
+Vectorized multi-objective search for Corn Processing set points
+NSGA-II style evolution returning a non-dominated (Pareto) set in one run
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def dominance_matrix(F: np.ndarray) -> np.ndarray:
+    """
+    Boolean (N, N) matrix where D[i, j] means row i dominates row j
+
+    All objectives in ``F`` are minimized.
+    """
+    less_equal = np.all(F[:, None, :] <= F[None, :, :], axis=2)
+    strictly_less = np.any(F[:, None, :] < F[None, :, :], axis=2)
+    return less_equal & strictly_less
+
+
+def non_dominated_sort(F: np.ndarray) -> np.ndarray:
+    """Pareto rank of every row of ``F`` (0 = non-dominated)"""
+    dominates = dominance_matrix(F)
+    dominated_by = dominates.sum(axis=0)
+    ranks = np.full(len(F), -1)
+
+    rank = 0
+    remaining = np.ones(len(F), dtype=bool)
+    while remaining.any():
+        front = remaining & (dominated_by == 0)
+        ranks[front] = rank
+        remaining &= ~front
+        dominated_by = dominated_by - dominates[front].sum(axis=0)
+        rank += 1
+
+    return ranks
+
+
+def crowding_distance(F: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance, computed within each Pareto rank"""
+    distance = np.zeros(len(F))
+
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        if len(members) <= 2:
+            distance[members] = np.inf
+            continue
+
+        front = F[members]
+        order = np.argsort(front, axis=0)
+        sorted_front = np.take_along_axis(front, order, axis=0)
+        span = sorted_front[-1] - sorted_front[0]
+        span[span == 0] = 1.0
+
+        gaps = np.zeros_like(front)
+        gaps[1:-1] = (sorted_front[2:] - sorted_front[:-2]) / span
+        gaps[0] = gaps[-1] = np.inf
+
+        # Scatter per-objective gaps back to member order and sum
+        per_member = np.zeros_like(front)
+        np.put_along_axis(per_member, order, gaps, axis=0)
+        distance[members] = per_member.sum(axis=1)
+
+    return distance
+
+
+def _tournament(rng: np.random.Generator, ranks: np.ndarray,
+                crowding: np.ndarray, n: int) -> np.ndarray:
+    """Binary tournament on (rank, -crowding)"""
+    a = rng.integers(0, len(ranks), n)
+    b = rng.integers(0, len(ranks), n)
+    a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] >= crowding[b]))
+    return np.where(a_wins, a, b)
+
+
+def _sbx_crossover(rng: np.random.Generator, p1: np.ndarray, p2: np.ndarray,
+                   eta: float = 15.0, probability: float = 0.9) -> Tuple[np.ndarray, np.ndarray]:
+    """Simulated binary crossover in the unit hypercube"""
+    u = rng.random(p1.shape)
+    beta = np.where(u <= 0.5,
+                    (2 * u) ** (1 / (eta + 1)),
+                    (1 / (2 * (1 - u))) ** (1 / (eta + 1)))
+
+    c1 = 0.5 * ((1 + beta) * p1 + (1 - beta) * p2)
+    c2 = 0.5 * ((1 - beta) * p1 + (1 + beta) * p2)
+
+    skip = rng.random(len(p1)) > probability
+    c1[skip], c2[skip] = p1[skip], p2[skip]
+    return c1, c2
+
+
+def _polynomial_mutation(rng: np.random.Generator, X: np.ndarray,
+                         eta: float = 20.0) -> np.ndarray:
+    """Polynomial mutation in the unit hypercube, one gene per child on average"""
+    mutate = rng.random(X.shape) < 1.0 / X.shape[1]
+    u = rng.random(X.shape)
+    delta = np.where(u < 0.5,
+                     (2 * u) ** (1 / (eta + 1)) - 1,
+                     1 - (2 * (1 - u)) ** (1 / (eta + 1)))
+    return np.clip(X + mutate * delta, 0.0, 1.0)
+
+
+def nsga2(evaluate: Callable[[np.ndarray], np.ndarray],
+          bounds: List[Tuple[float, float]],
+          pop_size: int = 100,
+          generations: int = 100,
+          seed: Optional[int] = 42) -> Dict:
+    """
+    Evolve a population towards the Pareto front of ``evaluate``
+
+    ``evaluate`` maps an (N, D) candidate matrix to an (N, M) matrix of
+    objectives to minimize; it is called once per generation. Returns the
+    non-dominated candidates of the final population and their objectives.
+    """
+    rng = np.random.default_rng(seed)
+    lower, upper = np.array(bounds, dtype=float).T
+    scale = upper - lower
+    pop_size += pop_size % 2
+
+    population = rng.random((pop_size, len(bounds)))
+    objectives = evaluate(lower + population * scale)
+    n_evaluations = pop_size
+
+    for _ in range(generations):
+        ranks = non_dominated_sort(objectives)
+        crowding = crowding_distance(objectives, ranks)
+
+        parents = _tournament(rng, ranks, crowding, pop_size)
+        c1, c2 = _sbx_crossover(rng, population[parents[0::2]], population[parents[1::2]])
+        offspring = _polynomial_mutation(rng, np.clip(np.vstack([c1, c2]), 0.0, 1.0))
+
+        offspring_objectives = evaluate(lower + offspring * scale)
+        n_evaluations += len(offspring)
+
+        # Elitist survival: best ranks first, widest spread within a rank
+        merged = np.vstack([population, offspring])
+        merged_objectives = np.vstack([objectives, offspring_objectives])
+        merged_ranks = non_dominated_sort(merged_objectives)
+        merged_crowding = crowding_distance(merged_objectives, merged_ranks)
+        survivors = np.lexsort((-merged_crowding, merged_ranks))[:pop_size]
+
+        population = merged[survivors]
+        objectives = merged_objectives[survivors]
+
+    front = non_dominated_sort(objectives) == 0
+    front_x, unique = np.unique(lower + population[front] * scale, axis=0, return_index=True)
+    front_objectives = objectives[front][unique]
+
+    logger.info(f"Pareto search finished with {len(front_x)} non-dominated points "
+                f"after {n_evaluations} evaluations")
+
+    return {
+        'x': front_x,
+        'objectives': front_objectives,
+        'function_evaluations': n_evaluations
+    }
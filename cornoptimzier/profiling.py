@@ -0,0 +1,131 @@
+"""
+Optimization profiling hooks
+Evaluation counters, per-phase timings and DE generation/convergence traces
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+
+class OptimizationProfiler:
+    """
+    Collects timing and convergence data for optimization runs
+
+    Optimizers hold an ``Optional[OptimizationProfiler]`` and only call into
+    it when one is attached, so a disabled profiler costs nothing. Each run
+    is bracketed by ``start_run``/``end_run``; the finished profile is
+    returned to be attached to the result and kept in ``runs`` (the last
+    ``history`` profiles) for later queries.
+    """
+
+    def __init__(self, history: int = 20):
+        self.runs: deque = deque(maxlen=history)
+        self._current: Optional[Dict] = None
+        self._run_start = 0.0
+        self._last_tick = 0.0
+
+    def start_run(self, label: str):
+        """Begin collecting a new run profile"""
+        now = time.perf_counter()
+        self._current = {
+            'label': label,
+            'started': time.time(),
+            'objective_evaluations': 0,
+            'objective_calls': 0,
+            'phases': {},
+            'generations': []
+        }
+        self._run_start = now
+        self._last_tick = now
+
+    def end_run(self, **extra) -> Dict:
+        """Finish the current run, store it and return its profile"""
+        profile = self._current
+        if profile is None:
+            return {}
+        profile['total_time'] = time.perf_counter() - self._run_start
+        profile.update(extra)
+        self.runs.append(profile)
+        self._current = None
+        return profile
+
+    def _add_time(self, name: str, elapsed: float):
+        if self._current is None:
+            return
+        phase = self._current['phases'].setdefault(name, {'calls': 0, 'time': 0.0})
+        phase['calls'] += 1
+        phase['time'] += elapsed
+
+    @contextmanager
+    def phase(self, name: str):
+        """Accumulate wall time of a block under ``name``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_time(name, time.perf_counter() - start)
+
+    def timed(self, name: str, func: Callable, *args, **kwargs):
+        """Call ``func`` and accumulate its wall time under ``name``"""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._add_time(name, time.perf_counter() - start)
+
+    def count_evaluations(self, n: int = 1):
+        """Record ``n`` objective evaluations made in one call"""
+        if self._current is not None:
+            self._current['objective_evaluations'] += n
+            self._current['objective_calls'] += 1
+
+    def evaluations(self) -> int:
+        """Objective evaluations recorded so far in the current run"""
+        return self._current['objective_evaluations'] if self._current is not None else 0
+
+    def mark_generation_start(self):
+        """Reset the generation clock, e.g. just before a DE solver starts"""
+        self._last_tick = time.perf_counter()
+
+    def generation_callback(self, intermediate_result) -> None:
+        """
+        ``differential_evolution`` callback recording generation time and
+        the best objective so far
+        """
+        now = time.perf_counter()
+        if self._current is not None:
+            self._current['generations'].append({
+                'time': now - self._last_tick,
+                'best': float(intermediate_result.fun),
+                'convergence': float(getattr(intermediate_result, 'convergence', float('nan')))
+            })
+        self._last_tick = now
+
+    def last_profile(self) -> Optional[Dict]:
+        """Profile of the most recent finished run"""
+        return self.runs[-1] if self.runs else None
+
+    def convergence_trace(self, run: int = -1) -> List[float]:
+        """Best objective value per generation for a stored run"""
+        if not self.runs:
+            return []
+        return [generation['best'] for generation in self.runs[run]['generations']]
+
+    def summary(self) -> Dict:
+        """Totals per phase across all stored runs"""
+        phases: Dict[str, Dict] = {}
+        for run in self.runs:
+            for name, phase in run['phases'].items():
+                total = phases.setdefault(name, {'calls': 0, 'time': 0.0})
+                total['calls'] += phase['calls']
+                total['time'] += phase['time']
+
+        return {
+            'runs': len(self.runs),
+            'total_time': sum(run['total_time'] for run in self.runs),
+            'objective_evaluations': sum(run['objective_evaluations'] for run in self.runs),
+            'generations': sum(len(run['generations']) for run in self.runs),
+            'phases': phases
+        }
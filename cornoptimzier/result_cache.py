@@ -0,0 +1,147 @@
+"""
+Content-addressed result cache for Corn Processing optimization runs
+In-memory LRU with an optional on-disk store that survives restarts
+"""
+
+import os
+import copy
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the optimizer changes in a way that invalidates stored results
+CACHE_SCHEMA_VERSION = 1
+
+
+def _to_builtin(value):
+    """Convert numpy scalars/arrays and tuples into JSON-native values"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {str(k): _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    return value
+
+
+def problem_key(problem: Dict, **options) -> str:
+    """
+    Stable SHA-256 key for an optimization problem
+
+    ``problem`` is the optimizer's problem snapshot (process_params, weights,
+    constraints, safety_limits); ``options`` are any solver settings that
+    change the result.
+    """
+    payload = {
+        'schema': CACHE_SCHEMA_VERSION,
+        'problem': _to_builtin(problem),
+        'options': _to_builtin(options)
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class OptimizationCache:
+    """
+    Thread-safe LRU cache of optimization results keyed by problem hash
+
+    When ``disk_dir`` is given, every stored result is also written there as
+    ``<key>.json`` and memory misses fall through to disk, so results survive
+    process restarts and can be shared between line instances.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached result, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry)
+
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, entry)
+            return copy.deepcopy(entry)
+
+    def put(self, key: str, result: Dict):
+        """Store a result in memory and, if configured, on disk"""
+        entry = _to_builtin(result)
+        with self._lock:
+            self._remember(key, entry)
+        self._store(key, entry)
+
+    def clear(self):
+        """Drop all in-memory entries (disk entries are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'disk_dir': self.disk_dir
+            }
+
+    def _remember(self, key: str, entry: Dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.json')
+
+    def _load(self, key: str) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+
+    def _store(self, key: str, entry: Dict):
+        if not self.disk_dir:
+            return
+        # Write to a temp file and rename so readers never see partial JSON
+        tmp_path = f'{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not persist cache entry {key}: {e}")
@@ -0,0 +1,122 @@
+"""
+Fixed-memory columnar ring buffer for process samples
+Preallocated NumPy columns with O(1) append and zero-copy window views
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """
+    Single-writer ring buffer holding the last ``capacity`` samples
+
+    Each signal is one float64 column. Every sample is written twice, at
+    slot ``i`` and ``i + capacity`` of a 2 * capacity array, so any window
+    of up to ``capacity`` consecutive samples is one contiguous slice and
+    can be returned as a view without copying or concatenating.
+
+    Samples are numbered by a monotonically increasing sequence (the first
+    sample is 0); ``count`` is the number appended so far and is published
+    only after the sample's data is written. Views are valid until the
+    writer laps them; ``snapshot`` copies a window and retries if the writer
+    started overwriting it meanwhile, so snapshot readers never see torn
+    data.
+    """
+
+    def __init__(self, columns: Sequence[str], capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.capacity = capacity
+        self._data = np.full((len(self.columns), 2 * capacity), np.nan)
+        self.count = 0
+        # Sequence number one past the sample being written (seqlock-style)
+        self._reserved = 0
+
+    def append(self, values: Sequence[float]):
+        """Append one sample given in column order"""
+        slot = self.count % self.capacity
+        self._reserved = self.count + 1
+        self._data[:, slot] = values
+        self._data[:, slot + self.capacity] = values
+        self.count += 1
+
+    def append_row(self, row: Dict[str, float]):
+        """Append one sample given as a column -> value mapping"""
+        self.append([row[name] for name in self.columns])
+
+    def extend(self, block: np.ndarray):
+        """Append samples given as a (columns, n) array, oldest first"""
+        block = np.asarray(block, dtype=np.float64)
+        total = block.shape[1]
+        # Only the newest ``capacity`` samples would survive anyway
+        block = block[:, max(0, total - self.capacity):]
+        first = self.count + total - block.shape[1]
+        slots = (first + np.arange(block.shape[1])) % self.capacity
+        self._reserved = self.count + total
+        self._data[:, slots] = block
+        self._data[:, slots + self.capacity] = block
+        self.count += total
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def first_sequence(self) -> int:
+        """Sequence number of the oldest retained sample"""
+        return max(0, self.count - self.capacity)
+
+    def _bounds(self, n: Optional[int], end: int) -> Tuple[int, int]:
+        """Sequence range [start, end) of the last n samples before ``end``"""
+        available = min(end, self.capacity)
+        n = available if n is None else max(0, min(n, available))
+        return end - n, end
+
+    def _view(self, start: int, end: int) -> np.ndarray:
+        offset = start % self.capacity
+        view = self._data[:, offset:offset + (end - start)]
+        view.flags.writeable = False
+        return view
+
+    def window(self, n: Optional[int] = None) -> Tuple[int, Dict[str, np.ndarray]]:
+        """
+        Zero-copy read-only views of the last ``n`` samples (all retained
+        samples by default), with the sequence number of the first one
+        """
+        start, end = self._bounds(n, self.count)
+        view = self._view(start, end)
+        return start, {name: view[i] for i, name in enumerate(self.columns)}
+
+    def snapshot(self, n: Optional[int] = None,
+                 since: Optional[int] = None) -> Tuple[int, Dict[str, np.ndarray]]:
+        """
+        Consistent copy of the last ``n`` samples, or of every retained
+        sample with sequence >= ``since``
+
+        Returns the sequence number of the first sample and the columns.
+        """
+        while True:
+            end = self.count
+            if since is not None:
+                n = end - max(since, 0)
+            start, end = self._bounds(n, end)
+            data = self._view(start, end).copy()
+            # Writing sequence s overwrites s - capacity; retry if the writer
+            # reached any copied slot while we copied
+            if self._reserved - start <= self.capacity:
+                return start, {name: data[i] for i, name in enumerate(self.columns)}
+
+    def rows(self, n: Optional[int] = None) -> List[Dict[str, float]]:
+        """Last ``n`` samples as a list of dicts, oldest first"""
+        start, columns = self.snapshot(n)
+        return [dict(zip(self.columns, values))
+                for values in zip(*(columns[name].tolist() for name in self.columns))]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
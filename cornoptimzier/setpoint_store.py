@@ -0,0 +1,110 @@
+"""
+Versioned, immutable setpoint snapshots
+Writers swap in a new snapshot atomically; readers never take a lock
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _freeze(value):
+    """Read-only view of nested dicts/lists"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Mutable deep copy of a frozen value"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SetpointSnapshot:
+    """
+    One published version of the setpoints
+
+    ``setpoints`` is a read-only mapping and ``json`` its serialized form,
+    produced once at publish time so every reader shares it.
+    """
+
+    __slots__ = ('version', 'setpoints', 'published_at', 'source', 'json')
+
+    def __init__(self, version: int, setpoints: Mapping, source: str):
+        self.version = version
+        self.setpoints = _freeze(setpoints)
+        self.published_at = datetime.now().isoformat()
+        self.source = source
+        self.json = json.dumps(self.setpoints, default=_json_default)
+
+    def __bool__(self) -> bool:
+        return bool(self.setpoints)
+
+    def to_dict(self) -> Dict:
+        """Mutable copy of the setpoints, e.g. to build the next version"""
+        return _thaw(self.setpoints)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+
+class SetpointStore:
+    """
+    Holder of the current SetpointSnapshot
+
+    ``snapshot()`` is a single attribute read, so readers always see one
+    complete version and never block. Writers serialize on a lock only
+    among themselves and publish by swapping the reference, so versions
+    increase monotonically and no update is lost.
+    """
+
+    def __init__(self, setpoints: Optional[Mapping] = None):
+        self._write_lock = threading.Lock()
+        self._current = SetpointSnapshot(0, setpoints or {}, 'initial')
+
+    def snapshot(self) -> SetpointSnapshot:
+        return self._current
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def publish(self, setpoints: Mapping, source: str = 'publish') -> SetpointSnapshot:
+        """Replace the setpoints wholesale"""
+        with self._write_lock:
+            snapshot = SetpointSnapshot(self._current.version + 1, setpoints, source)
+            self._current = snapshot
+        logger.info(f"Published setpoints version {snapshot.version} ({source})")
+        return snapshot
+
+    def update(self, func: Callable[[Dict], Dict], source: str = 'update') -> SetpointSnapshot:
+        """
+        Read-modify-write: ``func`` receives a mutable copy of the current
+        setpoints and returns the next ones
+        """
+        with self._write_lock:
+            setpoints = func(self._current.to_dict())
+            snapshot = SetpointSnapshot(self._current.version + 1, setpoints, source)
+            self._current = snapshot
+        logger.info(f"Published setpoints version {snapshot.version} ({source})")
+        return snapshot
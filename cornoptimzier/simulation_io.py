@@ -0,0 +1,124 @@
+"""
+Streaming sinks for Corn Processing simulation output
+Appends simulation chunks to compressed columnar files with constant memory
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def parquet_available() -> bool:
+    """Check whether the optional pyarrow dependency is installed"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SimulationWriter:
+    """
+    Streaming writer for simulation chunks
+
+    ``format='parquet'`` appends each chunk as a row group of a single
+    Parquet file (requires pyarrow). ``format='npz'`` writes one compressed
+    ``.npz`` part file per chunk, since npz archives cannot be appended to.
+    Only the current chunk is ever held in memory.
+
+    Output left in ``output_dir`` under the same basename by an earlier run
+    is removed first, so ``read_simulation`` only ever sees this run.
+    """
+
+    FORMATS = ('parquet', 'npz')
+
+    def __init__(self, output_dir: str, basename: str = 'simulation_data',
+                 format: Optional[str] = None, compression: str = 'zstd'):
+        if format is None:
+            format = 'parquet' if parquet_available() else 'npz'
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported format: {format}. Expected one of {self.FORMATS}")
+
+        self.output_dir = output_dir
+        self.basename = basename
+        self.format = format
+        self.compression = compression
+        self.rows_written = 0
+        self.paths: List[str] = []
+
+        self._parquet_writer = None
+        self._chunk_index = 0
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._remove_previous_output()
+
+    def _remove_previous_output(self):
+        """Delete the parquet file and npz parts of an earlier run"""
+        for name in os.listdir(self.output_dir):
+            if name == f'{self.basename}.parquet' or (
+                    name.startswith(f'{self.basename}_') and name.endswith('.npz')):
+                os.remove(os.path.join(self.output_dir, name))
+
+    def write(self, chunk: pd.DataFrame):
+        """Append one simulation chunk"""
+        if self.format == 'parquet':
+            self._write_parquet(chunk)
+        else:
+            self._write_npz(chunk)
+
+        self.rows_written += len(chunk)
+        self._chunk_index += 1
+
+    def _write_parquet(self, chunk: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._parquet_writer is None:
+            path = os.path.join(self.output_dir, f'{self.basename}.parquet')
+            self._parquet_writer = pq.ParquetWriter(path, table.schema,
+                                                    compression=self.compression)
+            self.paths.append(path)
+        self._parquet_writer.write_table(table)
+
+    def _write_npz(self, chunk: pd.DataFrame):
+        path = os.path.join(self.output_dir,
+                            f'{self.basename}_{self._chunk_index:05d}.npz')
+        np.savez_compressed(path, **{col: chunk[col].to_numpy() for col in chunk.columns})
+        self.paths.append(path)
+
+    def close(self):
+        """Flush and close any open file handles"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        logger.info(f"Wrote {self.rows_written} simulation rows to {self.output_dir}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_simulation(output_dir: str, basename: str = 'simulation_data') -> pd.DataFrame:
+    """Load a simulation written by SimulationWriter back into one DataFrame"""
+    parquet_path = os.path.join(output_dir, f'{basename}.parquet')
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path)
+
+    parts = sorted(
+        name for name in os.listdir(output_dir)
+        if name.startswith(f'{basename}_') and name.endswith('.npz')
+    )
+    frames = []
+    for name in parts:
+        with np.load(os.path.join(output_dir, name)) as archive:
+            frames.append(pd.DataFrame({key: archive[key] for key in archive.files}))
+
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,159 @@
+"""
+Server-sent event fan-out for live process data
+Each event is serialized once and queued to every subscriber; slow clients
+are disconnected instead of slowing the publisher down
+"""
+
+import json
+import queue
+import logging
+import threading
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriberLimitError(Exception):
+    """Raised when the broadcaster already serves its maximum of clients"""
+
+
+class Subscriber:
+    """One connected client and its bounded outgoing queue"""
+
+    def __init__(self, max_queue: int):
+        self.queue: 'queue.Queue[Optional[bytes]]' = queue.Queue(max_queue)
+        self.dropped = False
+
+
+class Broadcaster:
+    """
+    Publish/subscribe hub producing a text/event-stream per subscriber
+
+    ``publish`` never blocks: it encodes the event once and offers the
+    bytes to each subscriber's queue of at most ``max_queue`` events. A
+    subscriber whose queue is full has fallen behind; it is sent an
+    'overflow' event and disconnected, and EventSource clients reconnect
+    and resynchronize. At most ``max_subscribers`` clients are served.
+    """
+
+    def __init__(self, max_subscribers: int = 100, max_queue: int = 256,
+                 heartbeat: float = 15.0):
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+        self.published = 0
+        self.overflows = 0
+
+    @property
+    def subscribers(self) -> int:
+        """Number of connected clients (unlocked, for cheap checks)"""
+        return len(self._subscribers)
+
+    @staticmethod
+    def encode(event: str, payload, event_id: Optional[int] = None) -> bytes:
+        """Serialize one server-sent event"""
+        lines = []
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"event: {event}")
+        lines.append(f"data: {json.dumps(payload, separators=(',', ':'))}")
+        return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+    def publish(self, event: str, payload) -> int:
+        """Send an event to every subscriber; returns how many received it"""
+        with self._lock:
+            self._sequence += 1
+            if not self._subscribers:
+                # Nobody to send it to, so don't serialize it
+                self.published += 1
+                return 0
+            message = self.encode(event, payload, self._sequence)
+            subscribers = list(self._subscribers)
+        self.published += 1
+
+        delivered = 0
+        for subscriber in subscribers:
+            if subscriber.dropped:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+                delivered += 1
+            except queue.Full:
+                self._drop(subscriber)
+        return delivered
+
+    def _drop(self, subscriber: Subscriber):
+        """Disconnect a subscriber that cannot keep up"""
+        with self._lock:
+            if subscriber.dropped:
+                return
+            subscriber.dropped = True
+            self._subscribers.discard(subscriber)
+        self.overflows += 1
+        logger.warning("Dropping stream subscriber that fell behind")
+
+        # Make room for the overflow notice and the end-of-stream marker
+        while True:
+            try:
+                subscriber.queue.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            subscriber.queue.put_nowait(self.encode('overflow', {'reason': 'client too slow'}))
+            subscriber.queue.put_nowait(None)
+        except queue.Full:
+            # A concurrent publish refilled the queue; the stream notices
+            # the dropped flag at its next heartbeat
+            pass
+
+    def subscribe(self) -> Subscriber:
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise SubscriberLimitError(f"{len(self._subscribers)} subscribers "
+                                           f"(limit {self.max_subscribers})")
+            subscriber = Subscriber(self.max_queue)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stream(self, subscriber: Subscriber, initial: Optional[bytes] = None) -> Iterator[bytes]:
+        """
+        Event-stream body for one subscriber, ending when it is dropped or
+        the client goes away
+        """
+        try:
+            if initial is not None:
+                yield initial
+            while True:
+                try:
+                    message = subscriber.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    if subscriber.dropped:
+                        return
+                    # Comment line keeps proxies from timing out idle streams
+                    yield b': keepalive\n\n'
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {
+            'subscribers': subscribers,
+            'max_subscribers': self.max_subscribers,
+            'max_queue': self.max_queue,
+            'published': self.published,
+            'overflows': self.overflows
+        }
@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: the optimizer modules are imported top-level, the way
+main.py and web_interface.py import each other
+"""
+
+import os
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PACKAGE_DIR not in sys.path:
+    sys.path.insert(0, PACKAGE_DIR)
@@ -0,0 +1,85 @@
+"""Tests for the alarm engine"""
+
+import numpy as np
+import pytest
+
+from alarms import CLEARED, HIGH, LOW, RAISED, AlarmEngine, AlarmRule
+
+SIGNALS = ('temperature', 'pH')
+
+
+def states(events):
+    return [(event['rule'], event['state']) for event in events]
+
+
+def test_deadband_holds_alarm_until_clear_of_limit():
+    engine = AlarmEngine([AlarmRule('hot', 'temperature', 90.0, HIGH, deadband=2.0)], SIGNALS)
+    assert states(engine.evaluate(0, [91.0, 2.0])[0]) == [('hot', RAISED)]
+    # Back under the limit but inside the deadband: still active
+    assert engine.evaluate(1, [89.0, 2.0]) == [[]]
+    assert engine.evaluate(2, [91.0, 2.0]) == [[]]
+    assert [alarm['rule'] for alarm in engine.active()] == ['hot']
+    assert states(engine.evaluate(3, [87.5, 2.0])[0]) == [('hot', CLEARED)]
+    assert engine.active() == []
+
+
+def test_on_delay_requires_sustained_excursion():
+    engine = AlarmEngine([AlarmRule('acid', 'pH', 1.8, LOW, on_delay=5.0)], SIGNALS)
+    assert engine.evaluate(0, [80.0, 1.7]) == [[]]
+    # A dip that recovers before the delay restarts the timer
+    assert engine.evaluate(3, [80.0, 1.9]) == [[]]
+    assert engine.evaluate(4, [80.0, 1.7]) == [[]]
+    assert engine.evaluate(8, [80.0, 1.7]) == [[]]
+    assert states(engine.evaluate(9, [80.0, 1.7])[0]) == [('acid', RAISED)]
+
+
+def test_off_delay_requires_sustained_return():
+    engine = AlarmEngine([AlarmRule('hot', 'temperature', 90.0, HIGH, off_delay=10.0)], SIGNALS)
+    engine.evaluate(0, [95.0, 2.0])
+    assert engine.evaluate(1, [85.0, 2.0]) == [[]]
+    assert engine.evaluate(5, [95.0, 2.0]) == [[]]
+    assert engine.evaluate(6, [85.0, 2.0]) == [[]]
+    assert states(engine.evaluate(16, [85.0, 2.0])[0]) == [('hot', CLEARED)]
+    assert engine.stats()['transitions'] == 2
+
+
+def test_streams_and_nan_readings_are_independent():
+    engine = AlarmEngine([AlarmRule('hot', 'temperature', 90.0)], SIGNALS, streams=3)
+    events = engine.evaluate(0, np.array([[95.0, 2.0], [85.0, 2.0], [np.nan, np.nan]]))
+    assert [states(stream) for stream in events] == [[('hot', RAISED)], [], []]
+    assert engine.evaluate(1, np.full((3, 2), np.nan)) == [[], [], []]
+    assert len(engine.active(0)) == 1 and engine.active(1) == []
+
+
+def test_event_log_cursor_reports_gaps():
+    engine = AlarmEngine([AlarmRule('hot', 'temperature', 90.0)], SIGNALS, log_size=2)
+    for t in range(3):
+        engine.evaluate(2 * t, [95.0, 2.0])
+        engine.evaluate(2 * t + 1, [85.0, 2.0])
+    events, cursor, gap = engine.events_since(0)
+    assert cursor == 6 and gap and len(events) == 2
+    assert engine.events_since(cursor) == ([], 6, False)
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        AlarmRule('bad', 'temperature', 90.0, 'sideways')
+    with pytest.raises(ValueError):
+        AlarmRule('bad', 'temperature', 90.0, deadband=-1.0)
+    with pytest.raises(ValueError):
+        AlarmEngine([AlarmRule('a', 'flow', 1.0)], SIGNALS)
+    with pytest.raises(ValueError):
+        AlarmEngine([AlarmRule('a', 'pH', 1.0), AlarmRule('a', 'pH', 2.0)], SIGNALS)
+
+
+def test_missing_samples_do_not_restart_delays():
+    engine = AlarmEngine([AlarmRule('hot', 'temperature', 90.0, HIGH, on_delay=5.0, off_delay=5.0)],
+                         SIGNALS)
+    assert engine.evaluate(0, [95.0, 2.0]) == [[]]
+    assert engine.evaluate(3, [np.nan, 2.0]) == [[]]
+    # Beyond the limit since t=0, the gap notwithstanding
+    assert states(engine.evaluate(5, [95.0, 2.0])[0]) == [('hot', RAISED)]
+
+    assert engine.evaluate(6, [85.0, 2.0]) == [[]]
+    assert engine.evaluate(8, [np.nan, np.nan]) == [[]]
+    assert states(engine.evaluate(11, [85.0, 2.0])[0]) == [('hot', CLEARED)]
@@ -0,0 +1,50 @@
+"""Tests for the versioned chart payload cache"""
+
+import threading
+import time
+
+from chart_cache import PayloadCache
+
+
+def test_payload_is_rebuilt_only_when_version_changes():
+    cache = PayloadCache()
+    builds = []
+
+    def build():
+        builds.append(len(builds))
+        return f'payload {len(builds)}'.encode()
+
+    assert cache.get('trend', 'json', 1, build) == b'payload 1'
+    assert cache.get('trend', 'json', 1, build) == b'payload 1'
+    assert cache.get('trend', 'columns', 1, build) == b'payload 2'
+    assert cache.get('trend', 'json', 2, build) == b'payload 3'
+
+    assert len(builds) == 3
+    assert cache.stats() == {'entries': 2, 'hits': 1, 'builds': 3}
+
+
+def test_concurrent_requests_share_one_build():
+    cache = PayloadCache()
+    builds = []
+    start = threading.Barrier(8)
+
+    def build():
+        builds.append(1)
+        time.sleep(0.05)
+        return b'payload'
+
+    results = []
+
+    def request():
+        start.wait()
+        results.append(cache.get('performance', 'json', 7, build))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [b'payload'] * 8
+    assert len(builds) == 1
+    assert cache.stats()['hits'] == 7
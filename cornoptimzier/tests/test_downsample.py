@@ -0,0 +1,85 @@
+"""Tests for LTTB, min/max envelopes and rollup tiers"""
+
+import numpy as np
+import pytest
+
+from downsample import RollupTier, lttb, minmax_envelope
+
+SIGNALS = ('a', 'b')
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(0)
+    timestamps = np.arange(0.0, 3600.0)
+    values = rng.normal(size=(2, timestamps.size))
+    values[0, 100:130] = np.nan
+    values[1, 600:660] = np.nan
+    return timestamps, values
+
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[437] = 5.0
+    indices = lttb(x, y, 50)
+    assert len(indices) == 50 and indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0) and 437 in indices
+    np.testing.assert_array_equal(lttb(x[:10], y[:10], 20), np.arange(10))
+
+
+def test_lttb_skips_nan_samples():
+    x = np.arange(1000.0)
+    y = np.sin(x / 50)
+    y[200:400] = np.nan
+    indices = lttb(x, y, 100)
+    assert np.isfinite(y[indices[(indices < 200) | (indices >= 400)]]).all()
+    assert not np.isnan(y[indices]).all()
+
+
+def test_minmax_envelope_ignores_nan():
+    x = np.arange(8.0)
+    y = np.array([1.0, np.nan, 3.0, 2.0, np.nan, np.nan, 5.0, 4.0])
+    starts, low, high = minmax_envelope(x, y, y, 4)
+    np.testing.assert_array_equal(starts, [0, 2, 4, 6])
+    np.testing.assert_array_equal(low, [1.0, 2.0, np.nan, 4.0])
+    np.testing.assert_array_equal(high, [1.0, 3.0, np.nan, 5.0])
+
+
+def test_rollup_add_and_add_block_agree(samples):
+    timestamps, values = samples
+    single = RollupTier('1min', 60, SIGNALS, 100)
+    blocks = RollupTier('1min', 60, SIGNALS, 100)
+    for t, row in zip(timestamps, values.T):
+        single.add(t, row)
+    for lo in range(0, timestamps.size, 777):
+        blocks.add_block(timestamps[lo:lo + 777], values[:, lo:lo + 777])
+
+    a, b = single.query(), blocks.query()
+    assert len(a['timestamp']) == 60
+    for name in a:
+        np.testing.assert_allclose(a[name], b[name], equal_nan=True)
+
+
+def test_rollup_statistics_ignore_nan(samples):
+    timestamps, values = samples
+    tier = RollupTier('1min', 60, SIGNALS, 100)
+    tier.add_block(timestamps, values)
+
+    bucket = tier.query(60, 120)
+    assert bucket['count'][0] == 60
+    assert bucket['a_mean'][0] == pytest.approx(np.nanmean(values[0, 60:120]))
+    assert bucket['a_min'][0] == np.nanmin(values[0, 60:120])
+    # Every sample of b was NaN in this bucket
+    assert np.isnan(tier.query(600, 660)['b_mean'][0])
+
+
+def test_rollup_query_slices_range(samples):
+    timestamps, values = samples
+    tier = RollupTier('1min', 60, SIGNALS, 100)
+    tier.add_block(timestamps, values)
+
+    np.testing.assert_array_equal(tier.query(610, 800)['timestamp'], [600, 660, 720, 780])
+    # The open bucket is included only when it is in range
+    assert tier.query(3500)['timestamp'].tolist() == [3480, 3540]
+    assert tier.query(0, 60)['timestamp'].tolist() == [0]
@@ -0,0 +1,143 @@
+"""Tests for the segment historian"""
+
+import os
+
+import numpy as np
+import pytest
+
+from historian import DAY, Historian
+
+COLUMNS = ('timestamp', 'value')
+# Straddles a UTC day boundary
+T0 = 100 * DAY - 50
+
+
+def open_historian(root, **options):
+    return Historian(str(root), COLUMNS, flush_interval=1e9, **options)
+
+
+def fill(historian, n, start=T0):
+    for i in range(n):
+        assert historian.append([start + i, float(i)])
+
+
+def test_round_trip_across_reopen(tmp_path):
+    historian = open_historian(tmp_path)
+    fill(historian, 100)
+    historian.close()
+
+    reopened = open_historian(tmp_path)
+    assert reopened.count() == 100
+    assert reopened.last_timestamp == T0 + 99
+    np.testing.assert_array_equal(reopened.query()['value'], np.arange(100.0))
+    np.testing.assert_array_equal(reopened.tail(3), [[T0 + 97, T0 + 98, T0 + 99], [97, 98, 99]])
+
+    # Appends carry on in the reopened segment
+    fill(reopened, 10, start=T0 + 100)
+    assert reopened.count() == 110
+    reopened.close()
+
+
+def test_queries_do_not_flush_staged_samples(tmp_path):
+    historian = open_historian(tmp_path)
+    fill(historian, 100)
+    staged = historian.stats()['staged']
+    assert staged == 50
+
+    window = historian.query(T0 + 45, T0 + 55)
+    np.testing.assert_array_equal(window['value'], np.arange(45.0, 55.0))
+    assert historian.count(T0 + 50) == 50
+    assert historian.tail(1)[1, 0] == 99
+    assert historian.stats()['staged'] == staged
+    historian.close()
+
+
+def test_query_views_and_copies(tmp_path):
+    historian = open_historian(tmp_path)
+    fill(historian, 100)
+    historian.flush()
+
+    # Within one day segment and on disk: a view of the segment file
+    view = historian.query(T0 + 60, T0 + 70)['value']
+    assert view.base is not None and not view.flags.writeable
+    assert historian.copying_queries == 0
+
+    # Crossing the day boundary concatenates
+    np.testing.assert_array_equal(historian.query(T0 + 40, T0 + 60)['value'], np.arange(40.0, 60.0))
+    assert historian.copying_queries == 1
+
+    days = list(historian.iter_days())
+    assert [len(day['value']) for day in days] == [50, 50]
+    historian.close()
+
+
+def test_compaction_seals_finished_segments(tmp_path):
+    historian = open_historian(tmp_path)
+    fill(historian, 100)
+    fill(historian, 10, start=T0 + 2 * DAY)
+    historian.close()
+
+    reopened = open_historian(tmp_path)
+    reopened.compact()
+    stats = reopened.stats()
+    assert stats['segments'] == 3 and stats['sealed_segments'] == 2
+    assert os.path.exists(tmp_path / f'{100 * DAY - DAY}.npy')
+    assert not os.path.isdir(tmp_path / str(100 * DAY - DAY))
+    np.testing.assert_array_equal(reopened.query()['value'], np.concatenate([np.arange(100.0), np.arange(10.0)]))
+    reopened.close()
+
+
+def test_out_of_order_samples_are_dropped(tmp_path):
+    historian = open_historian(tmp_path)
+    fill(historian, 10)
+    assert not historian.append([T0, -1.0])
+    block = np.array([[T0 + 10, T0 + 5, T0 + 11], [10.0, -1.0, 11.0]])
+    assert historian.append_block(block) == 2
+    assert historian.out_of_order == 2
+    np.testing.assert_array_equal(historian.query()['value'], np.arange(12.0))
+    historian.close()
+
+
+def test_retention_expires_old_segments(tmp_path):
+    historian = open_historian(tmp_path, retention_seconds=DAY)
+    fill(historian, 10)
+    fill(historian, 10, start=T0 + 3 * DAY)
+    assert historian.stats()['segments'] == 1
+    assert historian.count() == 10
+    historian.close()
+
+
+def test_layout_mismatch_is_refused(tmp_path):
+    open_historian(tmp_path).close()
+    with pytest.raises(ValueError):
+        Historian(str(tmp_path), ('timestamp', 'other'))
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='needs /proc')
+def test_historians_hold_no_file_descriptors(tmp_path):
+    before = len(os.listdir('/proc/self/fd'))
+    historians = [open_historian(tmp_path / str(i)) for i in range(50)]
+    for historian in historians:
+        fill(historian, 100)
+        historian.compact()
+        assert historian.stats()['sealed_segments'] == 1
+    assert len(os.listdir('/proc/self/fd')) == before
+    for historian in historians:
+        historian.close()
+
+
+def test_torn_column_tail_is_dropped(tmp_path):
+    historian = open_historian(tmp_path)
+    fill(historian, 10, start=T0 + 100)
+    historian.close()
+    # A crash mid-flush left one column a sample longer than the others
+    with open(tmp_path / str(100 * DAY) / 'value.f64', 'ab') as f:
+        f.write(np.float64(-1.0).tobytes())
+
+    reopened = open_historian(tmp_path)
+    assert reopened.count() == 10
+    fill(reopened, 5, start=T0 + 110)
+    reopened.flush()
+    np.testing.assert_array_equal(reopened.query()['value'],
+                                  np.concatenate([np.arange(10.0), np.arange(5.0)]))
+    reopened.close()
@@ -0,0 +1,112 @@
+"""Tests for the background JobQueue"""
+
+import threading
+
+import pytest
+
+from jobs import CANCELLED, DONE, FAILED, JobQueue, QueueFullError
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(max_workers=2, max_pending=4)
+    yield queue
+    queue.shutdown()
+
+
+def blocker():
+    """A job function that runs until released"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def run(**params):
+        started.set()
+        release.wait(5)
+        return params
+
+    return run, started, release
+
+
+def test_identical_inflight_jobs_are_deduplicated(queue):
+    run, started, release = blocker()
+    first, deduplicated = queue.submit(run, key='same', x=1)
+    second, joined = queue.submit(run, key='same', x=1)
+    assert (deduplicated, joined) == (False, True)
+    assert second is first and first.submissions == 2
+
+    release.set()
+    assert first.wait(5) and first.status == DONE and first.result == {'x': 1}
+    # Finished jobs no longer absorb submissions
+    third, deduplicated = queue.submit(run, key='same', x=1)
+    assert third is not first and not deduplicated
+
+
+def test_only_queued_jobs_can_be_cancelled():
+    queue = JobQueue(max_workers=1, max_pending=4)
+    run, started, release = blocker()
+    running, _ = queue.submit(run)
+    assert started.wait(5)
+    queued, _ = queue.submit(run)
+
+    assert not queue.cancel(running.id)
+    assert queue.cancel(queued.id) and queued.status == CANCELLED
+    assert not queue.cancel('unknown')
+    release.set()
+    assert running.wait(5) and running.status == DONE
+    queue.shutdown()
+
+
+def test_queue_depth_limit(queue):
+    run, started, release = blocker()
+    for _ in range(4):
+        queue.submit(run)
+    with pytest.raises(QueueFullError):
+        queue.submit(run)
+    assert queue.stats()['rejected'] == 1
+    release.set()
+
+
+def test_failures_are_reported(queue):
+    def fail():
+        raise RuntimeError('boom')
+
+    job, _ = queue.submit(fail)
+    assert job.wait(5)
+    assert job.status == FAILED and job.error == 'boom'
+
+
+def test_lane_runs_jobs_one_at_a_time_in_order():
+    queue = JobQueue(max_workers=4, max_pending=16)
+    lock = threading.Lock()
+    active, peak, order = [0], [0], []
+
+    def run(n):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        threading.Event().wait(0.02)
+        with lock:
+            active[0] -= 1
+            order.append(n)
+
+    jobs = [queue.submit(run, lane='line-1', n=n)[0] for n in range(5)]
+    assert all(job.wait(5) for job in jobs)
+    assert peak[0] == 1 and order == list(range(5))
+    assert queue.stats()['busy_lanes'] == 0
+    queue.shutdown()
+
+
+def test_job_waiting_for_its_lane_can_be_cancelled():
+    queue = JobQueue(max_workers=2, max_pending=4)
+    run, started, release = blocker()
+    running, _ = queue.submit(run, lane='line-1')
+    waiting, _ = queue.submit(run, lane='line-1')
+    after, _ = queue.submit(run, lane='line-1')
+    assert started.wait(5)
+    assert queue.stats()['waiting_for_lane'] == 2
+
+    assert queue.cancel(waiting.id)
+    release.set()
+    assert after.wait(5) and after.status == DONE
+    assert waiting.status == CANCELLED and queue.stats()['busy_lanes'] == 0
+    queue.shutdown()
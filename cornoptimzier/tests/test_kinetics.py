@@ -0,0 +1,72 @@
+"""Tests for the batched hydrolysis ODE against the closed-form solution"""
+
+import numpy as np
+import pytest
+
+from main import CornProcessOptimizer
+from kinetics import METHODS
+
+ACID = np.array([0.1, 0.5, 1.0, 2.5])
+TEMPERATURE = np.array([60.0, 70.0, 80.0, 95.0])
+RESIDENCE = np.array([15.0, 45.0, 60.0, 120.0])
+
+
+@pytest.fixture
+def optimizer():
+    optimizer = CornProcessOptimizer()
+    # Faster kinetics so conversions span most of [0, 1] instead of staying near 0
+    optimizer.process_params['k0'] *= 300
+    return optimizer
+
+
+def _rate_constant(optimizer, temperature):
+    params = optimizer.process_params
+    return params['k0'] * np.exp(-params['Ea'] / (params['R'] * (temperature + 273.15)))
+
+
+def _closed_form_starch(optimizer, acid, temperature, seconds):
+    return np.exp(-_rate_constant(optimizer, temperature) *
+                  acid ** optimizer.process_params['n'] * seconds)
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_constant_profile_matches_closed_form(optimizer, method):
+    result = optimizer.simulate_kinetics(ACID, TEMPERATURE, RESIDENCE, method=method)
+
+    expected = _closed_form_starch(optimizer, ACID, TEMPERATURE, RESIDENCE * 60)
+    assert expected.min() < 0.2 and expected.max() > 0.9
+    np.testing.assert_allclose(result['starch'], expected, rtol=1e-5, atol=1e-8)
+    np.testing.assert_allclose(result['conversion'], 1 - expected, rtol=1e-5, atol=1e-8)
+    assert result['steps'] > 0
+
+
+def test_ode_batch_conversion_matches_closed_form(optimizer):
+    exact = optimizer.calculate_conversion_batch(ACID, TEMPERATURE, RESIDENCE)
+    optimizer.enable_ode_kinetics(method='rk4')
+    np.testing.assert_allclose(optimizer.calculate_conversion_batch(ACID, TEMPERATURE, RESIDENCE),
+                               exact, rtol=1e-5, atol=1e-8)
+
+
+def test_held_profile_matches_piecewise_closed_form(optimizer):
+    acid = np.column_stack([ACID, ACID[::-1]])
+    temperature = np.column_stack([TEMPERATURE, TEMPERATURE[::-1]])
+    result = optimizer.simulate_kinetics(acid, temperature, RESIDENCE, breakpoints=[0, 0.25],
+                                         samples=5)
+
+    seconds = RESIDENCE * 60
+    expected = (_closed_form_starch(optimizer, acid[:, 0], temperature[:, 0], 0.25 * seconds) *
+                _closed_form_starch(optimizer, acid[:, 1], temperature[:, 1], 0.75 * seconds))
+    np.testing.assert_allclose(result['starch'], expected, rtol=1e-5, atol=1e-8)
+
+    trajectory = result['trajectory']
+    assert trajectory.shape == (len(ACID), 5)
+    np.testing.assert_allclose(trajectory[:, 0], 1.0)
+    np.testing.assert_allclose(trajectory[:, -1], result['starch'])
+    assert np.all(np.diff(trajectory, axis=1) <= 0)
+
+
+def test_rejects_bad_options(optimizer):
+    with pytest.raises(ValueError):
+        optimizer.simulate_kinetics(ACID, TEMPERATURE, RESIDENCE, method='euler')
+    with pytest.raises(ValueError):
+        optimizer.simulate_kinetics(ACID, TEMPERATURE, RESIDENCE, breakpoints=[0.1, 0.5])
@@ -0,0 +1,218 @@
+"""Tests for CornProcessOptimizer scoring, problem identity and caching"""
+
+import numpy as np
+import pytest
+
+from main import CornProcessOptimizer
+from result_cache import OptimizationCache, problem_key
+
+
+
+def _random_candidates(optimizer, n, seed=0):
+    """Candidates spread uniformly across the decision bounds"""
+    rng = np.random.default_rng(seed)
+    lower, upper = np.array([optimizer.constraints[name]
+                             for name in optimizer.DECISION_VARIABLES]).T
+    return rng.uniform(lower, upper, size=(n, len(lower)))
+
+
+def test_batch_objective_matches_scalar():
+    optimizer = CornProcessOptimizer()
+    candidates = _random_candidates(optimizer, 200)
+
+    expected = [optimizer.objective_function(row) for row in candidates.tolist()]
+    np.testing.assert_allclose(optimizer.objective_function_batch(candidates), expected,
+                               rtol=1e-12, atol=1e-12)
+    # differential_evolution(vectorized=True) passes the population transposed
+    np.testing.assert_allclose(optimizer._vectorized_objective(candidates.T), expected,
+                               rtol=1e-12, atol=1e-12)
+
+def test_kinetics_model_changes_problem_key():
+    optimizer = CornProcessOptimizer()
+    closed_form = problem_key(optimizer._problem_snapshot())
+
+    optimizer.enable_ode_kinetics()
+    auto = problem_key(optimizer._problem_snapshot())
+    optimizer.enable_ode_kinetics(method='rk4')
+    rk4 = problem_key(optimizer._problem_snapshot())
+    optimizer.disable_ode_kinetics()
+
+    assert len({closed_form, auto, rk4}) == 3
+    assert problem_key(optimizer._problem_snapshot()) == closed_form
+
+
+def test_sweep_cache_separates_kinetics_models():
+    optimizer = CornProcessOptimizer()
+    grid = np.linspace(0.5, 2.0, 5)
+    closed_form = optimizer.sweep(acid_conc=grid)
+    assert optimizer.sweep(acid_conc=grid) is closed_form
+
+    optimizer.enable_ode_kinetics()
+    assert optimizer.sweep(acid_conc=grid) is not closed_form
+
+
+def test_ode_solution_not_served_to_closed_form():
+    cache = OptimizationCache()
+    ode = CornProcessOptimizer(cache=cache)
+    ode.enable_ode_kinetics()
+    ode.optimize_setpoints()
+
+    closed_form = CornProcessOptimizer(cache=cache)
+    result = closed_form.optimize_setpoints()
+    assert result['optimization_details']['mode'] != 'cache'
+
+
+def feasible_optimizer(**kwargs):
+    """Optimizer whose safety limits admit a feasible point (the shipped pH_min does not)"""
+    optimizer = CornProcessOptimizer(**kwargs)
+    optimizer.safety_limits['pH_min'] = 0.5
+    return optimizer
+
+
+def test_hybrid_rejects_infeasible_limits():
+    with pytest.raises(ValueError, match='pH_min'):
+        CornProcessOptimizer().optimize_setpoints(method='hybrid')
+
+
+@pytest.mark.parametrize('model', ['closed_form', 'ode'])
+def test_hybrid_polish_matches_de_on_every_model(model):
+    optimizers = [feasible_optimizer(), feasible_optimizer()]
+    for optimizer in optimizers:
+        if model == 'ode':
+            optimizer.enable_ode_kinetics()
+    hybrid = optimizers[0].optimize_setpoints(method='hybrid')
+    de = optimizers[1].optimize_setpoints()
+
+    assert hybrid['optimization_details']['feasible']
+    assert hybrid['optimization_details']['max_constraint_violation'] == 0
+    assert hybrid['performance']['objective_value'] <= de['performance']['objective_value'] + 1e-6
+
+
+def test_polish_uses_model_gradient_only_for_closed_form():
+    optimizer = CornProcessOptimizer()
+    assert optimizer._polish_functions()[1] == optimizer.objective_gradient
+    optimizer.enable_ode_kinetics()
+    assert optimizer._polish_functions()[1] == '2-point'
+
+
+def test_objective_gradient_matches_finite_differences():
+    optimizer = CornProcessOptimizer()
+    x = np.array([1.2, 75.0, 60.0, 200.0])
+    step = np.array([1e-6, 1e-4, 1e-4, 1e-3])
+    numeric = [(optimizer.objective_function(x + np.eye(4)[i] * step[i]) -
+                optimizer.objective_function(x - np.eye(4)[i] * step[i])) / (2 * step[i])
+               for i in range(4)]
+    np.testing.assert_allclose(optimizer.objective_gradient(x), numeric, rtol=1e-5, atol=1e-9)
+
+
+def test_cache_keeps_only_cold_solves():
+    cache = OptimizationCache()
+    optimizer = CornProcessOptimizer(cache=cache)
+    optimizer.optimize_setpoints()
+    optimizer.weights['yield'] *= 1.0001
+    warm = optimizer.optimize_setpoints()
+    assert warm['optimization_details']['mode'] == 'polish'
+    assert cache.stats()['entries'] == 1
+
+    # A hit moves the warm state to the served problem
+    optimizer.weights['yield'] /= 1.0001
+    assert optimizer.optimize_setpoints()['optimization_details']['mode'] == 'cache'
+    assert optimizer._warm_state['problem'] == optimizer._problem_snapshot()
+
+
+def test_sweep_matches_batch_objective():
+    optimizer = CornProcessOptimizer()
+    acid = np.linspace(0.2, 2.4, 7)
+    temperature = np.arange(60.0, 96.0, 5.0)
+    surface = optimizer.sweep(acid_conc=acid, temperature=temperature, fixed={'flow_rate': 250})
+
+    assert surface['dims'] == ('acid_conc', 'temperature')
+    assert surface['fixed'] == {'residence_time': 60.0, 'flow_rate': 250.0}
+    for metric in ('yield', 'quality', 'cost', 'safety', 'objective'):
+        assert surface[metric].shape == (7, 8)
+        assert not surface[metric].flags.writeable
+
+    a, t = np.meshgrid(acid, temperature, indexing='ij')
+    candidates = np.column_stack([a.ravel(), t.ravel(), np.full(a.size, 60.0),
+                                  np.full(a.size, 250.0)])
+    np.testing.assert_allclose(surface['objective'].ravel(),
+                               optimizer.objective_function_batch(candidates))
+
+    with pytest.raises(ValueError):
+        surface['objective'][0, 0] = 0.0
+    with pytest.raises(ValueError):
+        optimizer.sweep(pressure=acid)
+
+
+def test_sweep_cache_follows_weights():
+    optimizer = CornProcessOptimizer()
+    grid = np.linspace(0.5, 2.0, 5)
+    first = optimizer.sweep(acid_conc=grid)
+    assert optimizer.sweep(acid_conc=grid.copy()) is first
+
+    optimizer.weights['cost'] *= 2
+    reweighted = optimizer.sweep(acid_conc=grid)
+    assert reweighted is not first
+    assert not np.array_equal(reweighted['objective'], first['objective'])
+
+
+def test_warm_start_modes_follow_problem_drift():
+    optimizer = CornProcessOptimizer()
+    cold = optimizer.optimize_setpoints(use_cache=False)
+    assert cold['optimization_details']['mode'] == 'cold'
+
+    polished = optimizer.optimize_setpoints(use_cache=False)
+    assert polished['optimization_details']['mode'] == 'polish'
+    assert (polished['optimization_details']['function_evaluations'] <
+            cold['optimization_details']['function_evaluations'])
+    assert (polished['performance']['objective_value'] <=
+            cold['performance']['objective_value'] + 1e-9)
+
+    optimizer.weights['cost'] *= 1.05
+    warm = optimizer.optimize_setpoints(use_cache=False)
+    assert warm['optimization_details']['mode'] == 'warm'
+
+    optimizer.weights['cost'] *= 2
+    assert optimizer.optimize_setpoints(use_cache=False)['optimization_details']['mode'] == 'cold'
+    assert optimizer.optimize_setpoints(
+        warm_start=False, use_cache=False)['optimization_details']['mode'] == 'cold'
+
+
+def test_disturbance_samples_are_reproducible():
+    optimizer = CornProcessOptimizer()
+    noise = optimizer.disturbance_samples(32, seed=3)
+
+    np.testing.assert_array_equal(noise, optimizer.disturbance_samples(32, seed=3))
+    assert not np.array_equal(noise, optimizer.disturbance_samples(32, seed=4))
+    assert noise.shape == (32, 4)
+    assert not noise[:, 2].any()
+
+
+def test_robust_objective_uses_common_random_numbers():
+    optimizer = CornProcessOptimizer()
+    candidates = _random_candidates(optimizer, 5)
+    noise = optimizer.disturbance_samples(16, seed=1)
+
+    expected = []
+    for row in candidates:
+        disturbed = row + noise
+        disturbed[:, 0] = np.maximum(disturbed[:, 0], optimizer.ROBUST_ACID_FLOOR)
+        expected.append(optimizer.objective_function_batch(disturbed))
+    expected = np.array(expected)
+
+    np.testing.assert_allclose(optimizer.robust_objective_batch(candidates, noise),
+                               expected.mean(axis=1))
+    np.testing.assert_allclose(optimizer.robust_objective_batch(candidates, noise, 90),
+                               np.percentile(expected, 90, axis=1))
+
+
+def test_robust_optimum_is_deterministic_per_seed():
+    first = CornProcessOptimizer().optimize_robust(n_samples=16, seed=5, use_cache=False)
+    second = CornProcessOptimizer().optimize_robust(n_samples=16, seed=5, use_cache=False)
+
+    assert first['optimization_details'] == second['optimization_details']
+    for name in ('acid_concentration', 'temperature', 'residence_time', 'flow_rate'):
+        assert first[name] == second[name]
+
+    with pytest.raises(ValueError):
+        CornProcessOptimizer().optimize_robust(statistic=150)
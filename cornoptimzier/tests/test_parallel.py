@@ -0,0 +1,58 @@
+"""Tests for pool-parallel scoring: results must not depend on the worker count"""
+
+from datetime import datetime
+
+import numpy as np
+
+from main import CornProcessOptimizer
+from backend.models import ProcessState
+from backend.optimizer import create_optimizer
+
+SETPOINTS = ('acid_concentration', 'temperature', 'residence_time', 'flow_rate', 'pH_setpoint')
+
+
+def test_pool_matches_serial_setpoints():
+    serial = CornProcessOptimizer().optimize_setpoints(warm_start=False, use_cache=False)
+    pooled = CornProcessOptimizer(workers=2).optimize_setpoints(warm_start=False,
+                                                                use_cache=False)
+
+    for name in SETPOINTS:
+        assert pooled[name] == serial[name]
+    assert pooled['performance'] == serial['performance']
+
+
+def _backend_state():
+    return ProcessState(
+        timestamp=datetime(2024, 1, 1),
+        batch_id='TEST-001',
+        current_ph=4.5,
+        current_temperature=52.5,
+        current_acid_concentration=1.0,
+        current_so2_level=1200,
+        tank_level=80.0,
+        acid_tank_level=75.0,
+        elapsed_time=0.0,
+        starch_extracted=0.0,
+        protein_extracted=0.0,
+        starch_yield=0.0,
+        starch_purity=95.0
+    )
+
+
+def test_backend_pool_matches_serial_and_counts_evaluations():
+    # A plain map gives the same deferred-update DE as a pool, run serially
+    serial = create_optimizer(workers=map)
+    serial.enable_profiling()
+    pooled = create_optimizer(workers=2)
+    pooled.enable_profiling()
+
+    expected = serial.optimize_batch(_backend_state())
+    result = pooled.optimize_batch(_backend_state())
+
+    np.testing.assert_array_equal(
+        [result['optimal_parameters'][name] for name in expected['optimal_parameters']],
+        list(expected['optimal_parameters'].values())
+    )
+    evaluations = result['profile']['objective_evaluations']
+    assert evaluations > 0
+    assert evaluations == expected['profile']['objective_evaluations']
@@ -0,0 +1,58 @@
+"""Tests for the NSGA-II front and weight-based selection from it"""
+
+import numpy as np
+
+from main import CornProcessOptimizer
+from pareto import dominance_matrix, non_dominated_sort
+
+
+def test_non_dominated_sort_ranks():
+    F = np.array([[1.0, 4.0], [2.0, 2.0], [4.0, 1.0], [3.0, 3.0], [4.0, 4.0], [2.0, 2.0]])
+    np.testing.assert_array_equal(non_dominated_sort(F), [0, 0, 0, 1, 2, 0])
+
+
+def _front(optimizer):
+    optimizer.optimize_pareto(pop_size=40, generations=20, seed=1)
+    return optimizer.pareto_front
+
+
+def test_pareto_front_is_non_dominated():
+    optimizer = CornProcessOptimizer()
+    front = _front(optimizer)
+
+    lower, upper = np.array(optimizer._bounds()).T
+    assert np.all((front['x'] >= lower) & (front['x'] <= upper))
+    np.testing.assert_allclose(front['performance'], optimizer.performance_batch(front['x']))
+    # Yield, quality and safety are maximized, cost minimized
+    minimized = front['performance'] * np.array([-1.0, -1.0, 1.0, -1.0])
+    assert not dominance_matrix(minimized).any()
+
+
+def test_select_pareto_setpoints_uses_stored_front():
+    optimizer = CornProcessOptimizer()
+    front = _front(optimizer)
+
+    cheapest = optimizer.select_pareto_setpoints({'yield': 0.0, 'quality': 0.0,
+                                                  'cost': 1.0, 'safety': 0.0})
+    assert optimizer.pareto_front is front
+    assert cheapest['optimization_details'] == {'mode': 'pareto', 'function_evaluations': 0,
+                                                'front_size': len(front['x'])}
+    assert cheapest['performance']['cost'] == front['performance'][:, 2].min()
+
+    best = optimizer.select_pareto_setpoints()
+    objective = front['performance'] @ optimizer.objective_coefficients()
+    assert best['performance']['objective_value'] == objective.min()
+    assert optimizer.current_setpoints is best
+
+
+def test_select_pareto_setpoints_rebuilds_stale_front():
+    optimizer = CornProcessOptimizer()
+    front = _front(optimizer)
+
+    optimizer.weights['yield'] = 0.9
+    optimizer.select_pareto_setpoints()
+    assert optimizer.pareto_front is front
+
+    optimizer.safety_limits['temp_max'] = 90
+    optimizer.select_pareto_setpoints()
+    assert optimizer.pareto_front is not front
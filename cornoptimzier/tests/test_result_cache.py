@@ -0,0 +1,64 @@
+"""Tests for problem keys and the optimization result cache"""
+
+import numpy as np
+
+from result_cache import OptimizationCache, problem_key
+
+PROBLEM = {
+    'process_params': {'acid_conc': 1.0, 'temperature': 120.0},
+    'weights': {'yield': 1.0, 'cost': 0.5},
+    'constraints': {'acid_conc': (0.5, 2.0)},
+    'safety_limits': {'pH_min': 1.5}
+}
+
+
+def test_key_ignores_dict_order_and_numpy_types():
+    reordered = {
+        'safety_limits': {'pH_min': np.float64(1.5)},
+        'constraints': {'acid_conc': [0.5, 2.0]},
+        'weights': {'cost': 0.5, 'yield': np.float32(1.0)},
+        'process_params': {'temperature': np.float64(120.0), 'acid_conc': 1.0}
+    }
+    assert problem_key(reordered) == problem_key(PROBLEM)
+
+
+def test_key_changes_with_problem_and_options():
+    changed = dict(PROBLEM, weights={'yield': 1.0, 'cost': 0.51})
+    keys = {
+        problem_key(PROBLEM),
+        problem_key(changed),
+        problem_key(PROBLEM, method='hybrid'),
+        problem_key(PROBLEM, method='de'),
+        problem_key(PROBLEM, method='de', seed=1)
+    }
+    assert len(keys) == 5
+
+
+def test_get_returns_copies():
+    cache = OptimizationCache()
+    cache.put('k', {'setpoints': {'acid_conc': np.float64(1.2)}})
+    first = cache.get('k')
+    first['setpoints']['acid_conc'] = 99.0
+    assert cache.get('k') == {'setpoints': {'acid_conc': 1.2}}
+    assert cache.get('missing') is None
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+
+
+def test_lru_eviction():
+    cache = OptimizationCache(max_entries=2)
+    cache.put('a', {'n': 1})
+    cache.put('b', {'n': 2})
+    cache.get('a')
+    cache.put('c', {'n': 3})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'n': 1} and cache.get('c') == {'n': 3}
+
+
+def test_disk_entries_survive_a_new_cache(tmp_path):
+    OptimizationCache(disk_dir=str(tmp_path)).put('k', {'n': 1})
+    cache = OptimizationCache(disk_dir=str(tmp_path))
+    assert cache.get('k') == {'n': 1}
+    assert cache.stats()['disk_hits'] == 1
+
+    (tmp_path / 'bad.json').write_text('{not json')
+    assert cache.get('bad') is None
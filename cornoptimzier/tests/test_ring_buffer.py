@@ -0,0 +1,60 @@
+"""Tests for the columnar ring buffer"""
+
+import numpy as np
+import pytest
+
+from ring_buffer import RingBuffer
+
+
+def filled(capacity, n):
+    buffer = RingBuffer(('timestamp', 'value'), capacity)
+    for i in range(n):
+        buffer.append([i, 10.0 * i])
+    return buffer
+
+
+def test_wraparound_keeps_newest_samples_contiguous():
+    buffer = filled(4, 10)
+    assert len(buffer) == 4 and buffer.count == 10 and buffer.first_sequence == 6
+
+    start, window = buffer.window()
+    assert start == 6
+    np.testing.assert_array_equal(window['timestamp'], [6, 7, 8, 9])
+    # One slice of the doubled array, not a copy
+    assert window['value'].base is not None and not window['value'].flags.writeable
+
+    start, last = buffer.window(2)
+    assert start == 8
+    np.testing.assert_array_equal(last['value'], [80.0, 90.0])
+
+
+def test_snapshot_since_and_rows():
+    buffer = filled(4, 10)
+    start, columns = buffer.snapshot(since=8)
+    assert start == 8
+    np.testing.assert_array_equal(columns['timestamp'], [8, 9])
+    assert columns['timestamp'].flags.writeable
+
+    # Evicted sequence numbers are clamped to what is retained
+    start, columns = buffer.snapshot(since=2)
+    assert start == 6 and len(columns['timestamp']) == 4
+    assert buffer.snapshot(since=10)[1]['timestamp'].size == 0
+    assert buffer.rows(1) == [{'timestamp': 9.0, 'value': 90.0}]
+
+
+@pytest.mark.parametrize('block_size', [3, 4, 11])
+def test_extend_matches_append(block_size):
+    appended = filled(4, 13)
+    extended = RingBuffer(('timestamp', 'value'), 4)
+    samples = np.array([np.arange(13.0), 10.0 * np.arange(13.0)])
+    for lo in range(0, 13, block_size):
+        extended.extend(samples[:, lo:lo + block_size])
+
+    assert extended.count == appended.count
+    for name in ('timestamp', 'value'):
+        np.testing.assert_array_equal(extended.window()[1][name], appended.window()[1][name])
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        RingBuffer(('timestamp',), 0)
@@ -0,0 +1,63 @@
+"""Tests for versioned setpoint snapshots"""
+
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from setpoint_store import SetpointStore
+
+
+def test_publish_bumps_version_and_etag():
+    store = SetpointStore()
+    initial = store.snapshot()
+    assert initial.version == 0 and not initial
+
+    first = store.publish({'temperature': 75.0}, source='optimize')
+    second = store.publish({'temperature': 80.0})
+
+    assert (first.version, second.version) == (1, 2)
+    assert store.version == 2 and store.snapshot() is second
+    assert first.etag == '"1"' and second.etag == '"2"'
+    assert first.source == 'optimize'
+    # Older snapshots held by readers are unaffected by later versions
+    assert first.setpoints['temperature'] == 75.0
+
+
+def test_snapshot_is_read_only_and_serialized_once():
+    store = SetpointStore()
+    snapshot = store.publish({'temperature': np.float64(75.0),
+                              'performance': {'yield': 0.5, 'history': [1, 2]}})
+
+    with pytest.raises(TypeError):
+        snapshot.setpoints['temperature'] = 0.0
+    with pytest.raises(TypeError):
+        snapshot.setpoints['performance']['yield'] = 0.0
+    assert json.loads(snapshot.json) == {'temperature': 75.0,
+                                         'performance': {'yield': 0.5, 'history': [1, 2]}}
+
+    copy = snapshot.to_dict()
+    copy['performance']['history'].append(3)
+    assert snapshot.setpoints['performance']['history'] == (1, 2)
+
+
+def test_concurrent_updates_are_not_lost():
+    store = SetpointStore({'count': 0})
+
+    def increment(setpoints):
+        setpoints['count'] += 1
+        return setpoints
+
+    def worker():
+        for _ in range(200):
+            store.update(increment)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.version == 800
+    assert store.snapshot().setpoints['count'] == 800
@@ -0,0 +1,57 @@
+"""Tests for the server-sent event broadcaster"""
+
+import pytest
+
+from streaming import Broadcaster, SubscriberLimitError
+
+
+def test_events_reach_every_subscriber_in_order():
+    broadcaster = Broadcaster()
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    assert broadcaster.publish('tick', {'value': 1}) == 2
+    assert broadcaster.publish('tick', {'value': 2}) == 2
+
+    for subscriber in (first, second):
+        assert subscriber.queue.get_nowait() == b'id: 1\nevent: tick\ndata: {"value":1}\n\n'
+        assert subscriber.queue.get_nowait() == b'id: 2\nevent: tick\ndata: {"value":2}\n\n'
+
+
+def test_slow_subscriber_is_dropped_with_overflow_event():
+    broadcaster = Broadcaster(max_queue=3, heartbeat=0.01)
+    slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+
+    for value in range(3):
+        broadcaster.publish('tick', value)
+        fast.queue.get_nowait()
+    assert broadcaster.publish('tick', 3) == 1
+
+    assert slow.dropped and not fast.dropped
+    assert broadcaster.stats()['subscribers'] == 1
+    assert broadcaster.stats()['overflows'] == 1
+    # The dropped stream ends after the overflow notice instead of replaying stale events
+    assert list(broadcaster.stream(slow)) == [
+        b'event: overflow\ndata: {"reason":"client too slow"}\n\n'
+    ]
+    assert broadcaster.publish('tick', 4) == 1
+
+
+def test_stream_sends_keepalive_and_unsubscribes():
+    broadcaster = Broadcaster(heartbeat=0.01)
+    subscriber = broadcaster.subscribe()
+    stream = broadcaster.stream(subscriber, initial=b'event: hello\ndata: {}\n\n')
+
+    assert next(stream) == b'event: hello\ndata: {}\n\n'
+    assert next(stream) == b': keepalive\n\n'
+    stream.close()
+    assert broadcaster.subscribers == 0
+
+
+def test_subscriber_limit():
+    broadcaster = Broadcaster(max_subscribers=1)
+    subscriber = broadcaster.subscribe()
+    with pytest.raises(SubscriberLimitError):
+        broadcaster.subscribe()
+
+    broadcaster.unsubscribe(subscriber)
+    broadcaster.subscribe()
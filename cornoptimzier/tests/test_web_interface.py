@@ -0,0 +1,180 @@
+"""Tests for the per-line HTTP API"""
+
+import os
+
+# The hosted lines are read at import time
+os.environ['CORN_OPTIMIZER_LINES'] = 'north,south'
+for name in ('CORN_OPTIMIZER_CACHE_DIR', 'CORN_OPTIMIZER_HISTORY_DIR', 'CORN_OPTIMIZER_ALARM_RULES'):
+    os.environ.pop(name, None)
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import web_interface
+from web_interface import jobs, plant
+
+
+@pytest.fixture(scope='module')
+def client():
+    web_interface.app.config['TESTING'] = True
+    return web_interface.app.test_client()
+
+
+@pytest.fixture(scope='module')
+def optimized(client):
+    """South has setpoints from a finished optimization job; north has none"""
+    response = client.post('/api/lines/south/jobs', json={'kind': 'setpoints'})
+    assert response.status_code == 202
+    job = jobs.get(response.get_json()['job_id'])
+    assert job.wait(300)
+    assert client.get(f'/api/jobs/{job.id}/result').get_json()['success']
+    return job
+
+
+def test_lines_are_listed(client):
+    body = client.get('/api/lines').get_json()
+    assert body['default_line'] == 'north'
+    assert [line['line_id'] for line in body['lines']] == ['north', 'south']
+
+
+def test_unknown_line_is_404(client):
+    response = client.get('/api/lines/west/setpoints')
+    assert response.status_code == 404
+    assert response.get_json() == {'success': False, 'message': 'Unknown line: west'}
+    assert client.post('/api/lines/west/jobs', json={}).status_code == 404
+
+
+def test_setpoints_are_per_line(client, optimized):
+    south = client.get('/api/lines/south/setpoints')
+    assert south.status_code == 200 and south.get_json()['success']
+    north = client.get('/api/lines/north/setpoints')
+    # The default line is served under its own id too, not redirected
+    assert north.status_code == 200 and not north.get_json()['success']
+    # The un-namespaced routes answer for the default line
+    assert not client.get('/api/setpoints').get_json()['success']
+
+    version = south.get_json()['version']
+    assert client.get(f'/api/lines/south/setpoints?version={version}').status_code == 304
+    assert client.get('/api/lines/south/setpoints',
+                      headers={'If-None-Match': south.headers['ETag']}).status_code == 304
+
+
+def test_jobs_are_listed_per_line(client, optimized):
+    south = client.get('/api/lines/south/jobs').get_json()['jobs']
+    assert optimized.id in [job['job_id'] for job in south]
+    assert client.get('/api/lines/north/jobs').get_json()['jobs'] == []
+
+
+def test_job_validation(client):
+    assert client.post('/api/lines/north/jobs', json={'kind': 'nope'}).status_code == 400
+    response = client.post('/api/lines/north/jobs', json={'options': {'bogus': 1}})
+    assert response.status_code == 400
+    # Hybrid solves cannot succeed under the shipped safety limits
+    response = client.post('/api/lines/north/jobs', json={'options': {'method': 'hybrid'}})
+    assert response.status_code == 400
+    assert client.get('/api/jobs/missing').status_code == 404
+
+
+@pytest.mark.parametrize('options', [
+    {'n_samples': 'x'},
+    {'n_samples': True},
+    {'n_samples': 2.5},
+    {'n_samples': 0},
+    {'statistic': 'median'},
+    {'statistic': 150},
+    {'seed': 'abc'},
+    {'use_cache': 'yes'}
+])
+def test_job_option_values_are_checked(client, options):
+    response = client.post('/api/lines/north/jobs', json={'kind': 'robust', 'options': options})
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith(f'Invalid {next(iter(options))}')
+
+
+def test_job_options_are_converted(client, optimized):
+    assert client.post('/api/lines/north/jobs', json={'options': [1]}).status_code == 400
+    # Run on south: a finished job publishes setpoints to its line
+    response = client.post('/api/lines/south/jobs', json={
+        'kind': 'robust', 'options': {'n_samples': 8.0, 'statistic': 90, 'seed': None}
+    })
+    assert response.status_code == 202
+    job = jobs.get(response.get_json()['job_id'])
+    assert job.params == {'n_samples': 8, 'statistic': 90.0, 'seed': None}
+    assert job.wait(300) and job.status == 'done'
+
+
+def test_update_setpoint_publishes_new_version(client, optimized):
+    before = client.get('/api/lines/south/setpoints').get_json()['version']
+    body = client.post('/api/lines/south/update_setpoint',
+                       json={'parameter': 'temperature', 'value': 80}).get_json()
+    assert body['success'] and body['version'] == before + 1
+    assert body['updated_setpoints']['temperature'] == 80
+
+    rejected = client.post('/api/lines/south/update_setpoint',
+                           json={'parameter': 'temperature', 'value': 200}).get_json()
+    assert not rejected['success']
+    # Without a baseline there is nothing to update
+    assert not client.post('/api/lines/north/update_setpoint',
+                           json={'parameter': 'temperature', 'value': 80}).get_json()['success']
+
+
+def test_tick_records_only_lines_with_setpoints(client, optimized):
+    before = {line_id: line.monitor.data_buffer.count for line_id, line in plant.lines.items()}
+    assert plant.tick(datetime(2024, 1, 1, 12)) == 1
+
+    south = client.get('/api/lines/south/current_data').get_json()
+    assert len(south['real_time']) == before['south'] + 1
+    assert south['cursor'] == before['south'] + 1
+    assert client.get('/api/lines/north/current_data').get_json()['real_time'] == []
+
+    since = client.get(f"/api/lines/south/current_data?cursor={south['cursor']}").get_json()
+    assert since['real_time'] == [] and not since['gap']
+
+
+def test_chart_columns_format(client, optimized):
+    plant.tick(datetime(2024, 1, 1, 12, 0, 2))
+
+    trend = client.get('/api/lines/south/trend_chart?format=columns').get_json()
+    assert trend['success']
+    columns = trend['columns']
+    assert set(columns) == {'timestamp', 'yield', 'quality', 'temperature'}
+    assert len(columns['timestamp']) == len(columns['yield']) > 0
+
+    performance = client.get('/api/lines/south/performance_chart?format=columns')
+    body = performance.get_json()
+    assert body['success'] and body['version'] == plant.lines['south'].setpoints.snapshot().version
+    assert body['columns']['categories'] == list(web_interface.PERFORMANCE_CATEGORIES)
+    assert len(body['columns']['values']) == 4
+    assert client.get('/api/lines/south/performance_chart?format=columns',
+                      headers={'If-None-Match': performance.headers['ETag']}).status_code == 304
+    assert client.get('/api/lines/south/performance_chart?format=svg').status_code == 400
+
+
+def test_sample_cursor_reports_gaps():
+    monitor = web_interface.ProcessMonitor(None, 0, capacity=8)
+    start = datetime(2024, 1, 1).timestamp()
+
+    def record(n):
+        for _ in range(n):
+            monitor.record(start + monitor.data_buffer.count,
+                           np.full(len(web_interface.SIGNALS) - 1, float(monitor.data_buffer.count)))
+
+    record(5)
+    rows, cursor, gap = monitor.samples_since(0)
+    assert [row['temperature'] for row in rows] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert (cursor, gap) == (5, False)
+    assert monitor.samples_since(cursor) == ([], 5, False)
+
+    # Sequences 0-6 are evicted once 15 samples went through 8 slots
+    record(10)
+    rows, cursor, gap = monitor.samples_since(3)
+    assert [row['temperature'] for row in rows] == [float(n) for n in range(7, 15)]
+    assert (cursor, gap) == (15, True)
+    assert monitor.samples_since(8)[2] is False
+
+    # A backlog larger than the limit returns only the newest entries
+    rows, cursor, gap = monitor.samples_since(8, limit=3)
+    assert [row['temperature'] for row in rows] == [12.0, 13.0, 14.0]
+    assert (cursor, gap) == (15, True)
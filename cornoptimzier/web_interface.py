@@ -3,182 +3,841 @@ Web-based User Interface for Corn Processing Acid Set Point Optimizer
 Flask-based dashboard with real-time monitoring and control capabilities
 """
 
-from flask import Flask, render_template, jsonify, request, send_file
-import plotly.graph_objs as go
-import plotly.utils
-import pandas as pd
+from flask import (Flask, Response, abort, make_response, render_template, jsonify, request,
+                   send_file, stream_with_context)
 import json
+import math
 from datetime import datetime, timedelta
 import threading
 import time
 import os
+import numpy as np
 from main import CornProcessOptimizer
+from result_cache import OptimizationCache, problem_key
+from jobs import JobQueue, QueueFullError, FINISHED, DONE
+from setpoint_store import SetpointStore
+from ring_buffer import RingBuffer
+from streaming import Broadcaster, SubscriberLimitError
+from chart_cache import PayloadCache
+from historian import Historian
+from downsample import TIERS, Rollups, lttb, minmax_envelope
+from alarms import AlarmRule, AlarmEngine, load_rules
 
 app = Flask(__name__)
 app.secret_key = 'corn_optimizer_2024'
+# The default line is served at /api/<rule> and /api/lines/<id>/<rule>;
+# without this, werkzeug answers the second with a redirect to the first,
+# which drops POST bodies for clients that do not follow 308s
+app.url_map.redirect_defaults = False
 
-# Global optimizer instance
-optimizer = CornProcessOptimizer()
-current_data = {'real_time': [], 'alarms': []}
-optimization_running = False
+def parse_line_ids(spec):
+    """Line ids from a line count ('24') or a comma-separated list of ids"""
+    if not spec:
+        return ['main']
+    if spec.strip().isdigit():
+        return [f'line-{i + 1}' for i in range(int(spec))]
+    ids = [line_id.strip() for line_id in spec.split(',') if line_id.strip()]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Duplicate line ids in {spec!r}")
+    return ids
+
+# Production lines hosted by this process (CORN_OPTIMIZER_LINES); the first
+# one also answers the un-namespaced /api/... routes
+LINE_IDS = parse_line_ids(os.environ.get('CORN_OPTIMIZER_LINES'))
+DEFAULT_LINE = LINE_IDS[0]
+
+# Optimization results, shared by every line since identical problems have
+# identical optima; they persist across restarts when
+# CORN_OPTIMIZER_CACHE_DIR is set
+result_cache = OptimizationCache(disk_dir=os.environ.get('CORN_OPTIMIZER_CACHE_DIR'))
+
+# Signals recorded per sample, in ring-buffer column order; timestamps are
+# stored as epoch seconds
+SIGNALS = ('timestamp', 'acid_concentration', 'temperature', 'flow_rate',
+           'pH', 'yield', 'quality', 'cost')
+
+# Decimal places each signal is reported with
+SIGNAL_DECIMALS = {'acid_concentration': 3, 'temperature': 1, 'flow_rate': 1,
+                   'pH': 2, 'yield': 3, 'quality': 1, 'cost': 2}
+
+# Sensor noise (standard deviation) on acid, temperature and flow readings
+SENSOR_NOISE = np.array([0.02, 1.0, 5.0])
+
+# One sample per line every TICK_SECONDS
+TICK_SECONDS = 2.0
+
+# Samples kept in memory per line (default: one day at one sample per 2 s,
+# shared out between lines but at least an hour each), and the number
+# returned by /api/current_data
+BUFFER_CAPACITY = int(os.environ.get('CORN_OPTIMIZER_BUFFER_CAPACITY',
+                                     max(1800, 43200 // len(LINE_IDS))))
+API_WINDOW = 100
+ALARM_HISTORY = 50
+
+# Rollup retention per line; shorter when hosting several lines so memory
+# stays bounded (older ranges come from the historian, if configured)
+ROLLUP_TIERS = TIERS if len(LINE_IDS) == 1 else (
+    ('1min', 60, 6 * 60),
+    ('10min', 600, 2 * 24 * 6),
+    ('1h', 3600, 30 * 24)
+)
+
+# Alarm limits; CORN_OPTIMIZER_ALARM_RULES may name a JSON file of rules
+# to use instead
+ALARM_RULES = (
+    AlarmRule('acid_high', 'acid_concentration', 2.0, 'high', 'HIGH',
+              'Acid concentration high: {value:.2f} M', deadband=0.05, off_delay=10),
+    AlarmRule('temperature_high', 'temperature', 92, 'high', 'HIGH',
+              'Temperature high: {value:.1f} °C', deadband=1.0, off_delay=10),
+    AlarmRule('ph_low', 'pH', 1.8, 'low', 'MEDIUM',
+              'pH low: {value:.2f}', deadband=0.05, off_delay=10),
+    AlarmRule('yield_low', 'yield', 0.85, 'low', 'MEDIUM',
+              'Yield low: {value:.1%}', deadband=0.01, off_delay=10)
+)
+if os.environ.get('CORN_OPTIMIZER_ALARM_RULES'):
+    ALARM_RULES = tuple(load_rules(os.environ['CORN_OPTIMIZER_ALARM_RULES']))
+
+# Every sample is also persisted when CORN_OPTIMIZER_HISTORY_DIR is set
+# (one subdirectory per line), for CORN_OPTIMIZER_HISTORY_DAYS (default:
+# forever)
+HISTORY_DIR = os.environ.get('CORN_OPTIMIZER_HISTORY_DIR')
+HISTORY_DAYS = os.environ.get('CORN_OPTIMIZER_HISTORY_DAYS')
+
+# Samples are written out every HISTORY_FLUSH_SECONDS rather than every
+# tick; reads include the unwritten ones, and at most that much is lost
+# if the process dies
+HISTORY_FLUSH_SECONDS = float(os.environ.get('CORN_OPTIMIZER_HISTORY_FLUSH_SECONDS', 60))
+
+# Downsampled trend queries read at most TREND_SOURCE_POINTS raw samples
+# or rollup buckets and return TREND_POINTS points per signal by default
+TREND_SOURCE_POINTS = 5000
+TREND_POINTS = 1000
+TREND_METHODS = ('lttb', 'minmax')
+TREND_WINDOWS = {'1h': 3600, '1d': 86400, '1w': 7 * 86400, '30d': 30 * 86400}
+
+# Optimizations of every line run in the background on one shared pool, so
+# request threads never wait on DE
+jobs = JobQueue(
+    max_workers=int(os.environ.get('CORN_OPTIMIZER_JOB_WORKERS', 2)),
+    max_pending=int(os.environ.get('CORN_OPTIMIZER_MAX_PENDING_JOBS', 8))
+)
+
+# Largest disturbance sample count a client may ask a robust job for
+MAX_ROBUST_SAMPLES = 1024
+
+def job_flag(value):
+    if not isinstance(value, bool):
+        raise ValueError("expected true or false")
+    return value
+
+def job_integer(value):
+    # JSON numbers may arrive as 64.0; booleans are not numbers here
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+        raise ValueError("expected an integer")
+    return int(value)
+
+def job_sample_count(value):
+    value = job_integer(value)
+    if not 1 <= value <= MAX_ROBUST_SAMPLES:
+        raise ValueError(f"expected 1 to {MAX_ROBUST_SAMPLES}")
+    return value
+
+def job_seed(value):
+    return None if value is None else job_integer(value)
+
+def job_statistic(value):
+    if value == 'mean':
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+        raise ValueError("expected 'mean' or a percentile from 0 to 100")
+    return float(value)
+
+# Job kinds: optimizer method, setpoint source label, and the options a
+# client may pass to it, each with the function that checks and converts
+# its JSON value. optimize_setpoints' method='hybrid' is not offered: under
+# the shipped safety limits (pH_min 1.8, pH taken as -log10(acid_conc)) no
+# acid concentration in bounds is feasible, so every hybrid job would fail
+JOB_KINDS = {
+    'setpoints': ('optimize_setpoints', 'optimize',
+                  {'warm_start': job_flag, 'use_cache': job_flag}),
+    'robust': ('optimize_robust', 'optimize_robust',
+               {'n_samples': job_sample_count, 'statistic': job_statistic,
+                'seed': job_seed, 'use_cache': job_flag})
+}
+
+# How long the legacy /api/optimize waits before handing back a job id;
+# enough for cache hits and warm polishes, short enough not to tie up a
+# request thread on a full solve
+OPTIMIZE_WAIT_SECONDS = 1.0
 
 class ProcessMonitor:
-    """Real-time process monitoring"""
+    """Sample history of one line: recent buffer, rollups and persisted history"""
     
-    def __init__(self):
-        self.data_buffer = []
-        self.running = False
+    def __init__(self, alarm_engine, stream, capacity=BUFFER_CAPACITY, historian=None):
+        # Preallocated columns; memory stays flat however long we run
+        self.data_buffer = RingBuffer(SIGNALS, capacity)
+        
+        # Pick up where the previous run left off
+        self.historian = historian
+        if historian is not None:
+            self.data_buffer.extend(historian.tail(capacity))
+        
+        # 1 min / 10 min / 1 h aggregates, updated with every sample
+        self.rollups = Rollups(SIGNALS[1:], ROLLUP_TIERS)
+        
+        # This line's row of the plant-wide alarm engine
+        self.alarm_engine = alarm_engine
+        self.stream = stream
+    
+    def backfill_rollups(self):
+        """Rebuild the rollup tiers from persisted history, a day at a time"""
+        if self.historian is None:
+            return
+        horizon = max(tier.interval * tier.buffer.capacity for tier in self.rollups.tiers)
+        for part in self.historian.iter_days(time.time() - horizon):
+            self.rollups.add_block(part['timestamp'], np.stack([part[name] for name in SIGNALS[1:]]))
+    
+    def record(self, timestamp, values):
+        """Store one sample: ``values`` holds SIGNALS[1:] in order"""
+        row = np.concatenate(([timestamp], values))
+        self.data_buffer.append(row)
+        if self.historian is not None:
+            self.historian.append(row)
+        self.rollups.add(timestamp, values)
+    
+    def recent(self, n=API_WINDOW):
+        """Last ``n`` samples as dicts with ISO timestamps, oldest first"""
+        rows = self.data_buffer.rows(n)
+        for row in rows:
+            row['timestamp'] = datetime.fromtimestamp(row['timestamp']).isoformat()
+        return rows
+    
+    def samples_since(self, cursor, limit=API_WINDOW):
+        """
+        Samples with sequence >= ``cursor`` (at most the newest ``limit``)
+        
+        Returns (rows, next_cursor, gap); ``gap`` is True when samples the
+        client has not seen were skipped or already evicted.
+        """
+        start, columns = self.data_buffer.snapshot(since=cursor)
+        end = start + len(columns['timestamp'])
+        if end - start > limit:
+            start = end - limit
+            columns = {name: values[-limit:] for name, values in columns.items()}
+        
+        timestamps = [datetime.fromtimestamp(ts).isoformat()
+                      for ts in columns['timestamp'].tolist()]
+        rows = [dict(zip(SIGNALS, values))
+                for values in zip(timestamps, *(columns[name].tolist() for name in SIGNALS[1:]))]
+        return rows, end, start > cursor
+    
+    def history(self, start=None, end=None, signals=SIGNALS):
+        """
+        Columns of samples with start <= timestamp < end (epoch seconds)
+        
+        Read from the historian when one is configured, otherwise from the
+        in-memory buffer.
+        """
+        if self.historian is not None:
+            return self.historian.query(start, end, signals)
+        
+        _, columns = self.data_buffer.snapshot()
+        timestamps = columns['timestamp']
+        lo = 0 if start is None else np.searchsorted(timestamps, start, 'left')
+        hi = len(timestamps) if end is None else np.searchsorted(timestamps, end, 'left')
+        return {name: columns[name][lo:hi] for name in signals}
+    
+    def sample_count(self, start=None, end=None):
+        """Number of recorded samples with start <= timestamp < end"""
+        if self.historian is not None:
+            return self.historian.count(start, end)
+        
+        _, columns = self.data_buffer.window()
+        timestamps = columns['timestamp']
+        lo = 0 if start is None else np.searchsorted(timestamps, start, 'left')
+        hi = len(timestamps) if end is None else np.searchsorted(timestamps, end, 'left')
+        return int(hi - lo)
+    
+    def _raw_covers(self, start):
+        """Whether raw samples still reach back to ``start``"""
+        if self.historian is not None or self.data_buffer.count <= self.data_buffer.capacity:
+            return True
+        _, columns = self.data_buffer.window()
+        return start is not None and start >= columns['timestamp'][0]
+    
+    def trend(self, start=None, end=None, signals=SIGNALS[1:], points=TREND_POINTS, method='lttb'):
+        """
+        Downsampled series of ``signals`` over [start, end)
+        
+        Ranges holding at most TREND_SOURCE_POINTS samples are downsampled
+        from raw data; longer ones from the finest rollup tier with at most
+        that many buckets, so the cost does not grow with the range. 'lttb'
+        returns {'timestamp', 'value'} points per signal (bucket means for
+        rollups), 'minmax' a {'timestamp', 'min', 'max'} envelope of at most
+        points / 2 buckets.
+        """
+        signals = tuple(name for name in signals if name != 'timestamp')
+        source_points = self.sample_count(start, end)
+        if source_points <= TREND_SOURCE_POINTS and self._raw_covers(start):
+            resolution = 'raw'
+            columns = self.history(start, end, ('timestamp',) + signals)
+            low = high = mean = {name: columns[name] for name in signals}
+        else:
+            span = (time.time() if end is None else end) - (0 if start is None else start)
+            tier = self.rollups.tier_for(span, TREND_SOURCE_POINTS)
+            resolution = tier.name
+            columns = tier.query(start, end)
+            low = {name: columns[f'{name}_min'] for name in signals}
+            high = {name: columns[f'{name}_max'] for name in signals}
+            mean = {name: columns[f'{name}_mean'] for name in signals}
+        
+        timestamps = columns['timestamp']
+        series = {}
+        for name in signals:
+            if method == 'minmax':
+                x, lo, hi = minmax_envelope(timestamps, low[name], high[name], max(1, points // 2))
+                series[name] = {'timestamp': x, 'min': lo, 'max': hi}
+            else:
+                indices = lttb(timestamps, mean[name], points)
+                series[name] = {'timestamp': timestamps[indices], 'value': mean[name][indices]}
+        return {
+            'resolution': resolution,
+            'method': method,
+            'source_points': len(timestamps),
+            'series': series
+        }
+    
+    def alarms_since(self, cursor=None):
+        """
+        Alarm events with sequence >= ``cursor`` (all retained when None)
+        
+        Returns (events, next_cursor, gap) like samples_since.
+        """
+        return self.alarm_engine.events_since(cursor, self.stream)
+    
+    def active_alarms(self):
+        """Alarms currently raised on this line"""
+        return self.alarm_engine.active(self.stream)
+
+class ProductionLine:
+    """One hosted line: its optimizer, setpoints, sample history and push channel"""
+    
+    def __init__(self, line_id, stream, alarm_engine):
+        self.id = line_id
+        self.optimizer = CornProcessOptimizer(cache=result_cache)
+        
+        # Setpoints as seen by the web app: immutable versioned snapshots
+        # that are swapped atomically, so readers never block or see a
+        # half-written update
+        self.setpoints = SetpointStore(self.optimizer.current_setpoints)
+        
+        historian = Historian(
+            os.path.join(HISTORY_DIR, line_id), SIGNALS,
+            retention_seconds=float(HISTORY_DAYS) * 86400 if HISTORY_DAYS else None,
+            flush_interval=HISTORY_FLUSH_SECONDS,
+            # Room for one interval of ticks, so the interval decides
+            flush_rows=int(HISTORY_FLUSH_SECONDS / TICK_SECONDS) + 16
+        ) if HISTORY_DIR else None
+        self.monitor = ProcessMonitor(alarm_engine, stream, historian=historian)
+        
+        # Push channel: every sample and alarm is encoded once and fanned
+        # out to all of this line's /api/stream clients
+        self.broadcaster = Broadcaster(
+            max_subscribers=int(os.environ.get('CORN_OPTIMIZER_MAX_STREAMS', 100)),
+            max_queue=int(os.environ.get('CORN_OPTIMIZER_STREAM_QUEUE', 256))
+        )
         
+        # Rendered chart bodies, rebuilt once per sample or setpoint version
+        self.chart_cache = PayloadCache()
+    
+    def published(self, optimize, source):
+        """Wrap an optimizer entry point so a successful result is published"""
+        def run(**options):
+            result = optimize(**options)
+            if result:
+                result = dict(result, version=self.setpoints.publish(result, source).version)
+            return result
+        return run
+    
+    def record(self, timestamp, when, values, events):
+        """Store and publish one sample and the alarm transitions it caused"""
+        self.monitor.record(timestamp, values)
+        # Serializing is the expensive part of a tick; skip it for lines
+        # nobody is watching
+        if self.broadcaster.subscribers:
+            data_point = dict(zip(SIGNALS, [when] + values.tolist()))
+            self.broadcaster.publish('sample', data_point)
+        for event in events:
+            self.broadcaster.publish('alarm', event)
+    
+    def summary(self):
+        snapshot = self.setpoints.snapshot()
+        return {
+            'line_id': self.id,
+            'setpoints_version': snapshot.version if snapshot else None,
+            'samples': self.monitor.data_buffer.count,
+            'active_alarms': len(self.monitor.active_alarms()),
+            'subscribers': self.broadcaster.subscribers
+        }
+
+class Plant:
+    """
+    All hosted lines, sampled together by one collector thread
+
+    Each tick simulates the sensors of every line with setpoints at once:
+    noise is drawn for all lines in one call, yield, quality and cost are
+    scored with one batch call per distinct process model, and the alarm
+    rules of every line are evaluated in one vectorized pass. Only storing
+    and publishing the readings is done per line.
+    """
+    
+    def __init__(self, line_ids):
+        self.alarm_engine = AlarmEngine(ALARM_RULES, SIGNALS[1:], streams=len(line_ids),
+                                        log_size=ALARM_HISTORY)
+        self.lines = {line_id: ProductionLine(line_id, stream, self.alarm_engine)
+                      for stream, line_id in enumerate(line_ids)}
+        self._order = list(self.lines.values())
+        self._decimals = np.array([SIGNAL_DECIMALS[name] for name in SIGNALS[1:]])
+        self._rng = np.random.default_rng()
+        
+        self.running = False
+        self.ticks = 0
+        self.last_tick_seconds = 0.0
+        self.late_ticks = 0
+    
     def start_monitoring(self):
         """Start real-time data collection"""
+        # Buffers have a single writer, so never start a second collector
+        if self.running:
+            return
         self.running = True
         thread = threading.Thread(target=self._collect_data)
         thread.daemon = True
         thread.start()
-        
+    
     def _collect_data(self):
-        """Simulate real-time data collection"""
+        """Tick every TICK_SECONDS on a fixed schedule"""
+        # Runs on the collector thread so startup does not wait for it
+        for line in self._order:
+            line.monitor.backfill_rollups()
+        
+        next_tick = time.monotonic()
         while self.running:
-            if optimizer.current_setpoints:
-                # Simulate sensor readings with noise
-                import numpy as np
-                
-                base_acid = optimizer.current_setpoints['acid_concentration']
-                base_temp = optimizer.current_setpoints['temperature']
-                base_flow = optimizer.current_setpoints['flow_rate']
-                
-                # Add realistic sensor noise
-                acid_reading = base_acid + np.random.normal(0, 0.02)
-                temp_reading = base_temp + np.random.normal(0, 1.0)
-                flow_reading = base_flow + np.random.normal(0, 5.0)
-                pH_reading = -np.log10(acid_reading)
-                
-                # Calculate derived values
-                variables = [acid_reading, temp_reading, 
-                           optimizer.current_setpoints['residence_time'], flow_reading]
-                yield_val = optimizer.yield_function(variables)
-                quality_val = optimizer.quality_function(variables)
-                cost_val = optimizer.cost_function(variables)
-                
-                data_point = {
-                    'timestamp': datetime.now().isoformat(),
-                    'acid_concentration': round(acid_reading, 3),
-                    'temperature': round(temp_reading, 1),
-                    'flow_rate': round(flow_reading, 1),
-                    'pH': round(pH_reading, 2),
-                    'yield': round(yield_val, 3),
-                    'quality': round(quality_val, 1),
-                    'cost': round(cost_val, 2)
-                }
-                
-                self.data_buffer.append(data_point)
-                current_data['real_time'] = self.data_buffer[-100:]  # Keep last 100 points
-                
-                # Check for alarms
-                self._check_alarms(data_point)
-                
-            time.sleep(2)  # Update every 2 seconds
-    
-    def _check_alarms(self, data_point):
-        """Check for alarm conditions"""
-        alarms = []
-        
-        if data_point['acid_concentration'] > 2.0:
-            alarms.append({
-                'severity': 'HIGH',
-                'message': f"Acid concentration high: {data_point['acid_concentration']:.2f} M",
-                'timestamp': data_point['timestamp']
-            })
-            
-        if data_point['temperature'] > 92:
-            alarms.append({
-                'severity': 'HIGH', 
-                'message': f"Temperature high: {data_point['temperature']:.1f} °C",
-                'timestamp': data_point['timestamp']
-            })
+            started = time.monotonic()
+            self.tick()
+            self.last_tick_seconds = time.monotonic() - started
             
-        if data_point['pH'] < 1.8:
-            alarms.append({
-                'severity': 'MEDIUM',
-                'message': f"pH low: {data_point['pH']:.2f}",
-                'timestamp': data_point['timestamp']
-            })
-            
-        if data_point['yield'] < 0.85:
-            alarms.append({
-                'severity': 'MEDIUM',
-                'message': f"Yield low: {data_point['yield']:.1%}",
-                'timestamp': data_point['timestamp']
-            })
+            next_tick += TICK_SECONDS
+            if next_tick < time.monotonic():
+                # Overran the period: skip ahead instead of bursting
+                self.late_ticks += 1
+                next_tick = time.monotonic()
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+    
+    @staticmethod
+    def _model_key(optimizer):
+        """What scoring a reading depends on, besides the reading itself"""
+        return (tuple(sorted(optimizer.process_params.items())), repr(optimizer.ode_kinetics))
+    
+    def tick(self, now=None):
+        """Simulate, score, record and check one sample per line; returns how many"""
+        now = datetime.now() if now is None else now
+        snapshots = [line.setpoints.snapshot().setpoints for line in self._order]
+        live = np.flatnonzero([bool(current) for current in snapshots])
+        if not len(live):
+            return 0
+        
+        # Setpoints of live lines: acid, temperature, residence time, flow
+        readings = np.array([[snapshots[i]['acid_concentration'], snapshots[i]['temperature'],
+                              snapshots[i]['residence_time'], snapshots[i]['flow_rate']]
+                             for i in live])
+        
+        # Simulate sensor readings with noise
+        readings[:, [0, 1, 3]] += self._rng.normal(0, SENSOR_NOISE, (len(live), 3))
+        
+        # Calculate derived values, one batch per process model
+        scores = np.empty((len(live), 3))
+        groups = {}
+        for row, i in enumerate(live):
+            groups.setdefault(self._model_key(self._order[i].optimizer), []).append(row)
+        for rows in groups.values():
+            optimizer = self._order[live[rows[0]]].optimizer
+            batch = readings[rows]
+            scores[rows] = np.column_stack([optimizer.yield_function_batch(batch),
+                                            optimizer.quality_function_batch(batch),
+                                            optimizer.cost_function_batch(batch)])
+        
+        # SIGNALS[1:] order, rounded to reporting precision
+        values = np.column_stack([readings[:, 0], readings[:, 1], readings[:, 3],
+                                  -np.log10(readings[:, 0]), scores])
+        values = np.round(values * 10.0 ** self._decimals) / 10.0 ** self._decimals
         
-        current_data['alarms'].extend(alarms)
-        # Keep only recent alarms
-        current_data['alarms'] = current_data['alarms'][-50:]
+        # Lines without setpoints get NaN readings, which never change alarm state
+        timestamp = now.timestamp()
+        plant_values = np.full((len(self._order), len(SIGNALS) - 1), np.nan)
+        plant_values[live] = values
+        events = self.alarm_engine.evaluate(timestamp, plant_values)
+        
+        when = now.isoformat()
+        for row, i in enumerate(live):
+            self._order[i].record(timestamp, when, values[row], events[i])
+        
+        self.ticks += 1
+        return len(live)
+    
+    def stats(self):
+        return {
+            'lines': len(self._order),
+            'running': self.running,
+            'tick_seconds': TICK_SECONDS,
+            'ticks': self.ticks,
+            'late_ticks': self.late_ticks,
+            'last_tick_seconds': self.last_tick_seconds,
+            'alarms': self.alarm_engine.stats()
+        }
+
+plant = Plant(LINE_IDS)
+
+def get_line(line_id):
+    """The hosted line with this id, or a 404 response"""
+    line = plant.lines.get(line_id)
+    if line is None:
+        abort(make_response(jsonify({'success': False, 'message': f'Unknown line: {line_id}'}), 404))
+    return line
 
-monitor = ProcessMonitor()
+def line_route(rule, **options):
+    """
+    Register a per-line view at /api/lines/<line_id>/<rule>, and at
+    /api/<rule> for the default line
+    """
+    def register(view):
+        app.route(f'/api/{rule}', defaults={'line_id': DEFAULT_LINE}, **options)(view)
+        app.route(f'/api/lines/<line_id>/{rule}', **options)(view)
+        return view
+    return register
 
 @app.route('/')
 def dashboard():
     """Main dashboard page"""
     return render_template('dashboard.html')
 
-@app.route('/api/optimize')
-def api_optimize():
-    """Perform optimization"""
-    global optimization_running
+def submit_job(line, kind, options):
+    """Queue an optimization for a line, joining an identical one already in flight"""
+    method, source, parsers = JOB_KINDS[kind]
+    if not isinstance(options, dict):
+        raise ValueError("options must be an object")
+    unknown = set(options) - set(parsers)
+    if unknown:
+        raise ValueError(f"Unsupported options for {kind}: {', '.join(sorted(unknown))}")
+    # Bad values are rejected here rather than failing in the worker, and
+    # converted values keep equivalent requests (64 and 64.0) on one key
+    parsed = {}
+    for name, value in options.items():
+        try:
+            parsed[name] = parsers[name](value)
+        except ValueError as e:
+            raise ValueError(f"Invalid {name} {value!r}: {e}")
+    options = parsed
     
-    try:
-        optimization_running = True
-        optimal_setpoints = optimizer.optimize_setpoints()
-        optimization_running = False
-        
-        if optimal_setpoints:
-            return jsonify({
-                'success': True,
-                'setpoints': optimal_setpoints,
-                'message': 'Optimization completed successfully'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Optimization failed'
-            })
-            
-    except Exception as e:
-        optimization_running = False
+    # Identical problem + options = identical result, so share one run; the
+    # line is part of the key because the result is published to it
+    key = problem_key(line.optimizer._problem_snapshot(), job=kind, line=line.id, **options)
+    func = line.published(getattr(line.optimizer, method), source)
+    # Solves share the line's optimizer state (warm start, setpoints,
+    # profiler), so a line's jobs run one at a time
+    return jobs.submit(func, kind=kind, key=key, labels={'line': line.id}, lane=line.id,
+                       **options)
+
+def job_result_response(job):
+    """Result payload for a finished job"""
+    if job.status != DONE:
+        return jsonify({
+            'success': False,
+            'job': job.to_dict(),
+            'message': f'Job {job.status}' + (f': {job.error}' if job.error else '')
+        })
+    if not job.result:
         return jsonify({
             'success': False,
-            'message': f'Error during optimization: {str(e)}'
+            'job': job.to_dict(),
+            'message': 'Optimization failed'
         })
+    return jsonify({
+        'success': True,
+        'job': job.to_dict(),
+        'setpoints': job.result,
+        'message': 'Optimization completed successfully'
+    })
 
-@app.route('/api/current_data')
-def api_current_data():
-    """Get current process data"""
-    return jsonify(current_data)
+@line_route('optimize')
+def api_optimize(line_id):
+    """Perform optimization (waits briefly; use /api/jobs to poll instead)"""
+    line = get_line(line_id)
+    try:
+        job, _ = submit_job(line, 'setpoints', {})
+    except QueueFullError as e:
+        return jsonify({'success': False, 'message': f'Optimizer busy: {e}'}), 429
+    
+    if not job.wait(OPTIMIZE_WAIT_SECONDS):
+        return jsonify({
+            'success': False,
+            'job': job.to_dict(),
+            'message': 'Optimization still running; poll /api/jobs/<job_id>/result'
+        }), 202
+    return job_result_response(job)
+
+@line_route('jobs', methods=['POST'])
+def api_submit_job(line_id):
+    """Submit an optimization job; returns its id immediately"""
+    line = get_line(line_id)
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind', 'setpoints')
+    if kind not in JOB_KINDS:
+        return jsonify({'success': False, 'message': f'Unknown job kind: {kind}'}), 400
+    
+    try:
+        job, deduplicated = submit_job(line, kind, data.get('options') or {})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({'success': False, 'message': f'Optimizer busy: {e}'}), 429
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'deduplicated': deduplicated
+    }), 202
+
+@line_route('jobs')
+def api_list_jobs(line_id):
+    """List the line's known jobs and the shared queue counters"""
+    line = get_line(line_id)
+    return jsonify({
+        'success': True,
+        'jobs': [job.to_dict() for job in jobs.jobs() if job.labels.get('line') == line.id],
+        'stats': jobs.stats()
+    })
 
-@app.route('/api/setpoints')
-def api_setpoints():
-    """Get current setpoints"""
-    if optimizer.current_setpoints:
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """Get job status"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': f'Unknown job: {job_id}'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@app.route('/api/jobs/<job_id>/result')
+def api_job_result(job_id):
+    """Get job result, or 202 with its status while it is pending"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': f'Unknown job: {job_id}'}), 404
+    if job.status not in FINISHED:
+        return jsonify({'success': False, 'job': job.to_dict(), 'message': 'Job pending'}), 202
+    return job_result_response(job)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def api_cancel_job(job_id):
+    """Cancel a queued job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': f'Unknown job: {job_id}'}), 404
+    if not jobs.cancel(job_id):
         return jsonify({
-            'success': True,
-            'setpoints': optimizer.current_setpoints
-        })
+            'success': False,
+            'job': job.to_dict(),
+            'message': f'Job is {job.status} and can no longer be cancelled'
+        }), 409
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@line_route('cache_stats')
+def api_cache_stats(line_id):
+    """Get optimization result cache hit/miss counters"""
+    line = get_line(line_id)
+    return jsonify({
+        'success': True,
+        'cache': line.optimizer.cache.stats(),
+        'charts': line.chart_cache.stats()
+    })
+
+@line_route('current_data')
+def api_current_data(line_id):
+    """
+    Get current process data
+
+    Without arguments returns the last API_WINDOW samples, the retained
+    alarm events and the active alarms. With ``?cursor=N`` (and
+    ``alarm_cursor=M``) returns only entries added since those cursors;
+    clients keep their active-alarm table current by applying the raised
+    and cleared events. Every response carries the cursors to send next
+    time. ``gap`` flags entries that were skipped because they were evicted
+    or the backlog exceeded API_WINDOW; the active alarms are then resent.
+    """
+    line = get_line(line_id)
+    cursor = request.args.get('cursor', type=int)
+    alarm_cursor = request.args.get('alarm_cursor', type=int)
+    
+    if cursor is None:
+        cursor = max(0, line.monitor.data_buffer.count - API_WINDOW)
+    rows, next_cursor, sample_gap = line.monitor.samples_since(cursor)
+    alarms, next_alarm_cursor, alarm_gap = line.monitor.alarms_since(alarm_cursor)
+    
+    response = {
+        'real_time': rows,
+        'alarms': alarms,
+        'cursor': next_cursor,
+        'alarm_cursor': next_alarm_cursor,
+        'gap': sample_gap or alarm_gap
+    }
+    if alarm_cursor is None or alarm_gap:
+        response['active_alarms'] = line.monitor.active_alarms()
+    return jsonify(response)
+
+@line_route('stream')
+def api_stream(line_id):
+    """
+    Server-sent event stream of live samples and alarms
+
+    Starts with a 'snapshot' event holding the current window, then sends
+    'sample' and 'alarm' events as they happen. Clients that fall too far
+    behind get an 'overflow' event and are disconnected.
+    """
+    line = get_line(line_id)
+    try:
+        subscriber = line.broadcaster.subscribe()
+    except SubscriberLimitError as e:
+        return jsonify({'success': False, 'message': f'Too many streams: {e}'}), 503
+    
+    initial = Broadcaster.encode('snapshot', {
+        'real_time': line.monitor.recent(),
+        'alarms': line.monitor.alarms_since()[0],
+        'active_alarms': line.monitor.active_alarms()
+    })
+    return Response(
+        stream_with_context(line.broadcaster.stream(subscriber, initial)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@line_route('stream_stats')
+def api_stream_stats(line_id):
+    """Get push channel subscriber and overflow counters"""
+    line = get_line(line_id)
+    return jsonify({'success': True, 'stream': line.broadcaster.stats()})
+
+def series_lists(series):
+    """Convert trend series arrays to JSON-ready lists"""
+    return {name: {key: values.tolist() for key, values in data.items()}
+            for name, data in series.items()}
+
+def parse_time(value):
+    """Epoch seconds or an ISO 8601 timestamp, or None"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+@line_route('history')
+def api_history(line_id):
+    """
+    Get recorded samples in a time range
+
+    ``?start=`` and ``?end=`` take epoch seconds or ISO timestamps (both
+    optional, end exclusive); ``?signals=`` a comma-separated subset of
+    SIGNALS. Columns are returned with timestamps in epoch seconds.
+
+    With ``?points=N`` the range is downsampled instead (see
+    ProcessMonitor.trend) using ``?method=lttb`` (default) or ``minmax``.
+    """
+    line = get_line(line_id)
+    signals = request.args.get('signals')
+    signals = ('timestamp',) + tuple(name for name in signals.split(',') if name != 'timestamp') \
+        if signals else SIGNALS
+    unknown = [name for name in signals if name not in SIGNALS]
+    if unknown:
+        return jsonify({'success': False, 'message': f"Unknown signals: {', '.join(unknown)}"}), 400
+    try:
+        start = parse_time(request.args.get('start'))
+        end = parse_time(request.args.get('end'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid time: {e}'}), 400
+
+    points = request.args.get('points', type=int)
+    if points is not None:
+        method = request.args.get('method', 'lttb')
+        if method not in TREND_METHODS:
+            return jsonify({
+                'success': False,
+                'message': f"Unknown method '{method}', expected one of {', '.join(TREND_METHODS)}"
+            }), 400
+        trend = line.monitor.trend(start, end, signals, min(max(points, 1), TREND_SOURCE_POINTS), method)
+        trend['series'] = series_lists(trend['series'])
+        return jsonify(dict({'success': True}, **trend))
+
+    columns = line.monitor.history(start, end, signals)
+    return jsonify({
+        'success': True,
+        'source': 'historian' if line.monitor.historian is not None else 'buffer',
+        'count': len(columns['timestamp']),
+        'columns': {name: values.tolist() for name, values in columns.items()}
+    })
+
+@line_route('history_stats')
+def api_history_stats(line_id):
+    """Get historian segment, size and ingest counters"""
+    line = get_line(line_id)
+    if line.monitor.historian is None:
+        return jsonify({'success': False, 'message': 'History is not persisted; set CORN_OPTIMIZER_HISTORY_DIR'})
+    return jsonify({'success': True, 'history': line.monitor.historian.stats()})
+
+@line_route('alarms')
+def api_alarms(line_id):
+    """Get active alarms, the configured rules and engine counters"""
+    line = get_line(line_id)
+    return jsonify({
+        'success': True,
+        'active': line.monitor.active_alarms(),
+        'rules': [rule.to_dict() for rule in line.monitor.alarm_engine.rules],
+        'stats': line.monitor.alarm_engine.stats()
+    })
+
+@line_route('setpoints')
+def api_setpoints(line_id):
+    """
+    Get current setpoints
+
+    Clients that send the version they hold (``?version=N`` or an
+    If-None-Match ETag) get 304 Not Modified while it is still current.
+    """
+    line = get_line(line_id)
+    snapshot = line.setpoints.snapshot()
+    if snapshot:
+        if (request.args.get('version') == str(snapshot.version)
+                or request.if_none_match.contains(str(snapshot.version))):
+            return Response(status=304, headers={'ETag': snapshot.etag})
+        
+        # Serialized once per version at publish time
+        body = f'{{"success": true, "version": {snapshot.version}, "setpoints": {snapshot.json}}}'
+        return Response(body, mimetype='application/json', headers={'ETag': snapshot.etag})
     else:
         return jsonify({
             'success': False,
             'message': 'No setpoints available. Run optimization first.'
         })
 
-@app.route('/api/update_setpoint', methods=['POST'])
-def api_update_setpoint():
+@line_route('update_setpoint', methods=['POST'])
+def api_update_setpoint(line_id):
     """Manually update a setpoint"""
+    line = get_line(line_id)
     try:
         data = request.json
         parameter = data.get('parameter')
         value = float(data.get('value'))
         
-        if not optimizer.current_setpoints:
+        if not line.setpoints.snapshot():
             return jsonify({
                 'success': False,
                 'message': 'No baseline setpoints available'
@@ -205,30 +864,35 @@ def api_update_setpoint():
                 'message': f'{parameter} must be between {min_val} and {max_val}'
             })
         
-        # Update setpoint
-        optimizer.current_setpoints[parameter] = value
-        if parameter == 'acid_concentration':
-            optimizer.current_setpoints['pH_setpoint'] = -np.log10(value)
-        
-        # Recalculate performance
-        variables = [
-            optimizer.current_setpoints['acid_concentration'],
-            optimizer.current_setpoints['temperature'],
-            optimizer.current_setpoints['residence_time'],
-            optimizer.current_setpoints['flow_rate']
-        ]
+        def apply_update(updated):
+            # Update setpoint on a private copy of the current version
+            updated[parameter] = value
+            if parameter == 'acid_concentration':
+                updated['pH_setpoint'] = -math.log10(value)
+            
+            # Recalculate performance
+            variables = [
+                updated['acid_concentration'],
+                updated['temperature'],
+                updated['residence_time'],
+                updated['flow_rate']
+            ]
+            
+            updated['performance'] = {
+                'yield': line.optimizer.yield_function(variables),
+                'quality': line.optimizer.quality_function(variables),
+                'cost': line.optimizer.cost_function(variables),
+                'safety': line.optimizer.safety_function(variables)
+            }
+            return updated
         
-        optimizer.current_setpoints['performance'] = {
-            'yield': optimizer.yield_function(variables),
-            'quality': optimizer.quality_function(variables),
-            'cost': optimizer.cost_function(variables),
-            'safety': optimizer.safety_function(variables)
-        }
+        snapshot = line.setpoints.update(apply_update, source='manual')
         
         return jsonify({
             'success': True,
             'message': f'{parameter} updated to {value}',
-            'updated_setpoints': optimizer.current_setpoints
+            'version': snapshot.version,
+            'updated_setpoints': snapshot.to_dict()
         })
         
     except Exception as e:
@@ -237,18 +901,20 @@ def api_update_setpoint():
             'message': f'Error updating setpoint: {str(e)}'
         })
 
-@app.route('/api/safety_status')
-def api_safety_status():
+@line_route('safety_status')
+def api_safety_status(line_id):
     """Get current safety status"""
-    if optimizer.current_setpoints:
+    line = get_line(line_id)
+    current = line.setpoints.snapshot().setpoints
+    if current:
         variables = [
-            optimizer.current_setpoints['acid_concentration'],
-            optimizer.current_setpoints['temperature'],
-            optimizer.current_setpoints['residence_time'],
-            optimizer.current_setpoints['flow_rate']
+            current['acid_concentration'],
+            current['temperature'],
+            current['residence_time'],
+            current['flow_rate']
         ]
         
-        safety_status = optimizer.safety_check(variables)
+        safety_status = line.optimizer.safety_check(variables)
         return jsonify({
             'success': True,
             'safety_status': safety_status
@@ -259,43 +925,93 @@ def api_safety_status():
             'message': 'No setpoints available'
         })
 
-@app.route('/api/trend_chart')
-def api_trend_chart():
-    """Generate trend chart data"""
-    if not current_data['real_time']:
-        return jsonify({'success': False, 'message': 'No data available'})
+# Chart formats: 'plotly' is a complete figure for Plotly.newPlot, 'columns'
+# is just the data, for clients that build the figure themselves
+CHART_FORMATS = ('plotly', 'columns')
+TREND_SIGNALS = ('timestamp', 'yield', 'quality', 'temperature')
+PERFORMANCE_CATEGORIES = ['Yield', 'Quality', 'Safety', 'Cost Efficiency']
+
+# Trend traces: signal, legend name, color, y axis
+TREND_TRACES = (
+    ('yield', 'Yield', 'green', 'y1'),
+    ('quality', 'Quality Score', 'blue', 'y2'),
+    ('temperature', 'Temperature (°C)', 'red', 'y3')
+)
+
+def chart_response(line, chart, version, build):
+    """
+    Serve a chart payload rendered at most once per data version
+
+    ``?format=`` selects one of CHART_FORMATS. Clients sending the ETag
+    they hold get 304 Not Modified until the data changes.
+    """
+    fmt = request.args.get('format', 'plotly')
+    if fmt not in CHART_FORMATS:
+        return jsonify({
+            'success': False,
+            'message': f"Unknown format '{fmt}', expected one of {', '.join(CHART_FORMATS)}"
+        }), 400
+    
+    etag = f'{chart}-{fmt}-{version}'
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
     
-    df = pd.DataFrame(current_data['real_time'])
+    body = line.chart_cache.get(chart, fmt, version, lambda: build(fmt))
+    return Response(body, mimetype='application/json', headers={'ETag': f'"{etag}"'})
+
+def encode_chart(version, fmt, figure, data):
+    """Serialize one chart payload in the requested format"""
+    if fmt == 'columns':
+        payload = dict({'success': True, 'version': version}, **data)
+    else:
+        import plotly.utils
+        # 'chart' stays a JSON string for existing Plotly clients
+        payload = {'success': True, 'version': version,
+                   'chart': json.dumps(figure(), cls=plotly.utils.PlotlyJSONEncoder)}
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def trend_figure(series, mode='lines'):
+    """
+    Trend figure from per-signal series, each either
+    {'timestamp', 'value'} points or a {'timestamp', 'min', 'max'} envelope
+    """
+    # Chart dependencies load on first chart request, not at app start
+    import plotly.graph_objs as go
     
     fig = go.Figure()
     
     # Add traces for key parameters
-    fig.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['yield'],
-        mode='lines+markers',
-        name='Yield',
-        line=dict(color='green'),
-        yaxis='y1'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['quality'],
-        mode='lines+markers',
-        name='Quality Score',
-        line=dict(color='blue'),
-        yaxis='y2'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['temperature'],
-        mode='lines+markers',
-        name='Temperature (°C)',
-        line=dict(color='red'),
-        yaxis='y3'
-    ))
+    for signal, name, color, axis in TREND_TRACES:
+        data = series[signal]
+        timestamps = [datetime.fromtimestamp(ts).isoformat() for ts in data['timestamp']]
+        if 'value' in data:
+            fig.add_trace(go.Scatter(
+                x=timestamps,
+                y=data['value'],
+                mode=mode,
+                name=name,
+                line=dict(color=color),
+                yaxis=axis
+            ))
+        else:
+            # Shaded band between the bucket maxima and minima
+            fig.add_trace(go.Scatter(
+                x=timestamps,
+                y=data['max'],
+                mode='lines',
+                name=f'{name} max',
+                line=dict(color=color, width=1),
+                yaxis=axis
+            ))
+            fig.add_trace(go.Scatter(
+                x=timestamps,
+                y=data['min'],
+                mode='lines',
+                name=f'{name} min',
+                line=dict(color=color, width=1),
+                fill='tonexty',
+                yaxis=axis
+            ))
     
     fig.update_layout(
         title='Process Trends',
@@ -306,23 +1022,23 @@ def api_trend_chart():
         legend=dict(x=0, y=1),
         height=400
     )
-    
-    graphJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-    
-    return jsonify({
-        'success': True,
-        'chart': graphJSON
-    })
+    return fig
 
-@app.route('/api/performance_chart')
-def api_performance_chart():
-    """Generate performance radar chart"""
-    if not optimizer.current_setpoints:
-        return jsonify({'success': False, 'message': 'No setpoints available'})
-    
-    performance = optimizer.current_setpoints['performance']
-    
-    categories = ['Yield', 'Quality', 'Safety', 'Cost Efficiency']
+def build_trend_chart(line, version, fmt):
+    _, columns = line.monitor.data_buffer.snapshot(API_WINDOW)
+    columns = {name: columns[name].tolist() for name in TREND_SIGNALS}
+    series = {signal: {'timestamp': columns['timestamp'], 'value': columns[signal]}
+              for signal in TREND_SIGNALS[1:]}
+    return encode_chart(version, fmt, lambda: trend_figure(series, 'lines+markers'),
+                        {'columns': columns})
+
+def build_trend_window_chart(line, version, fmt, seconds, method):
+    trend = line.monitor.trend(time.time() - seconds, None, TREND_SIGNALS[1:], method=method)
+    trend['series'] = series_lists(trend['series'])
+    return encode_chart(version, fmt, lambda: trend_figure(trend['series']), trend)
+
+def build_performance_chart(snapshot, fmt):
+    performance = snapshot.setpoints['performance']
     values = [
         performance['yield'] * 100,
         performance['quality'],
@@ -330,43 +1046,100 @@ def api_performance_chart():
         (100 - min(performance['cost'] / 50 * 100, 100))  # Invert cost for radar
     ]
     
-    fig = go.Figure()
+    def figure():
+        import plotly.graph_objs as go
+        
+        fig = go.Figure()
+        
+        fig.add_trace(go.Scatterpolar(
+            r=values,
+            theta=PERFORMANCE_CATEGORIES,
+            fill='toself',
+            name='Current Performance',
+            line_color='blue'
+        ))
+        
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(
+                    visible=True,
+                    range=[0, 100]
+                )),
+            showlegend=True,
+            title="Performance Overview",
+            height=400
+        )
+        return fig
     
-    fig.add_trace(go.Scatterpolar(
-        r=values,
-        theta=categories,
-        fill='toself',
-        name='Current Performance',
-        line_color='blue'
-    ))
+    columns = {'categories': PERFORMANCE_CATEGORIES, 'values': values}
+    return encode_chart(snapshot.version, fmt, figure, {'columns': columns})
+
+@line_route('trend_chart')
+def api_trend_chart(line_id):
+    """
+    Generate trend chart data
+
+    Rebuilt only when a new sample arrives; ``?format=columns`` returns
+    the timestamp (epoch seconds), yield, quality and temperature arrays.
+    ``?window=`` (one of TREND_WINDOWS) charts that much history instead,
+    downsampled with ``?method=`` (lttb or minmax) into ``series``.
+    """
+    line = get_line(line_id)
+    version = line.monitor.data_buffer.count
+    if not version:
+        return jsonify({'success': False, 'message': 'No data available'})
     
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100]
-            )),
-        showlegend=True,
-        title="Performance Overview",
-        height=400
-    )
+    window = request.args.get('window')
+    if window is None:
+        return chart_response(line, 'trend', version,
+                              lambda fmt: build_trend_chart(line, version, fmt))
     
-    graphJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    method = request.args.get('method', 'lttb')
+    if window not in TREND_WINDOWS or method not in TREND_METHODS:
+        return jsonify({
+            'success': False,
+            'message': f"Expected window in {', '.join(TREND_WINDOWS)} "
+                       f"and method in {', '.join(TREND_METHODS)}"
+        }), 400
+    return chart_response(line, f'trend-{window}-{method}', version,
+                          lambda fmt: build_trend_window_chart(line, version, fmt,
+                                                               TREND_WINDOWS[window], method))
+
+@line_route('performance_chart')
+def api_performance_chart(line_id):
+    """
+    Generate performance radar chart
+
+    Rebuilt only when the setpoints change; ``?format=columns`` returns
+    the radar categories and values.
+    """
+    line = get_line(line_id)
+    snapshot = line.setpoints.snapshot()
+    if not snapshot.setpoints:
+        return jsonify({'success': False, 'message': 'No setpoints available'})
     
+    return chart_response(line, 'performance', snapshot.version,
+                          lambda fmt: build_performance_chart(snapshot, fmt))
+
+@app.route('/api/lines')
+def api_lines():
+    """List hosted lines and the shared collector's counters"""
     return jsonify({
         'success': True,
-        'chart': graphJSON
+        'default_line': DEFAULT_LINE,
+        'lines': [line.summary() for line in plant.lines.values()],
+        'plant': plant.stats()
     })
 
 @app.route('/start_monitoring')
 def start_monitoring():
-    """Start real-time monitoring"""
-    monitor.start_monitoring()
+    """Start real-time monitoring of every line"""
+    plant.start_monitoring()
     return jsonify({'success': True, 'message': 'Monitoring started'})
 
 if __name__ == '__main__':
     # Start monitoring
-    monitor.start_monitoring()
+    plant.start_monitoring()
     
     # Create templates directory if it doesn't exist
     import os